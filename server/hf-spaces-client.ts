@@ -16,6 +16,7 @@ interface STTChunkRequest {
   sequence: number;
   language?: string;
   return_partial?: boolean;
+  session_id?: string;  // Used by the local worker pool; the HF Space is stateless
 }
 
 interface STTChunkResponse {
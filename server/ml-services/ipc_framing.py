@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+IPC Framing for the worker pool stdin/stdout protocol
+
+Two interchangeable wire protocols:
+
+- json:   one JSON object per line; binary values travel as base64 strings
+- framed: length-prefixed binary frames with raw binary payloads
+
+Frame layout (all integers big-endian):
+
+    +--------+-----------+-------------+-----------------+-------------------+
+    | "VFB1" | meta_len  | payload_len | meta (JSON)     | payload (raw)     |
+    | 4 B    | uint32    | uint32      | meta_len bytes  | payload_len bytes |
+    +--------+-----------+-------------+-----------------+-------------------+
+
+Binary values (e.g. audio) are lifted out of the message into the payload
+section. meta["$payloads"] lists [dotted_path, length] pairs in payload order
+so the reader can put them back, e.g. [["data.audio", 32044]].
+"""
+
+import json
+import base64
+import struct
+import asyncio
+import threading
+from typing import Dict, Any, List, Optional, Tuple, BinaryIO
+
+
+FRAME_MAGIC = b"VFB1"
+FRAME_HEADER = struct.Struct(">4sII")
+PAYLOADS_KEY = "$payloads"
+
+
+class FramingError(ValueError):
+    """Raised when the byte stream is not a valid frame (the stream cannot be resynced)"""
+
+
+def split_payloads(message: Dict[str, Any]) -> Tuple[Dict[str, Any], List[bytes]]:
+    """Replace bytes values in a (nested) message with a payload table"""
+    payloads: List[bytes] = []
+    table: List[List[Any]] = []
+
+    def walk(obj: Dict[str, Any], prefix: str) -> Dict[str, Any]:
+        out = {}
+        for key, value in obj.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, (bytes, bytearray, memoryview)):
+                value = bytes(value)
+                table.append([path, len(value)])
+                payloads.append(value)
+            elif isinstance(value, dict):
+                out[key] = walk(value, path + ".")
+            else:
+                out[key] = value
+        return out
+
+    meta = walk(message, "")
+    if table:
+        meta[PAYLOADS_KEY] = table
+    return meta, payloads
+
+
+def join_payloads(meta: Dict[str, Any], payload: bytes) -> Dict[str, Any]:
+    """Inverse of split_payloads: put payload slices back at their paths"""
+    table = meta.pop(PAYLOADS_KEY, None)
+    if not table:
+        return meta
+
+    offset = 0
+    view = memoryview(payload)
+    for path, length in table:
+        target = meta
+        keys = path.split(".")
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target[keys[-1]] = bytes(view[offset:offset + length])
+        offset += length
+
+    if offset != len(payload):
+        raise FramingError(f"Payload table covers {offset} bytes, frame has {len(payload)}")
+    return meta
+
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    """Serialize a message into a single frame"""
+    meta, payloads = split_payloads(message)
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    payload_len = sum(len(p) for p in payloads)
+    return b"".join([FRAME_HEADER.pack(FRAME_MAGIC, len(meta_bytes), payload_len), meta_bytes] + payloads)
+
+
+def _read_exact(stream: BinaryIO, size: int) -> Optional[bytes]:
+    """Read exactly size bytes, or None on a clean EOF before the first byte"""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = stream.read(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise FramingError(f"Stream ended mid-frame ({size - remaining}/{size} bytes)")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """Read one frame from stream; returns None on EOF"""
+    header = _read_exact(stream, FRAME_HEADER.size)
+    if header is None:
+        return None
+
+    magic, meta_len, payload_len = FRAME_HEADER.unpack(header)
+    if magic != FRAME_MAGIC:
+        raise FramingError(f"Bad frame magic: {magic!r}")
+
+    meta_bytes = _read_exact(stream, meta_len) if meta_len else b"{}"
+    payload = _read_exact(stream, payload_len) if payload_len else b""
+    if meta_bytes is None or payload is None:
+        raise FramingError("Stream ended mid-frame")
+
+    return join_payloads(json.loads(meta_bytes), payload)
+
+
+def _base64_default(value: Any) -> str:
+    """json.dumps hook: binary values become base64 on the JSON protocol"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode("utf-8")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class JsonLinesProtocol:
+    """Newline-delimited JSON (the original protocol)"""
+
+    name = "json"
+    binary_payloads = False
+
+    def __init__(self, reader: BinaryIO, writer: BinaryIO):
+        self.reader = reader
+        self.writer = writer
+        self.write_lock = threading.Lock()
+
+    def read_message(self) -> Optional[Dict[str, Any]]:
+        """Read the next message; None on EOF. Raises json.JSONDecodeError on bad input."""
+        while True:
+            line = self.reader.readline()
+            if not line:
+                return None
+            if line.strip():
+                return json.loads(line)
+
+    async def read_message_async(self, stream: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+        """read_message for an asyncio stream"""
+        while True:
+            line = await stream.readline()
+            if not line:
+                return None
+            if line.strip():
+                return json.loads(line)
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        """Serialize one message to its wire bytes"""
+        return json.dumps(message, default=_base64_default).encode("utf-8") + b"\n"
+
+    def write_message(self, message: Dict[str, Any]):
+        """Write one message (safe to call from any thread)"""
+        data = self.encode(message)
+        with self.write_lock:
+            self.writer.write(data)
+            self.writer.flush()
+
+
+class FramedProtocol(JsonLinesProtocol):
+    """Length-prefixed frames with raw binary payloads"""
+
+    name = "framed"
+    binary_payloads = True
+
+    def read_message(self) -> Optional[Dict[str, Any]]:
+        """Read the next frame; None on EOF. Raises FramingError on a corrupt stream."""
+        return read_frame(self.reader)
+
+    async def read_message_async(self, stream: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+        """read_message for an asyncio stream"""
+        try:
+            header = await stream.readexactly(FRAME_HEADER.size)
+        except asyncio.IncompleteReadError as e:
+            if not e.partial:
+                return None
+            raise FramingError(f"Stream ended mid-frame ({len(e.partial)}/{FRAME_HEADER.size} bytes)")
+
+        magic, meta_len, payload_len = FRAME_HEADER.unpack(header)
+        if magic != FRAME_MAGIC:
+            raise FramingError(f"Bad frame magic: {magic!r}")
+
+        try:
+            meta_bytes = await stream.readexactly(meta_len) if meta_len else b"{}"
+            payload = await stream.readexactly(payload_len) if payload_len else b""
+        except asyncio.IncompleteReadError:
+            raise FramingError("Stream ended mid-frame")
+
+        return join_payloads(json.loads(meta_bytes), payload)
+
+    def encode(self, message: Dict[str, Any]) -> bytes:
+        """Serialize one message to its wire bytes"""
+        return encode_frame(message)
+
+
+PROTOCOLS = {
+    JsonLinesProtocol.name: JsonLinesProtocol,
+    FramedProtocol.name: FramedProtocol,
+}
+
+
+def make_protocol(name: str, reader: BinaryIO, writer: BinaryIO) -> JsonLinesProtocol:
+    """Create a protocol by name ("json" or "framed")"""
+    if name not in PROTOCOLS:
+        raise ValueError(f"Unknown protocol: {name}")
+    return PROTOCOLS[name](reader, writer)
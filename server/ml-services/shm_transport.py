@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Shared-Memory Audio Transport for the worker pool
+
+Large task payloads (long audio uploads) are copied once into a shared
+memory arena owned by the pool parent. Only a small handle travels through
+the worker's multiprocessing.Queue; the worker maps the same memory and gets
+a zero-copy NumPy view of the bytes.
+
+Handle format (replaces the payload value inside task data):
+    {"$shm": "<segment name>", "offset": 4096, "size": 9600044}
+
+The parent frees a block when the task's result comes back (or the task is
+dropped), so the arena only has to hold the audio of in-flight and queued
+tasks. Payloads that do not fit fall back to being sent inline.
+"""
+
+import sys
+import base64
+import binascii
+import threading
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+
+HANDLE_KEY = "$shm"
+
+
+def is_handle(value: Any) -> bool:
+    return isinstance(value, dict) and HANDLE_KEY in value
+
+
+class ShmArena:
+    """
+    Parent side: one shared memory segment carved up by a first-fit allocator
+
+    Free blocks are kept sorted by offset and coalesced on release, so
+    fragmentation stays low for the mostly FIFO allocation pattern of a task
+    queue. Thread-safe.
+    """
+
+    ALIGNMENT = 64
+
+    def __init__(self, size_bytes: int, threshold: int):
+        self.segment = shared_memory.SharedMemory(create=True, size=size_bytes)
+        self.size = self.segment.size
+        self.threshold = threshold
+        self.free_blocks: List[Tuple[int, int]] = [(0, self.size)]  # (offset, size)
+        self.allocated: Dict[int, int] = {}  # offset -> size
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.allocations = 0
+        self.fallbacks = 0
+        self.bytes_in_use = 0
+        self.peak_bytes_in_use = 0
+
+    @property
+    def name(self) -> str:
+        return self.segment.name
+
+    def allocate(self, nbytes: int) -> Optional[int]:
+        """Reserve nbytes; returns the offset or None if the arena is full"""
+        size = max(self.ALIGNMENT, -(-nbytes // self.ALIGNMENT) * self.ALIGNMENT)
+
+        with self.lock:
+            for index, (offset, block_size) in enumerate(self.free_blocks):
+                if block_size < size:
+                    continue
+                if block_size == size:
+                    del self.free_blocks[index]
+                else:
+                    self.free_blocks[index] = (offset + size, block_size - size)
+
+                self.allocated[offset] = size
+                self.allocations += 1
+                self.bytes_in_use += size
+                self.peak_bytes_in_use = max(self.peak_bytes_in_use, self.bytes_in_use)
+                return offset
+
+            self.fallbacks += 1
+            return None
+
+    def free(self, offset: int):
+        """Return a block to the free list, merging with its neighbours"""
+        with self.lock:
+            size = self.allocated.pop(offset, None)
+            if size is None:
+                return
+            self.bytes_in_use -= size
+
+            blocks = self.free_blocks
+            index = 0
+            while index < len(blocks) and blocks[index][0] < offset:
+                index += 1
+            blocks.insert(index, (offset, size))
+
+            # Merge with next, then previous
+            if index + 1 < len(blocks) and offset + size == blocks[index + 1][0]:
+                blocks[index] = (offset, size + blocks[index + 1][1])
+                del blocks[index + 1]
+            if index > 0 and blocks[index - 1][0] + blocks[index - 1][1] == offset:
+                prev_offset, prev_size = blocks[index - 1]
+                blocks[index - 1] = (prev_offset, prev_size + blocks[index][1])
+                del blocks[index]
+
+    def put(self, data: Any) -> Optional[Dict[str, Any]]:
+        """Copy bytes-like data into the arena and return a handle (None if full)"""
+        view = memoryview(data).cast("B")
+        offset = self.allocate(len(view))
+        if offset is None:
+            return None
+
+        self.segment.buf[offset:offset + len(view)] = view
+        return {HANDLE_KEY: self.name, "offset": offset, "size": len(view)}
+
+    def read(self, handle: Dict[str, Any]) -> bytes:
+        """Copy a block back out of the arena (for payloads leaving the host)"""
+        offset = handle["offset"]
+        return bytes(self.segment.buf[offset:offset + handle["size"]])
+    
+    def offload(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], List[int]]:
+        """
+        Move large payloads in task data into the arena
+
+        Raw bytes values are moved as-is; base64 strings under an "audio" key
+        (JSON protocol) are decoded straight into the arena, so the worker
+        skips the decode as well as the pickling. Returns the rewritten data
+        and the offsets to release when the task is done.
+        """
+        offsets: List[int] = []
+        rewritten = dict(data)
+
+        for key, value in data.items():
+            if isinstance(value, (bytes, bytearray, memoryview)) and len(value) >= self.threshold:
+                payload = value
+            elif key == "audio" and isinstance(value, str) and len(value) * 3 // 4 >= self.threshold:
+                try:
+                    payload = base64.b64decode(value)
+                except (binascii.Error, ValueError):
+                    continue
+            else:
+                continue
+
+            handle = self.put(payload)
+            if handle is not None:
+                rewritten[key] = handle
+                offsets.append(handle["offset"])
+
+        return rewritten, offsets
+
+    def release(self, offsets: List[int]):
+        for offset in offsets:
+            self.free(offset)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "segment": self.name,
+                "size_bytes": self.size,
+                "threshold_bytes": self.threshold,
+                "bytes_in_use": self.bytes_in_use,
+                "peak_bytes_in_use": self.peak_bytes_in_use,
+                "live_blocks": len(self.allocated),
+                "allocations": self.allocations,
+                "fallbacks": self.fallbacks
+            }
+
+    def close(self):
+        """Destroy the segment (parent only, at shutdown)"""
+        try:
+            self.segment.close()
+            self.segment.unlink()
+        except (FileNotFoundError, BufferError) as e:
+            print(f"[ShmArena] Cleanup warning: {e}", file=sys.stderr, flush=True)
+
+
+class ShmReader:
+    """Worker side: attach arena segments by name and hand out zero-copy views"""
+
+    def __init__(self):
+        self.segments: Dict[str, shared_memory.SharedMemory] = {}
+
+    def view(self, handle: Dict[str, Any]) -> np.ndarray:
+        """Read-only uint8 view of a block; valid until the task's result is sent"""
+        name = handle[HANDLE_KEY]
+        segment = self.segments.get(name)
+        if segment is None:
+            segment = shared_memory.SharedMemory(name=name)
+            self.segments[name] = segment
+
+        array = np.ndarray((handle["size"],), dtype=np.uint8, buffer=segment.buf, offset=handle["offset"])
+        array.flags.writeable = False
+        return array
+
+    def resolve(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace handles in task data with NumPy views"""
+        if not any(is_handle(value) for value in data.values()):
+            return data
+        return {key: self.view(value) if is_handle(value) else value for key, value in data.items()}
+
+
+def materialize(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy any shared-memory views in data into plain bytes (for echoing back)"""
+    return {key: value.tobytes() if isinstance(value, np.ndarray) else value for key, value in data.items()}
@@ -11,8 +11,12 @@ import base64
 import time
 import io
 import wave
+import string
 import numpy as np
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+
+from transcription_cache import TranscriptionCache
+from typing import Dict, Any, List, Callable, Optional, Tuple
 from dataclasses import dataclass
 
 # Try to import faster-whisper
@@ -23,6 +27,132 @@ except ImportError:
     WHISPER_AVAILABLE = False
     print("[STT] WARNING: faster-whisper not installed, using fallback", file=sys.stderr, flush=True)
 
+# Batched window decoding (_decode_windows) drives WhisperModel's encoder and
+# CTranslate2 generate() directly, as laid out in faster-whisper >= 1.2
+try:
+    import faster_whisper
+    from faster_whisper.tokenizer import Tokenizer
+    BATCHED_DECODE_AVAILABLE = tuple(int(part) for part in faster_whisper.__version__.split(".")[:2]) >= (1, 2)
+except (ImportError, ValueError):
+    BATCHED_DECODE_AVAILABLE = False
+
+WHISPER_SAMPLE_RATE = 16000
+MAX_BATCH_CLIP_SECONDS = 30.0  # Whisper window; longer clips are decoded one by one
+
+# Streaming transcription (transcribe_chunk)
+STREAM_DECODE_INTERVAL = 0.5  # Seconds of new audio between re-decodes of a stream's buffer
+STREAM_MAX_BUFFER_SECONDS = 15.0  # A longer buffer is force-committed, bounding decode cost
+STREAM_ENDPOINT_SILENCE = 0.8  # Trailing silence that commits the whole hypothesis
+STREAM_SILENCE_RMS = 0.01  # Chunk energy below which a chunk counts as silence
+STREAM_IDLE_SECONDS = 120.0  # Streams not fed for this long are dropped
+STREAM_PROMPT_CHARS = 200  # Committed text passed back to Whisper as context
+
+# Long-form transcription (transcribe_long)
+LONG_FORM_WINDOW_SECONDS = 30.0  # Longest window decoded as one piece
+LONG_FORM_OVERLAP_SECONDS = 1.0  # Shared audio where a window had to be cut inside speech
+LONG_FORM_SEAM_WORDS = 8  # Longest run of words looked for twice at a seam
+LONG_FORM_SILENCE_RMS = 0.005  # Audio louder than this is not silence, whatever the VAD says
+# Windows decoded at once; the first long-form request reloads WhisperModel
+# with this many CTranslate2 replicas (every other request needs only one)
+DECODE_PARALLELISM = max(1, int(os.environ.get("STT_DECODE_PARALLELISM", "2")))
+
+
+@dataclass
+class WhisperTier:
+    """A Whisper model and decoding setup that requests can be routed to"""
+    name: str
+    model: str
+    beam_size: int
+    replicas: int = 1  # CTranslate2 replicas for parallel long-form windows, loaded on first use
+
+
+# Model tiers (route_tier): a fast greedy tier for live audio and a beam-search tier for everything else
+WHISPER_TIERS = {
+    "realtime": WhisperTier("realtime", os.environ.get("STT_REALTIME_MODEL", "large-v3-turbo"), beam_size=1),
+    "accurate": WhisperTier("accurate", os.environ.get("STT_ACCURATE_MODEL", "large-v3"), beam_size=5, replicas=DECODE_PARALLELISM)
+}
+DEFAULT_TIER = "accurate"
+REALTIME_TIER_MAX_SECONDS = 5.0  # Clips up to this long go to the realtime tier unless a tier or channel says otherwise
+PRELOAD_TIERS = [t.strip() for t in os.environ.get("STT_PRELOAD_TIERS", DEFAULT_TIER).split(",") if t.strip()]
+
+
+def route_tier(tier: Optional[str] = None, duration: float = 0.0, channel: Optional[str] = None) -> str:
+    """
+    Tier for a request: an explicit tier wins, then the channel ("realtime"
+    audio from live calls, "batch" offline jobs), then clip length
+    """
+    if tier:
+        if tier not in WHISPER_TIERS:
+            raise ValueError(f"Unknown STT tier: {tier} (expected one of {', '.join(WHISPER_TIERS)})")
+        return tier
+    if channel == "realtime":
+        return "realtime"
+    if channel == "batch":
+        return DEFAULT_TIER
+    return "realtime" if duration <= REALTIME_TIER_MAX_SECONDS else DEFAULT_TIER
+
+
+def pack_speech_windows(regions: List[Tuple[float, float]], max_seconds: float) -> List[Tuple[float, float]]:
+    """
+    Pack speech regions (start, end seconds, in order) into decode windows
+    
+    Neighbouring regions share a window while it spans at most max_seconds,
+    so windows start and end at speech boundaries; a region longer than
+    max_seconds is cut into max_seconds pieces.
+    """
+    windows: List[Tuple[float, float]] = []
+    for start, end in regions:
+        while end - start > max_seconds:
+            windows.append((start, start + max_seconds))
+            start += max_seconds
+        if windows and end - windows[-1][0] <= max_seconds and start >= windows[-1][1]:
+            windows[-1] = (windows[-1][0], end)
+        else:
+            windows.append((start, end))
+    return windows
+
+
+def overlap_forced_cuts(windows: List[Tuple[float, float]], overlap: float) -> List[Tuple[float, float]]:
+    """Start each window that begins exactly where the previous one ended (a cut inside speech) overlap seconds early"""
+    overlapped = windows[:1]
+    for (_, previous_end), (start, end) in zip(windows, windows[1:]):
+        if start - previous_end < 1e-3:
+            start = max(start - overlap, 0.0)
+        overlapped.append((start, end))
+    return overlapped
+
+
+def stitch_segments(windows: List[List[Dict[str, Any]]], seam_words: int = LONG_FORM_SEAM_WORDS) -> List[Dict[str, Any]]:
+    """
+    Join the segments of consecutive windows (stream timestamps, window order)
+    
+    Overlapping windows decode the same speech twice: a segment ending before
+    the previous window's last segment is dropped, and words that open a
+    window and repeat the tail of the text before it are removed.
+    """
+    normalize = lambda word: word.lower().strip(string.punctuation)
+    stitched: List[Dict[str, Any]] = []
+    
+    for segments in windows:
+        if stitched:
+            seam = stitched[-1]["end"]
+            segments = [segment for segment in segments if segment["end"] > seam + 0.05]
+        if stitched and segments:
+            tail = [normalize(w) for w in " ".join(s["text"] for s in stitched[-2:]).split()]
+            words = segments[0]["text"].split()
+            repeated = next(
+                (k for k in range(min(seam_words, len(tail), len(words)), 0, -1)
+                 if tail[-k:] == [normalize(w) for w in words[:k]]),
+                0
+            )
+            if repeated:
+                first = {**segments[0], "start": max(segments[0]["start"], seam), "text": " ".join(words[repeated:])}
+                segments = ([first] if first["text"] else []) + segments[1:]
+        stitched.extend(segments)
+    
+    return stitched
+
+
 @dataclass
 class STTResult:
     """STT result structure"""
@@ -32,49 +162,310 @@ class STTResult:
     duration: float
     segments: List[Dict[str, Any]]
 
+class StreamingTranscriber:
+    """
+    Incremental transcription of one audio stream
+    
+    Frames are appended to a rolling buffer that starts where the last
+    committed word ended. Every decode_interval seconds of new audio the
+    buffer is re-decoded with word timestamps, and the words two consecutive
+    hypotheses agree on (the stable prefix) are committed. After
+    endpoint_silence of trailing silence, or when the stream ends, the whole
+    hypothesis is committed. Committed audio is cut from the buffer, and a
+    buffer past max_buffer_seconds commits all but its last word, so one
+    decode never covers more than about max_buffer_seconds of audio however
+    long the call runs.
+    
+    model is anything with WhisperModel.transcribe()'s interface and word
+    timestamps, so a stub can stand in for Whisper.
+    """
+    
+    def __init__(
+        self,
+        model: Any,
+        language: str = "en",
+        beam_size: int = 5,
+        decode_interval: float = STREAM_DECODE_INTERVAL,
+        max_buffer_seconds: float = STREAM_MAX_BUFFER_SECONDS,
+        endpoint_silence: float = STREAM_ENDPOINT_SILENCE
+    ):
+        self.model = model
+        self.language = language
+        self.beam_size = beam_size
+        self.decode_interval = decode_interval
+        self.max_buffer_seconds = max_buffer_seconds
+        self.endpoint_silence = endpoint_silence
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0.0  # Stream time of buffer[0] in seconds (end of the last committed word)
+        self.pending = 0  # Samples appended since the last decode
+        self.silence = 0.0  # Seconds of trailing silence
+        self.hypothesis: List[Dict[str, Any]] = []  # Uncommitted words of the last decode
+        self.prompt = ""  # Tail of the committed text
+        self.decodes = 0
+        self.last_fed = time.time()
+        self.tier: Optional[WhisperTier] = None  # Set by STTService for per-tier metrics
+    
+    @property
+    def duration(self) -> float:
+        """Seconds of audio fed so far"""
+        return self.buffer_start + len(self.buffer) / WHISPER_SAMPLE_RATE
+    
+    def feed(self, audio: np.ndarray, final: bool = False) -> Dict[str, Any]:
+        """
+        Append a frame of 16kHz float32 audio, re-decoding the buffer if due
+        
+        Returns the segments committed by this frame (usually none), the
+        unstable tail of the current hypothesis, and whether the frame
+        carried speech.
+        """
+        self.last_fed = time.time()
+        self.buffer = np.concatenate([self.buffer, audio.astype(np.float32, copy=False)])
+        self.pending += len(audio)
+        speech = len(audio) > 0 and float(np.sqrt(np.mean(np.square(audio)))) >= STREAM_SILENCE_RMS
+        self.silence = 0.0 if speech else self.silence + len(audio) / WHISPER_SAMPLE_RATE
+        
+        segments = []
+        endpoint = final or (self.silence >= self.endpoint_silence and bool(self.hypothesis))
+        if self.silence * WHISPER_SAMPLE_RATE >= len(self.buffer) and not self.hypothesis:
+            # Nothing but silence since the last commit: no need to run the model
+            self._trim(self.duration - self.decode_interval)
+        elif self.pending >= self.decode_interval * WHISPER_SAMPLE_RATE or endpoint:
+            words = self._decode()
+            if endpoint:
+                stable = len(words)
+            else:
+                stable = self._agreed(self.hypothesis, words)
+                if stable == 0 and len(self.buffer) > self.max_buffer_seconds * WHISPER_SAMPLE_RATE:
+                    stable = max(len(words) - 1, 0)
+            self.hypothesis = words[stable:]
+            if stable:
+                segments.append(self._commit(words[:stable]))
+            elif not words:
+                # Nothing recognised: keep only a tail in which a word may be starting
+                self._trim(self.duration - self.decode_interval)
+        
+        return {
+            "segments": segments,
+            "unstable_text": "".join(w["word"] for w in self.hypothesis).strip(),
+            "speech": speech
+        }
+    
+    def _decode(self) -> List[Dict[str, Any]]:
+        """Decode the whole buffer; words with stream timestamps, minus any already committed"""
+        self.pending = 0
+        self.decodes += 1
+        segments, _ = self.model.transcribe(
+            self.buffer,
+            language=self.language if self.language != "auto" else None,
+            beam_size=self.beam_size,
+            word_timestamps=True,
+            initial_prompt=self.prompt or None,
+            condition_on_previous_text=False,
+            vad_filter=False
+        )
+        
+        words = []
+        for segment in segments:
+            for word in segment.words or []:
+                end = self.buffer_start + word.end
+                if end <= self.buffer_start + 0.05:
+                    continue  # Tail of a word committed before the cut
+                words.append({
+                    "start": self.buffer_start + word.start,
+                    "end": end,
+                    "word": word.word,
+                    "probability": word.probability
+                })
+        return words
+    
+    @staticmethod
+    def _agreed(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> int:
+        """Length of the common word prefix of two hypotheses (case and punctuation ignored)"""
+        normalize = lambda w: w["word"].strip().lower().strip(string.punctuation)
+        count = 0
+        for before, now in zip(previous, current):
+            if normalize(before) != normalize(now):
+                break
+            count += 1
+        return count
+    
+    def _commit(self, words: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Turn words into a committed segment and cut their audio from the buffer"""
+        text = "".join(w["word"] for w in words).strip()
+        self.prompt = (self.prompt + " " + text).strip()[-STREAM_PROMPT_CHARS:]
+        self._trim(words[-1]["end"])
+        return {
+            "start": words[0]["start"],
+            "end": words[-1]["end"],
+            "text": text,
+            "confidence": sum(w["probability"] for w in words) / len(words)
+        }
+    
+    def _trim(self, until: float):
+        """Drop buffered audio before stream time until"""
+        cut = int(round((until - self.buffer_start) * WHISPER_SAMPLE_RATE))
+        if cut <= 0:
+            return
+        cut = min(cut, len(self.buffer))
+        self.buffer = self.buffer[cut:]
+        self.buffer_start += cut / WHISPER_SAMPLE_RATE
+
+
 class STTService:
     """Real STT service using faster-whisper"""
     
-    def __init__(self):
-        """Initialize STT service with real Whisper model"""
-        self.model = None
+    def __init__(self, model: Any = None, cache: Optional[TranscriptionCache] = None):
+        """
+        Initialize STT service with real Whisper model
+        
+        Args:
+            model: Use this instead of loading Whisper (anything with
+                WhisperModel.transcribe()'s interface, e.g. a stub in tests)
+            cache: Result cache (default: configured from STT_CACHE_* variables)
+        """
+        self.cache = cache if cache is not None else TranscriptionCache.from_env()
+        self.stub = model
+        self.models: Dict[str, Any] = {}  # Loaded tiers by name (None: failed to load)
+        self.replicas: Dict[str, int] = {}  # CTranslate2 replicas of each loaded tier
+        self.expanded: set = set()  # Tiers already reloaded for long-form decoding
+        self.tier_stats: Dict[str, Dict[str, Any]] = {
+            name: {"load_s": None, "load_error": None, "requests": 0, "audio_seconds": 0.0, "decode_seconds": 0.0}
+            for name in WHISPER_TIERS
+        }
         self.model_loaded = False
+        self.streams: Dict[str, StreamingTranscriber] = {}  # Realtime streams by session id
+        self.vad: Any = None  # VADService, loaded by the first long-form request
         
-        if WHISPER_AVAILABLE:
-            try:
-                import torch
-                device = "cuda" if torch.cuda.is_available() else "cpu"
-                compute_type = "float16" if device == "cuda" else "int8"
-                
-                print(f"[STT] Loading Whisper model on {device}...", file=sys.stderr, flush=True)
-                self.model = WhisperModel(
-                    "large-v3",
-                    device=device,
-                    compute_type=compute_type,
-                    download_root=os.environ.get('HF_HOME', '/tmp/ml-cache')
-                )
-                self.model_loaded = True
-                print(f"[STT] ✓ Whisper-large-v3 loaded successfully on {device}", file=sys.stderr, flush=True)
-            except Exception as e:
-                print(f"[STT] ❌ Failed to load Whisper: {e}", file=sys.stderr, flush=True)
-                self.model_loaded = False
+        if model is not None:
+            self.model_loaded = True
+        elif WHISPER_AVAILABLE:
+            # Other tiers load on their first request
+            for name in PRELOAD_TIERS:
+                self._tier(name)
+            self.model_loaded = not PRELOAD_TIERS or any(self.models.values())
         else:
             print("[STT] ❌ faster-whisper not available", file=sys.stderr, flush=True)
     
-    def transcribe(self, audio_bytes: bytes, language: str = "en") -> Dict[str, Any]:
+    @property
+    def model(self) -> Any:
+        """The default tier's model, if loaded"""
+        return self.stub if self.stub is not None else self.models.get(DEFAULT_TIER)
+    
+    def _tier(self, name: str) -> Tuple[WhisperTier, Any]:
+        """
+        A tier and its model, loading it on first use
+        
+        A tier whose model fails to load is served by the default tier instead.
+        """
+        tier = WHISPER_TIERS[name]
+        if self.stub is not None:
+            return tier, self.stub
+        if name not in self.models:
+            self.models[name] = self._load_model(tier)
+        if self.models[name] is None and name != DEFAULT_TIER:
+            return self._tier(DEFAULT_TIER)
+        return tier, self.models[name]
+    
+    def _with_replicas(self, tier: WhisperTier) -> Any:
+        """
+        The tier's model with its long-form decode replicas
+        
+        Tiers load with one replica, which is all that single-clip, batched
+        and streaming requests use. The first long-form request reloads the
+        model with tier.replicas (once; a failed reload falls back to one),
+        so pooled workers that never see long recordings never hold them.
+        """
+        if self.stub is None and tier.replicas > 1 and tier.name not in self.expanded:
+            self.expanded.add(tier.name)
+            # Drop the single-replica model first so both are never resident at once
+            self.models.pop(tier.name, None)
+            self.models[tier.name] = self._load_model(tier, tier.replicas) or self._load_model(tier)
+        return self._tier(tier.name)[1]
+    
+    def _load_model(self, tier: WhisperTier, replicas: int = 1) -> Any:
+        """Load a tier's WhisperModel; None on failure"""
+        if not WHISPER_AVAILABLE:
+            return None
+        
+        started = time.time()
+        try:
+            import torch
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+            compute_type = "float16" if device == "cuda" else "int8"
+            thread_budget = int(os.environ.get("OMP_NUM_THREADS", "0"))
+            
+            print(f"[STT] Loading Whisper {tier.model} ({tier.name} tier, {replicas} replicas) on {device}...", file=sys.stderr, flush=True)
+            model = WhisperModel(
+                tier.model,
+                device=device,
+                compute_type=compute_type,
+                # CTranslate2 threads: the worker pool's per-worker budget, if any,
+                # split between the replicas that decode long-form windows in parallel
+                cpu_threads=max(1, thread_budget // replicas) if device == "cpu" and thread_budget else 0,
+                num_workers=replicas,
+                download_root=os.environ.get('HF_HOME', '/tmp/ml-cache')
+            )
+            print(f"[STT] ✓ Whisper-{tier.model} loaded successfully on {device}", file=sys.stderr, flush=True)
+        except Exception as e:
+            print(f"[STT] ❌ Failed to load Whisper {tier.model}: {e}", file=sys.stderr, flush=True)
+            self.tier_stats[tier.name]["load_error"] = str(e)
+            return None
+        
+        self.tier_stats[tier.name]["load_s"] = time.time() - started
+        self.replicas[tier.name] = replicas
+        return model
+    
+    def _record(self, tier: WhisperTier, audio_seconds: float, decode_seconds: float, requests: int = 1):
+        """Count requests served by a tier"""
+        stats = self.tier_stats[tier.name]
+        stats["requests"] += requests
+        stats["audio_seconds"] += audio_seconds
+        stats["decode_seconds"] += decode_seconds
+    
+    def warm_up(self):
+        """
+        Run one throwaway inference so the first real request does not pay
+        for CUDA kernel selection and allocator growth
+        
+        Uses a second of faint noise with the VAD filter off: pure silence
+        would be filtered out before the decoder ever ran. Every tier loaded
+        so far is warmed; lazily loaded tiers pay on their first request.
+        """
+        if not self.model_loaded:
+            return
+        
+        noise = np.random.default_rng(0).normal(0.0, 0.01, 16000).astype(np.float32)
+        for name in [DEFAULT_TIER] if self.stub is not None else [n for n, m in self.models.items() if m is not None]:
+            tier, model = self._tier(name)
+            segments, _ = model.transcribe(noise, language="en", beam_size=tier.beam_size, vad_filter=False)
+            for _ in segments:
+                pass
+    
+    def transcribe(
+        self,
+        audio_bytes: bytes,
+        language: str = "en",
+        on_segment: Optional[Callable[[Dict[str, Any], str], None]] = None,
+        tier: Optional[str] = None,
+        channel: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Transcribe audio using real Whisper model
         
         Args:
             audio_bytes: Audio data (WAV format)
             language: Language code (e.g., 'en', 'es', 'fr')
+            on_segment: Optional callback called with each segment and the
+                text so far as Whisper decodes them (partial hypotheses)
+            tier: Model tier ("realtime" or "accurate"; default: route_tier)
+            channel: "realtime" or "batch", used for routing without a tier
         
         Returns:
             Dictionary with transcription results
         """
         start_time = time.time()
         
-        if not self.model_loaded or not self.model:
+        if not self.model_loaded:
             return {
                 "text": "STT model not loaded. Please check faster-whisper installation.",
                 "language": language,
@@ -85,24 +476,30 @@ class STTService:
             }
         
         try:
-            # Convert audio bytes to numpy array
-            # Handle WAV format
-            audio_io = io.BytesIO(audio_bytes)
-            try:
-                with wave.open(audio_io, 'rb') as wav_file:
-                    sample_rate = wav_file.getframerate()
-                    frames = wav_file.readframes(wav_file.getnframes())
-                    audio_array = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
-            except:
-                # If not WAV, try direct numpy conversion
-                audio_array = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-                sample_rate = 16000  # Default
+            audio_array, sample_rate = self._load_audio(audio_bytes)
+            duration = len(audio_array) / sample_rate if sample_rate > 0 else 0.0
+            whisper_tier, model = self._tier(route_tier(tier, duration, channel))
+            cache_key = self.cache.key(
+                audio_array,
+                sample_rate=sample_rate,
+                language=language,
+                model=whisper_tier.model,
+                beam_size=whisper_tier.beam_size,
+                vad=True
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if on_segment:
+                    for index, segment in enumerate(cached["segments"]):
+                        on_segment(segment, " ".join(s["text"] for s in cached["segments"][:index + 1]))
+                return {**cached, "cached": True, "tier": whisper_tier.name, "processing_time": time.time() - start_time}
             
             # Transcribe with Whisper
-            segments, info = self.model.transcribe(
+            decode_start = time.time()
+            segments, info = model.transcribe(
                 audio_array,
                 language=language if language != "auto" else None,
-                beam_size=5,
+                beam_size=whisper_tier.beam_size,
                 vad_filter=True,
                 vad_parameters=dict(min_silence_duration_ms=500)
             )
@@ -112,29 +509,27 @@ class STTService:
             full_text_parts = []
             
             for segment in segments:
-                segment_dict = {
-                    "start": segment.start,
-                    "end": segment.end,
-                    "text": segment.text.strip(),
-                    "confidence": getattr(segment, 'avg_logprob', 0.9) if hasattr(segment, 'avg_logprob') else 0.9
-                }
+                segment_dict = self._segment_dict(segment)
                 segment_list.append(segment_dict)
                 full_text_parts.append(segment.text.strip())
+                if on_segment:
+                    on_segment(segment_dict, " ".join(full_text_parts))
             
             full_text = " ".join(full_text_parts)
-            duration = len(audio_array) / sample_rate if sample_rate > 0 else 0.0
+            self._record(whisper_tier, duration, time.time() - decode_start)
             avg_confidence = sum(s["confidence"] for s in segment_list) / len(segment_list) if segment_list else 0.0
             
             detected_language = info.language if hasattr(info, 'language') else language
             
-            return {
+            result = {
                 "text": full_text,
                 "language": detected_language,
                 "confidence": avg_confidence,
                 "duration": duration,
-                "segments": segment_list,
-                "processing_time": time.time() - start_time
+                "segments": segment_list
             }
+            self.cache.put(cache_key, result)
+            return {**result, "cached": False, "tier": whisper_tier.name, "processing_time": time.time() - start_time}
             
         except Exception as e:
             print(f"[STT] Transcription error: {e}", file=sys.stderr, flush=True)
@@ -149,6 +544,540 @@ class STTService:
                 "error": str(e),
                 "processing_time": time.time() - start_time
             }
+    
+    def transcribe_chunk(
+        self,
+        stream_id: str,
+        audio_bytes: bytes,
+        language: str = "en",
+        sequence: int = 0,
+        final: bool = False,
+        tier: Optional[str] = None,
+        return_partial: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Feed one frame of a realtime stream and report what changed
+        
+        Each stream_id keeps its own StreamingTranscriber. While words are
+        still unstable the result is a partial (is_partial, text = current
+        hypothesis); a frame that commits words returns them as segments with
+        is_partial false. final ends the stream, committing everything left.
+        With return_partial false a partial result has empty text, so only
+        committed words are ever reported as text.
+        Streams decode on the realtime tier unless their first frame names
+        another.
+        
+        Args:
+            stream_id: Stream (call session) the frame belongs to
+            audio_bytes: Raw PCM16 at 16kHz (or a WAV chunk); may be empty with final
+            language: Language code, fixed by the stream's first frame
+            sequence: Frame number, echoed back
+            final: Commit the remaining hypothesis and drop the stream
+            tier: Model tier, fixed by the stream's first frame
+            return_partial: Report the unstable hypothesis as text of partial results
+        
+        Returns:
+            Dictionary with text, is_partial, segments (newly committed),
+            unstable_text and vad_active
+        """
+        start_time = time.time()
+        self._expire_streams(start_time)
+        
+        if not self.model_loaded:
+            return {
+                "text": "",
+                "language": language,
+                "confidence": 0.0,
+                "duration": 0.0,
+                "segments": [],
+                "is_partial": False,
+                "vad_active": False,
+                "sequence": sequence,
+                "error": "Model not available"
+            }
+        
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            whisper_tier, model = self._tier(route_tier(tier, channel="realtime"))
+            stream = self.streams[stream_id] = StreamingTranscriber(model, language, beam_size=whisper_tier.beam_size)
+            stream.tier = whisper_tier
+        audio_array = self._load_audio(bytes(audio_bytes))[0] if len(audio_bytes) else np.zeros(0, dtype=np.float32)
+        
+        try:
+            decodes = stream.decodes
+            decode_start = time.time()
+            update = stream.feed(audio_array, final)
+            if stream.decodes > decodes:
+                self._record(stream.tier, len(stream.buffer) / WHISPER_SAMPLE_RATE, time.time() - decode_start)
+        except Exception as e:
+            print(f"[STT] Streaming decode error on {stream_id}: {e}", file=sys.stderr, flush=True)
+            self.streams.pop(stream_id, None)
+            raise
+        if final:
+            del self.streams[stream_id]
+        
+        segments = update["segments"]
+        return {
+            "text": " ".join(s["text"] for s in segments) if segments else update["unstable_text"] if return_partial else "",
+            "language": language,
+            "confidence": sum(s["confidence"] for s in segments) / len(segments) if segments else 0.0,
+            "duration": stream.duration,
+            "segments": segments,
+            "is_partial": not segments,
+            "unstable_text": update["unstable_text"],
+            "vad_active": update["speech"],
+            "sequence": sequence,
+            "buffer_seconds": len(stream.buffer) / WHISPER_SAMPLE_RATE,
+            "tier": stream.tier.name,
+            "processing_time": time.time() - start_time
+        }
+    
+    def _expire_streams(self, now: float):
+        """Forget streams that stopped sending frames without a final one"""
+        for stream_id in [i for i, s in self.streams.items() if now - s.last_fed > STREAM_IDLE_SECONDS]:
+            del self.streams[stream_id]
+    
+    def transcribe_clips(
+        self,
+        clips: List[bytes],
+        language: str = "en",
+        tier: Optional[str] = None,
+        channel: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Transcribe several short clips with one batched inference call
+        
+        Each clip is padded to its own 30s Whisper window, and the windows go
+        through the encoder and decoder as one batch (_decode_windows), so
+        no clip's audio or text can end up in another clip's transcript.
+        
+        Clips found in the result cache are left out of the batch. The whole
+        batch runs on one tier, routed by its longest clip.
+        Falls back to sequential transcribe() when batched decoding is not
+        available (faster-whisper < 1.2, or a stub model), when a clip exceeds
+        the 30s Whisper window, or when the batched call fails.
+        
+        Args:
+            clips: Audio clips (WAV or raw PCM16 at 16kHz)
+            language: Language code shared by every clip in the batch
+                ("auto" detects it per clip)
+            tier: Model tier shared by every clip (default: route_tier)
+            channel: "realtime" or "batch", used for routing without a tier
+        
+        Returns:
+            One transcribe()-style result per clip, in input order
+        """
+        sequential = lambda name: [self.transcribe(clip, language, tier=name) for clip in clips]
+        if len(clips) <= 1 or not self.model_loaded:
+            return [self.transcribe(clip, language, tier=tier, channel=channel) for clip in clips]
+        
+        start_time = time.time()
+        loaded = [self._load_audio(clip) for clip in clips]
+        arrays = [array for array, _ in loaded]
+        whisper_tier, model = self._tier(route_tier(tier, max(len(a) for a in arrays) / WHISPER_SAMPLE_RATE, channel))
+        if (
+            self.stub is not None
+            or not BATCHED_DECODE_AVAILABLE
+            or any(len(a) > MAX_BATCH_CLIP_SECONDS * WHISPER_SAMPLE_RATE for a in arrays)
+        ):
+            return sequential(whisper_tier.name)
+        
+        keys = [
+            self.cache.key(
+                array,
+                sample_rate=sample_rate,
+                language=language,
+                model=whisper_tier.model,
+                beam_size=whisper_tier.beam_size,
+                vad=False
+            )
+            for array, sample_rate in loaded
+        ]
+        cached = [self.cache.get(key) for key in keys]
+        batch = [i for i, array in enumerate(arrays) if len(array) > 0 and cached[i] is None]
+        decoded: Dict[int, Tuple[List[Dict[str, Any]], str]] = {}
+        
+        try:
+            if batch:
+                decoded = dict(zip(batch, self._decode_windows(model, [arrays[i] for i in batch], language, whisper_tier.beam_size)))
+                self._record(whisper_tier, sum(len(arrays[i]) for i in batch) / WHISPER_SAMPLE_RATE, time.time() - start_time, len(batch))
+        except Exception as e:
+            print(f"[STT] Batched transcription failed, decoding sequentially: {e}", file=sys.stderr, flush=True)
+            return sequential(whisper_tier.name)
+        
+        processing_time = time.time() - start_time
+        results = []
+        
+        for i, array in enumerate(arrays):
+            if cached[i] is not None:
+                results.append({**cached[i], "cached": True, "tier": whisper_tier.name, "processing_time": processing_time, "batch_size": len(clips)})
+                continue
+            segment_list, detected_language = decoded.get(i, ([], language))
+            result = {
+                "text": " ".join(s["text"] for s in segment_list),
+                "language": detected_language,
+                "confidence": sum(s["confidence"] for s in segment_list) / len(segment_list) if segment_list else 0.0,
+                "duration": len(array) / WHISPER_SAMPLE_RATE,
+                "segments": segment_list
+            }
+            self.cache.put(keys[i], result)
+            results.append({**result, "cached": False, "tier": whisper_tier.name, "processing_time": processing_time, "batch_size": len(clips)})
+        
+        return results
+    
+    def transcribe_batch(
+        self,
+        files: List[bytes],
+        language: str = "en",
+        batch_size: int = 16,
+        tier: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Transcribe many recordings with batched inference over their speech
+        
+        Each file is cut at VAD boundaries (faster-whisper's Silero VAD) into
+        speech windows of at most 30s, so a window never holds audio from two
+        files. The windows of all files are decoded batch_size at a time
+        (_decode_windows), and each window's segments are shifted back to its
+        file. Silence is never decoded, and short calls fill batches
+        alongside long ones.
+        
+        Falls back to sequential transcribe() when batched decoding is not
+        available (faster-whisper < 1.2, or a stub model) or a batch fails.
+        
+        Args:
+            files: Recordings (WAV or raw PCM16 at 16kHz)
+            language: Language code shared by every file ("auto" detects it
+                per window; a file reports its first window's)
+            batch_size: Windows per inference call
+            tier: Model tier (default: the batch channel's, "accurate")
+        
+        Returns:
+            Dictionary with one transcribe()-style result per file (in input
+            order) under "results", and the batch's throughput
+        """
+        start_time = time.time()
+        arrays = [self._load_audio(audio)[0] for audio in files]
+        windows = 0
+        whisper_tier, model = self._tier(route_tier(tier, channel="batch")) if self.model_loaded else (WHISPER_TIERS[DEFAULT_TIER], None)
+        sequential = lambda: [self.transcribe(audio, language, tier=whisper_tier.name) for audio in files]
+        
+        if not self.model_loaded or self.stub is not None or not BATCHED_DECODE_AVAILABLE:
+            results = sequential()
+        else:
+            # (file index, start seconds, audio) of every speech window
+            items = [
+                (i, start, array[int(start * WHISPER_SAMPLE_RATE):int(end * WHISPER_SAMPLE_RATE)])
+                for i, array in enumerate(arrays)
+                for start, end in self._speech_windows(array)
+            ]
+            windows = len(items)
+            
+            per_file: List[List[Dict[str, Any]]] = [[] for _ in files]
+            languages: List[Optional[str]] = [None for _ in files]
+            try:
+                for first in range(0, len(items), max(1, batch_size)):
+                    group = items[first:first + max(1, batch_size)]
+                    decoded = self._decode_windows(model, [audio for _, _, audio in group], language, whisper_tier.beam_size)
+                    for (i, offset, _), (segment_list, detected_language) in zip(group, decoded):
+                        per_file[i].extend({**s, "start": s["start"] + offset, "end": s["end"] + offset} for s in segment_list)
+                        languages[i] = languages[i] or detected_language
+            except Exception as e:
+                print(f"[STT] Batched transcription failed, decoding sequentially: {e}", file=sys.stderr, flush=True)
+                results = sequential()
+            else:
+                if items:
+                    self._record(whisper_tier, sum(len(a) for a in arrays) / WHISPER_SAMPLE_RATE, time.time() - start_time, len(files))
+                processing_time = time.time() - start_time
+                results = [
+                    {
+                        "text": " ".join(s["text"] for s in segment_list),
+                        "language": detected_language or language,
+                        "confidence": sum(s["confidence"] for s in segment_list) / len(segment_list) if segment_list else 0.0,
+                        "duration": len(array) / WHISPER_SAMPLE_RATE,
+                        "segments": segment_list,
+                        "processing_time": processing_time
+                    }
+                    for array, segment_list, detected_language in zip(arrays, per_file, languages)
+                ]
+        
+        audio_seconds = sum(len(array) for array in arrays) / WHISPER_SAMPLE_RATE
+        wall_seconds = time.time() - start_time
+        return {
+            "results": results,
+            "files": len(files),
+            "windows": windows,
+            "batch_size": batch_size,
+            "tier": whisper_tier.name,
+            "audio_seconds": audio_seconds,
+            "wall_seconds": wall_seconds,
+            "audio_hours_per_wall_hour": audio_seconds / wall_seconds if wall_seconds > 0 else 0.0
+        }
+    
+    def transcribe_long(
+        self,
+        audio_bytes: bytes,
+        language: str = "en",
+        window_seconds: float = LONG_FORM_WINDOW_SECONDS,
+        parallelism: Optional[int] = None,
+        tier: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Transcribe a long recording as parallel windows cut at silences
+        
+        VADService.detect_speech finds the speech; neighbouring speech is
+        packed into windows of at most window_seconds, which are decoded
+        parallelism at a time on threads (WhisperModel runs that many
+        replicas). Timestamps are shifted back to the recording, and text
+        decoded twice where a window had to be cut inside speech is removed
+        at the seam. Without a VAD model the recording is cut into
+        overlapping fixed windows instead.
+        
+        Args:
+            audio_bytes: Audio data (WAV or raw PCM16 at 16kHz)
+            language: Language code (e.g., 'en', 'es', 'fr')
+            window_seconds: Longest window decoded in one piece
+            parallelism: Windows decoded at once (default: the model's replicas)
+            tier: Model tier (default: the batch channel's, "accurate")
+        
+        Returns:
+            transcribe()-style dictionary, plus the number of windows
+        """
+        start_time = time.time()
+        
+        if not self.model_loaded:
+            return self.transcribe(audio_bytes, language, tier=tier, channel="batch")
+        
+        whisper_tier, _ = self._tier(route_tier(tier, channel="batch"))
+        audio_array, sample_rate = self._load_audio(audio_bytes)
+        cache_key = self.cache.key(
+            audio_array,
+            sample_rate=sample_rate,
+            language=language,
+            model=whisper_tier.model,
+            beam_size=whisper_tier.beam_size,
+            long_form=window_seconds
+        )
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            parallelism = parallelism or self.replicas.get(whisper_tier.name, whisper_tier.replicas)
+            return {**cached, "cached": True, "tier": whisper_tier.name, "parallelism": parallelism, "processing_time": time.time() - start_time}
+        
+        duration = len(audio_array) / sample_rate if sample_rate > 0 else 0.0
+        model = self._with_replicas(whisper_tier)
+        parallelism = parallelism or self.replicas.get(whisper_tier.name, whisper_tier.replicas)
+        regions, vad_failed = self._speech_regions(audio_bytes, audio_array, duration)
+        windows = overlap_forced_cuts(pack_speech_windows(regions, window_seconds), LONG_FORM_OVERLAP_SECONDS)
+        
+        def decode(window: Tuple[float, float]) -> List[Dict[str, Any]]:
+            start, end = window
+            segments, _ = model.transcribe(
+                audio_array[int(start * sample_rate):int(end * sample_rate)],
+                language=language if language != "auto" else None,
+                beam_size=whisper_tier.beam_size,
+                vad_filter=False,
+                condition_on_previous_text=False
+            )
+            return [self._segment_dict(segment, offset=-start) for segment in segments]
+        
+        try:
+            decode_start = time.time()
+            with ThreadPoolExecutor(max_workers=max(1, parallelism), thread_name_prefix="stt-window") as executor:
+                per_window = list(executor.map(decode, windows))
+            self._record(whisper_tier, duration, time.time() - decode_start)
+        except Exception as e:
+            print(f"[STT] Long-form transcription error: {e}", file=sys.stderr, flush=True)
+            import traceback
+            traceback.print_exc(file=sys.stderr)
+            return {
+                "text": "",
+                "language": language,
+                "confidence": 0.0,
+                "duration": duration,
+                "segments": [],
+                "error": str(e),
+                "processing_time": time.time() - start_time
+            }
+        
+        segment_list = stitch_segments(per_window)
+        result = {
+            "text": " ".join(s["text"] for s in segment_list),
+            "language": language,
+            "confidence": sum(s["confidence"] for s in segment_list) / len(segment_list) if segment_list else 0.0,
+            "duration": duration,
+            "segments": segment_list,
+            "windows": len(windows)
+        }
+        if vad_failed:
+            # Fixed windows stood in for a failed VAD; a later request may get real speech regions
+            result["vad_fallback"] = True
+        else:
+            self.cache.put(cache_key, result)
+        return {**result, "cached": False, "tier": whisper_tier.name, "parallelism": parallelism, "processing_time": time.time() - start_time}
+    
+    def _speech_regions(self, audio_bytes: bytes, audio: np.ndarray, duration: float) -> Tuple[List[Tuple[float, float]], bool]:
+        """
+        Speech (start, end) in seconds from VADService, and whether the VAD failed
+        
+        The whole recording (cut into fixed windows) stands in when no VAD
+        model loads, when detection raises, or when it finds no speech in
+        audio that is not silent: VADService.detect_speech returns no
+        segments on internal errors.
+        """
+        whole = [(0.0, duration)] if duration > 0 else []
+        if self.vad is None:
+            try:
+                from vad_service import VADService
+                self.vad = VADService()
+            except Exception as e:
+                print(f"[STT] VAD unavailable, using fixed windows: {e}", file=sys.stderr, flush=True)
+                self.vad = False
+        
+        if not self.vad or not self.vad.model_loaded:
+            return whole, False
+        
+        try:
+            regions = [(segment["start"], segment["end"]) for segment in self.vad.detect_speech(audio_bytes)]
+        except Exception as e:
+            print(f"[STT] VAD failed, using fixed windows: {e}", file=sys.stderr, flush=True)
+            return whole, True
+        if not regions and len(audio) and float(np.sqrt(np.mean(np.square(audio)))) >= LONG_FORM_SILENCE_RMS:
+            print("[STT] VAD found no speech in audible audio, using fixed windows", file=sys.stderr, flush=True)
+            return whole, True
+        return regions, False
+    
+    @staticmethod
+    def _decode_windows(model: Any, windows: List[np.ndarray], language: str, beam_size: int) -> List[Tuple[List[Dict[str, Any]], str]]:
+        """
+        Decode 16kHz windows of at most 30s as one batch; (segments, language) per window
+        
+        Each window is padded to the 30s Whisper input on its own, so the
+        encoder and decoder see one batch item per window. Segment times are
+        relative to the window's start. With language "auto", a multilingual
+        model detects the language of each window separately.
+        """
+        extractor = model.feature_extractor
+        features = np.stack([
+            extractor(np.pad(window, (0, max(extractor.n_samples - len(window), 0))))[:, :extractor.nb_max_frames]
+            for window in windows
+        ])
+        encoder_output = model.encode(features)
+        
+        if language == "auto" and model.model.is_multilingual:
+            languages = [probabilities[0][0][2:-2] for probabilities in model.model.detect_language(encoder_output)]
+        else:
+            languages = [language if language != "auto" else "en"] * len(windows)
+        tokenizers = [
+            Tokenizer(model.hf_tokenizer, model.model.is_multilingual, task="transcribe", language=code)
+            for code in languages
+        ]
+        
+        outputs = model.model.generate(
+            encoder_output,
+            [tokenizer.sot_sequence for tokenizer in tokenizers],
+            beam_size=beam_size,
+            max_length=model.max_length,
+            return_scores=True,
+            return_no_speech_prob=True,
+            suppress_blank=True,
+            suppress_tokens=[-1],
+            max_initial_timestamp_index=round(1.0 / model.time_precision)
+        )
+        return [
+            (STTService._timestamped_segments(tokenizer, output, len(window) / WHISPER_SAMPLE_RATE), tokenizer.language_code)
+            for tokenizer, output, window in zip(tokenizers, outputs, windows)
+        ]
+    
+    @staticmethod
+    def _timestamped_segments(tokenizer: Any, output: Any, duration: float) -> List[Dict[str, Any]]:
+        """
+        Split one window's generated tokens into segments at its timestamp tokens
+        
+        A window Whisper judges to be silence (faster-whisper's default
+        no-speech and log-probability thresholds) yields no segments.
+        """
+        tokens = output.sequences_ids[0]
+        avg_logprob = output.scores[0] * len(tokens) / (len(tokens) + 1)
+        if output.no_speech_prob > 0.6 and avg_logprob < -1.0:
+            return []
+        
+        segments = []
+        start, text_tokens = None, []
+        for token in tokens + [None]:
+            if token is not None and token < tokenizer.eot:
+                text_tokens.append(token)
+                continue
+            if token is not None and token < tokenizer.timestamp_begin:
+                continue
+            position = duration if token is None else min((token - tokenizer.timestamp_begin) * 0.02, duration)
+            if text_tokens:
+                text = tokenizer.decode(text_tokens).strip()
+                if text:
+                    segments.append({"start": start or 0.0, "end": max(position, start or 0.0), "text": text, "confidence": avg_logprob})
+                start, text_tokens = None, []
+            else:
+                start = position
+        return segments
+    
+    @staticmethod
+    def _speech_windows(audio: np.ndarray, max_seconds: float = MAX_BATCH_CLIP_SECONDS) -> List[Tuple[float, float]]:
+        """Speech of a 16kHz clip as decode windows of at most max_seconds (seconds)"""
+        try:
+            from faster_whisper.vad import VadOptions, get_speech_timestamps
+        except ImportError:
+            regions = [(0.0, len(audio) / WHISPER_SAMPLE_RATE)] if len(audio) else []
+        else:
+            options = VadOptions(min_silence_duration_ms=500, max_speech_duration_s=max_seconds)
+            regions = [
+                (r["start"] / WHISPER_SAMPLE_RATE, r["end"] / WHISPER_SAMPLE_RATE)
+                for r in get_speech_timestamps(audio, options)
+            ]
+        return pack_speech_windows(regions, max_seconds)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Service-side counters, reported with each result to the worker pool's metrics"""
+        return {
+            "cache": self.cache.get_metrics(),
+            "streams": len(self.streams),
+            "tiers": {
+                name: {
+                    "model": tier.model,
+                    "beam_size": tier.beam_size,
+                    "loaded": self.stub is not None or self.models.get(name) is not None,
+                    "replicas": self.replicas.get(name, 0),
+                    **stats,
+                    "avg_decode_ms": round(stats["decode_seconds"] / stats["requests"] * 1000, 1) if stats["requests"] else 0.0,
+                    "rtf": round(stats["decode_seconds"] / stats["audio_seconds"], 4) if stats["audio_seconds"] else 0.0
+                }
+                for name, stats in self.tier_stats.items()
+                for tier in [WHISPER_TIERS[name]]
+            }
+        }
+    
+    @staticmethod
+    def _load_audio(audio_bytes: bytes):
+        """Convert WAV (or raw PCM16) bytes to a float32 array; returns (array, sample_rate)"""
+        audio_io = io.BytesIO(audio_bytes)
+        try:
+            with wave.open(audio_io, 'rb') as wav_file:
+                sample_rate = wav_file.getframerate()
+                frames = wav_file.readframes(wav_file.getnframes())
+                audio_array = np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+        except:
+            # If not WAV, try direct numpy conversion
+            audio_array = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+            sample_rate = WHISPER_SAMPLE_RATE  # Default
+        return audio_array, sample_rate
+    
+    @staticmethod
+    def _segment_dict(segment, offset: float = 0.0) -> Dict[str, Any]:
+        """Convert a faster-whisper segment, shifting timestamps back by offset seconds"""
+        return {
+            "start": segment.start - offset,
+            "end": segment.end - offset,
+            "text": segment.text.strip(),
+            "confidence": getattr(segment, 'avg_logprob', 0.9) if hasattr(segment, 'avg_logprob') else 0.9
+        }
 
 def main():
     """Main entry point for STT service"""
@@ -0,0 +1,161 @@
+"""
+Batched decoding (STTService.transcribe_clips, transcribe_batch) against a fake Whisper
+
+The fake runs faster-whisper's real feature extractor and tokenizer wrapper.
+Its decoder "hears" how many seconds of noise each batch item holds before the
+30s padding starts, and answers with one timestamped word naming that count.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+from faster_whisper.feature_extractor import FeatureExtractor
+from tokenizers import Tokenizer as HFTokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import WhitespaceSplit
+
+import stt_service
+from stt_service import STTService, WHISPER_SAMPLE_RATE, WHISPER_TIERS
+from transcription_cache import TranscriptionCache
+
+WORDS = [f"w{i}" for i in range(30)]
+EOT, SOT, NO_TIMESTAMPS = len(WORDS), len(WORDS) + 1, len(WORDS) + 2
+TIMESTAMP_BEGIN = NO_TIMESTAMPS + 1
+
+
+def hf_tokenizer():
+    vocab = {word: i for i, word in enumerate(WORDS)}
+    vocab.update({"<|endoftext|>": EOT, "<|startoftranscript|>": SOT, "<|notimestamps|>": NO_TIMESTAMPS, "<unk>": 99})
+    tokenizer = HFTokenizer(WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = WhitespaceSplit()
+    return tokenizer
+
+
+class FakeWhisper:
+    is_multilingual = False
+    max_length = 448
+    time_precision = 0.02
+
+    def __init__(self, fail=False):
+        self.feature_extractor = FeatureExtractor()
+        self.hf_tokenizer = hf_tokenizer()
+        self.model = self
+        self.fail = fail
+        self.batches = []
+        self.sequential = 0
+
+    def encode(self, features):
+        self.batches.append(features.shape)
+        return features
+
+    def generate(self, encoder_output, prompts, **options):
+        if self.fail:
+            raise RuntimeError("decoder crashed")
+        results = []
+        for features in encoder_output:
+            levels = features.mean(axis=0)
+            seconds = round(int(np.sum(levels > levels[-1] + 0.5)) / 100)
+            results.append(SimpleNamespace(
+                sequences_ids=[[TIMESTAMP_BEGIN, seconds, TIMESTAMP_BEGIN + seconds * 50]],
+                scores=[-0.1],
+                no_speech_prob=0.0
+            ))
+        return results
+
+    def transcribe(self, audio, **options):
+        self.sequential += 1
+        segment = SimpleNamespace(start=0.0, end=len(audio) / WHISPER_SAMPLE_RATE, text=" sequential", avg_logprob=-0.1)
+        return iter([segment]), SimpleNamespace(language="en")
+
+
+def pcm(seconds):
+    samples = np.random.default_rng(seconds).normal(0.0, 0.1, int(seconds * WHISPER_SAMPLE_RATE))
+    return (samples * 32767).astype(np.int16).tobytes()
+
+
+def service_for(model):
+    service = STTService(model=model, cache=TranscriptionCache(directory=None, max_disk_mb=0))
+    # Serve the fake as a loaded tier rather than as a stub, so batching applies
+    service.stub = None
+    service.models = {name: model for name in WHISPER_TIERS}
+    return service
+
+
+@pytest.fixture(autouse=True)
+def batched_decode(monkeypatch):
+    monkeypatch.setattr(stt_service, "BATCHED_DECODE_AVAILABLE", True)
+
+
+def test_each_clip_is_its_own_batch_item():
+    model = FakeWhisper()
+    service = service_for(model)
+
+    results = service.transcribe_clips([pcm(3), pcm(1), b"", pcm(2)])
+
+    assert model.batches == [(3, 80, 3000)]
+    assert [result["text"] for result in results] == ["w3", "w1", "", "w2"]
+    assert [result["segments"][-1]["end"] for result in results if result["segments"]] == [3.0, 1.0, 2.0]
+    assert all(result["batch_size"] == 4 and not result["cached"] for result in results)
+    assert model.sequential == 0
+
+
+def test_cached_clips_are_left_out_of_the_batch():
+    model = FakeWhisper()
+    service = service_for(model)
+    service.transcribe_clips([pcm(1), pcm(2)])
+
+    results = service.transcribe_clips([pcm(2), pcm(3)])
+
+    assert model.batches[-1] == (1, 80, 3000)
+    assert [result["cached"] for result in results] == [True, False]
+    assert [result["text"] for result in results] == ["w2", "w3"]
+
+
+def test_failed_batch_falls_back_to_sequential():
+    model = FakeWhisper(fail=True)
+    service = service_for(model)
+
+    results = service.transcribe_clips([pcm(1), pcm(2)])
+
+    assert [result["text"] for result in results] == ["sequential", "sequential"]
+    assert model.sequential == 2
+
+
+def test_old_faster_whisper_decodes_sequentially(monkeypatch):
+    monkeypatch.setattr(stt_service, "BATCHED_DECODE_AVAILABLE", False)
+    model = FakeWhisper()
+    service = service_for(model)
+
+    results = service.transcribe_clips([pcm(1), pcm(2)])
+
+    assert model.batches == []
+    assert model.sequential == 2 and results[0]["text"] == "sequential"
+
+
+def test_batch_windows_stay_within_their_file(monkeypatch):
+    windows = {20 * WHISPER_SAMPLE_RATE: [(0.0, 12.0), (12.0, 20.0)], 3 * WHISPER_SAMPLE_RATE: [(0.0, 3.0)]}
+    monkeypatch.setattr(STTService, "_speech_windows", staticmethod(lambda audio: windows[len(audio)]))
+    model = FakeWhisper()
+    service = service_for(model)
+
+    batch = service.transcribe_batch([pcm(20), pcm(3)], batch_size=2)
+
+    assert model.batches == [(2, 80, 3000), (1, 80, 3000)]
+    assert batch["windows"] == 3
+    assert [result["text"] for result in batch["results"]] == ["w12 w8", "w3"]
+    assert [(s["start"], s["end"]) for s in batch["results"][0]["segments"]] == [(0.0, 12.0), (12.0, 20.0)]
+    assert model.sequential == 0
+
+
+def test_failed_batch_decodes_files_sequentially(monkeypatch):
+    monkeypatch.setattr(STTService, "_speech_windows", staticmethod(lambda audio: [(0.0, len(audio) / WHISPER_SAMPLE_RATE)]))
+    model = FakeWhisper(fail=True)
+    service = service_for(model)
+
+    batch = service.transcribe_batch([pcm(1), pcm(2)])
+
+    assert [result["text"] for result in batch["results"]] == ["sequential", "sequential"]
+    assert model.sequential == 2
@@ -0,0 +1,69 @@
+"""
+Long-form transcription (STTService.transcribe_long) when the VAD misbehaves
+
+A stub model returns one segment per decoded window, and a stub VADService
+returns fixed regions, nothing, or raises.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from stt_service import STTService, WHISPER_SAMPLE_RATE
+from transcription_cache import TranscriptionCache
+
+
+class WindowStub:
+    def transcribe(self, audio, **options):
+        segment = SimpleNamespace(start=0.0, end=len(audio) / WHISPER_SAMPLE_RATE, text=" speech", avg_logprob=-0.1)
+        return iter([segment]), SimpleNamespace(language="en")
+
+
+def vad(detect):
+    return SimpleNamespace(model_loaded=True, detect_speech=detect)
+
+
+def failing(audio_bytes):
+    raise RuntimeError("VAD crashed")
+
+
+def pcm(seconds, level):
+    samples = np.random.default_rng(0).normal(0.0, level, int(seconds * WHISPER_SAMPLE_RATE))
+    return (samples * 32767).astype(np.int16).tobytes()
+
+
+@pytest.fixture
+def service():
+    return STTService(model=WindowStub(), cache=TranscriptionCache(directory=None, max_disk_mb=0))
+
+
+def test_speech_regions_are_decoded_and_cached(service):
+    service.vad = vad(lambda audio_bytes: [{"start": 1.0, "end": 4.0}])
+
+    result = service.transcribe_long(pcm(10, 0.1))
+
+    assert result["text"] == "speech" and result["windows"] == 1
+    assert "vad_fallback" not in result
+    assert service.cache.stores == 1
+
+
+@pytest.mark.parametrize("detect", [lambda audio_bytes: [], failing], ids=["no-regions", "raises"])
+def test_failed_vad_falls_back_to_fixed_windows_uncached(service, detect):
+    service.vad = vad(detect)
+
+    result = service.transcribe_long(pcm(70, 0.1))
+
+    assert result["windows"] == 3
+    assert result["text"]
+    assert result["vad_fallback"] is True
+    assert service.cache.stores == 0
+
+
+def test_silence_without_regions_is_an_empty_transcript(service):
+    service.vad = vad(lambda audio_bytes: [])
+
+    result = service.transcribe_long(pcm(10, 0.0))
+
+    assert result["text"] == "" and result["windows"] == 0
+    assert "vad_fallback" not in result
@@ -0,0 +1,95 @@
+"""
+Streaming transcription (STTService.transcribe_chunk) against a stub model
+
+The stub reads words straight out of the audio: each word is a run of 20ms
+frames at a constant level, silence is zero. A word whose run reaches the
+end of the buffer is still being spoken and comes back as a guess ("uh"),
+so it only becomes stable once its audio is complete.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from stt_service import STTService, WHISPER_SAMPLE_RATE
+from transcription_cache import TranscriptionCache
+
+FRAME = WHISPER_SAMPLE_RATE // 50  # 20ms
+
+
+class WordStub:
+    def transcribe(self, audio, **options):
+        levels = [round(float(np.mean(audio[i:i + FRAME])) * 100) for i in range(0, len(audio) - FRAME + 1, FRAME)]
+        words = []
+        start = None
+        for index, level in enumerate(levels + [0]):
+            if start is not None and level != levels[start]:
+                complete = index < len(levels)
+                words.append(SimpleNamespace(
+                    start=start * 0.02,
+                    end=index * 0.02,
+                    word=f" w{levels[start]}" if complete else " uh",
+                    probability=0.9
+                ))
+                start = None
+            if start is None and level:
+                start = index
+        segment = SimpleNamespace(start=0.0, end=len(audio) / WHISPER_SAMPLE_RATE, text="", words=words)
+        return iter([segment]), SimpleNamespace(language="en")
+
+
+def speech(levels, word_seconds=0.4, gap_seconds=0.1, tail_seconds=1.0):
+    """PCM16 frames of one word per level, separated by short gaps and ended by silence"""
+    samples = []
+    for level in levels:
+        samples.append(np.full(int(word_seconds * WHISPER_SAMPLE_RATE), level / 100))
+        samples.append(np.zeros(int(gap_seconds * WHISPER_SAMPLE_RATE)))
+    samples.append(np.zeros(int(tail_seconds * WHISPER_SAMPLE_RATE)))
+    pcm = (np.concatenate(samples) * 32768).astype(np.int16).tobytes()
+    return [pcm[i:i + FRAME * 2] for i in range(0, len(pcm), FRAME * 2)]
+
+
+@pytest.fixture
+def service():
+    return STTService(model=WordStub(), cache=TranscriptionCache(directory=None, max_disk_mb=0))
+
+
+def stream(service, frames, **options):
+    results = [service.transcribe_chunk("call", frame, sequence=i, **options) for i, frame in enumerate(frames)]
+    results.append(service.transcribe_chunk("call", b"", sequence=len(frames), final=True, **options))
+    return results
+
+
+def test_stable_prefix_is_committed_once_in_order(service):
+    results = stream(service, speech([5, 6, 7, 8, 9, 10, 11, 12]))
+
+    committed = [segment["text"] for result in results for segment in result["segments"]]
+    assert " ".join(committed).split() == ["w5", "w6", "w7", "w8", "w9", "w10", "w11", "w12"]
+    # Words commit as the stream goes, not all at the endpoint
+    assert len(committed) > 1
+    assert "call" not in service.streams
+
+
+def test_buffer_is_trimmed_after_commits(service):
+    results = stream(service, speech(list(range(5, 45)), tail_seconds=0.0))
+
+    assert max(result["buffer_seconds"] for result in results) < 3.0
+    assert results[-2]["duration"] > 15.0
+
+
+def test_partials_report_the_unstable_hypothesis(service):
+    results = stream(service, speech([5, 6, 7]))
+
+    partials = [result for result in results if result["is_partial"]]
+    assert any(result["text"] for result in partials)
+    assert all(result["text"] == result["unstable_text"] for result in partials)
+
+
+def test_return_partial_false_reports_only_committed_words(service):
+    results = stream(service, speech([5, 6, 7]), return_partial=False)
+
+    assert all(result["text"] == "" for result in results if result["is_partial"])
+    texts = [result["text"] for result in results if result["text"]]
+    assert texts and all(not result["is_partial"] for result in results if result["text"])
+    assert " ".join(texts).split() == ["w5", "w6", "w7"]
@@ -0,0 +1,78 @@
+"""
+Coalescing of identical tasks across lanes and deadlines, on a one-worker noop pool
+
+Each test first occupies the worker with a blocker, so the tasks it submits
+next are all still queued when they meet.
+"""
+
+import time
+
+import pytest
+
+from worker_pool import WorkerPool, WorkerType
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = WorkerPool(num_workers=1, worker_type=WorkerType.NOOP, watchdog_interval=0)
+    pool.start()
+    started = time.time()
+    while not pool.readiness()["ready"]:
+        assert time.time() - started < 30, "noop worker never became ready"
+        time.sleep(0.05)
+    yield pool
+    pool.shutdown()
+    pool.collector_thread.join(timeout=5)  # Let it see the shutdown before the interpreter exits
+
+
+def run(pool, submissions, timeout=10.0):
+    """Submit (task_id, data, options) in order; final results by task_id, in completion order"""
+    for task_id, data, options in submissions:
+        pool.submit_task(task_id, data, **options)
+    results = {}
+    deadline = time.time() + timeout
+    while len(results) < len(submissions):
+        result = pool.get_result(timeout=max(deadline - time.time(), 0.01))
+        assert result is not None, f"missing results for {set(s[0] for s in submissions) - set(results)}"
+        results[result["task_id"]] = result
+    return results
+
+
+def test_realtime_task_does_not_wait_behind_a_batch_leader(pool):
+    results = run(pool, [
+        ("lanes-blocker", {"sleep_ms": 300, "test": "lanes"}, {}),
+        ("lanes-leader", {"sleep_ms": 50, "test": "lanes"}, {"lane": "batch"}),
+        *[(f"lanes-filler-{i}", {"sleep_ms": 150, "test": "lanes", "i": i}, {"lane": "interactive"}) for i in range(3)],
+        ("lanes-follower", {"sleep_ms": 50, "test": "lanes"}, {"lane": "realtime"}),
+    ])
+
+    order = list(results)
+    assert "coalesced_with" not in results["lanes-follower"]
+    assert order.index("lanes-follower") < order.index("lanes-filler-0")
+    assert order.index("lanes-follower") < order.index("lanes-leader")
+
+
+def test_same_lane_tasks_still_coalesce(pool):
+    results = run(pool, [
+        ("same-blocker", {"sleep_ms": 200, "test": "same"}, {}),
+        ("same-leader", {"sleep_ms": 50, "test": "same"}, {"lane": "batch"}),
+        ("same-follower", {"sleep_ms": 50, "test": "same"}, {"lane": "batch", "deadline": time.time() + 30}),
+    ])
+
+    assert results["same-follower"]["coalesced_with"] == "same-leader"
+    assert results["same-follower"]["status"] == "success"
+
+
+def test_follower_outliving_the_leader_runs_on_its_own(pool):
+    results = run(pool, [
+        ("deadline-blocker", {"sleep_ms": 300, "test": "deadline"}, {}),
+        ("deadline-leader", {"sleep_ms": 50, "test": "deadline"}, {"deadline": time.time() + 0.1}),
+        ("deadline-follower", {"sleep_ms": 50, "test": "deadline"}, {"deadline": time.time() + 30}),
+        ("deadline-open", {"sleep_ms": 50, "test": "deadline"}, {}),
+    ])
+
+    assert results["deadline-leader"]["status"] == "expired"
+    assert results["deadline-follower"]["status"] == "success"
+    assert "coalesced_with" not in results["deadline-follower"]
+    # No deadline outlives any leader with one
+    assert results["deadline-open"]["status"] == "success"
@@ -0,0 +1,40 @@
+"""
+Requeueing a dead worker's tasks (WorkerPool._recover_tasks)
+
+No worker processes: the dead worker is a stand-in holding in-flight tasks,
+and the test reads back what the scheduler would dispatch next.
+"""
+
+from types import SimpleNamespace
+
+from worker_pool import WorkerPool, WorkerType
+
+
+def frame(index, lane="realtime"):
+    return {
+        "task_id": f"frame-{index}",
+        "data": {"chunk": index, "session_id": "call"},
+        "lane": lane,
+        "deadline": None,
+        "attempts": 0,
+        "affinity": "call"
+    }
+
+
+def test_backlog_is_requeued_in_dispatch_order():
+    pool = WorkerPool(num_workers=1, worker_type=WorkerType.NOOP, watchdog_interval=0, shm_size_mb=0)
+    frames = [frame(i) for i in range(5)]
+    dead = SimpleNamespace(worker_id=0, in_flight={task["task_id"]: task for task in frames})
+    later = frame(5)
+    pool.scheduler.push(later, "realtime")
+
+    with pool.lock:
+        pool._recover_tasks(dead, running=["frame-0"], failure="crashed")
+
+    order = []
+    while len(pool.scheduler):
+        order.append(pool.scheduler.pop()["task_id"])
+    assert order == [f"frame-{i}" for i in range(6)]
+    assert frames[0]["attempts"] == 1
+    assert not dead.in_flight
+    assert pool.tasks_requeued == 5
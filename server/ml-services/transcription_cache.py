@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of transcription results
+
+The same audio is often transcribed more than once: retried webhooks, one
+voicemail handled by two flows, repeated test fixtures. Results are keyed
+by a hash of the decoded PCM together with the language and decoding
+settings, so a WAV and the raw PCM inside it share an entry while a
+different model or beam size does not.
+
+Two tiers:
+- Memory: an LRU of recent results in the worker process (microseconds)
+- Disk: one JSON file per key in a directory shared by all workers, with
+  least-recently-used files evicted once the directory exceeds its size
+  budget (file mtimes record use, so any worker's hit refreshes an entry)
+"""
+
+import os
+import sys
+import json
+import hashlib
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("HF_HOME", "/tmp/ml-cache"), "stt-cache")
+
+
+class TranscriptionCache:
+    """Memory LRU in front of a size-bounded directory of results"""
+
+    def __init__(self, directory: Optional[str] = DEFAULT_CACHE_DIR, max_entries: int = 1024, max_disk_mb: float = 512.0):
+        self.memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.max_entries = max_entries
+        self.directory = directory if max_disk_mb > 0 else None
+        self.max_disk_bytes = int(max_disk_mb * 1024 * 1024)
+        self.disk_bytes = 0  # This process's running estimate; rescanned before evicting
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+
+        if self.directory is not None:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                self.disk_bytes = sum(size for _, size, _ in self._scan())
+            except OSError as e:
+                print(f"[STTCache] Disk tier unavailable, caching in memory only: {e}", file=sys.stderr, flush=True)
+                self.directory = None
+
+    @classmethod
+    def from_env(cls) -> "TranscriptionCache":
+        """Cache configured by STT_CACHE_DIR, STT_CACHE_ENTRIES and STT_CACHE_DISK_MB (0 disables the disk tier)"""
+        return cls(
+            directory=os.environ.get("STT_CACHE_DIR", DEFAULT_CACHE_DIR),
+            max_entries=int(os.environ.get("STT_CACHE_ENTRIES", "1024")),
+            max_disk_mb=float(os.environ.get("STT_CACHE_DISK_MB", "512"))
+        )
+
+    @staticmethod
+    def key(audio: np.ndarray, **settings) -> str:
+        """
+        Hash of decoded audio samples and the settings that shape the result
+
+        Settings must include the sample rate: audio is not resampled, so
+        the same samples at another rate are different audio.
+        """
+        digest = hashlib.sha256(np.ascontiguousarray(audio).view(np.uint8))
+        digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached result for key, or None; a disk hit is promoted to memory"""
+        result = self.memory.get(key)
+        if result is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return result
+
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    result = json.load(f)
+                os.utime(path)  # Mark as recently used for eviction
+            except (OSError, ValueError):
+                result = None
+            if result is not None:
+                self.disk_hits += 1
+                self._remember(key, result)
+                return result
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a result in both tiers"""
+        self.stores += 1
+        self._remember(key, result)
+        if self.directory is None:
+            return
+
+        path = self._path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            self.disk_bytes += os.path.getsize(temporary)
+            os.replace(temporary, path)  # Readers never see a partial file
+        except (OSError, TypeError, ValueError) as e:
+            print(f"[STTCache] Failed to write {key}: {e}", file=sys.stderr, flush=True)
+            try:
+                os.unlink(temporary)
+            except OSError:
+                pass
+            return
+
+        if self.disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _scan(self):
+        """(path, size, mtime) of every entry on disk"""
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue  # Evicted by another worker meanwhile
+                    yield entry.path, stat.st_size, stat.st_mtime
+
+    def _evict_disk(self):
+        """Delete least recently used entries until the directory is back to 90% of its budget"""
+        entries = sorted(self._scan(), key=lambda entry: entry[2])
+        self.disk_bytes = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        for path, size, _ in entries:
+            if self.disk_bytes <= target:
+                break
+            try:
+                os.unlink(path)
+                self.disk_evictions += 1
+            except OSError:
+                pass  # Another worker got there first
+            self.disk_bytes -= size
+
+    def get_metrics(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": len(self.memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "memory_evictions": self.memory_evictions,
+            "disk_evictions": self.disk_evictions,
+            "disk_bytes": self.disk_bytes if self.directory is not None else None
+        }
@@ -22,7 +22,7 @@ import numpy as np
 import io
 import time
 import random
-from typing import Dict, Any, List, Iterator, Tuple
+from typing import Dict, Any, List, Iterator, Tuple, Callable, Optional
 from dataclasses import dataclass
 
 
@@ -124,7 +124,8 @@ class StreamingTTSService:
         voice: str = None,
         speed: float = 1.0,
         chunk_duration_ms: int = 200,
-        reference_audio: str = None
+        reference_audio: str = None,
+        is_cancelled: Optional[Callable[[], bool]] = None
     ) -> Iterator[Dict[str, Any]]:
         """
         Synthesize speech from text with streaming output
@@ -136,6 +137,8 @@ class StreamingTTSService:
             speed: Speech speed (0.5 to 2.0)
             chunk_duration_ms: Duration of each audio chunk in milliseconds
             reference_audio: Base64 encoded reference audio for voice cloning
+            is_cancelled: Optional callback checked between chunks; streaming
+                stops early (without a done chunk) once it returns True
         
         Yields:
             Dictionary containing:
@@ -145,6 +148,26 @@ class StreamingTTSService:
             - latency_ms: processing latency for this chunk
             - model_info: information about the model used
         """
+        for chunk_data in self.synthesize_chunks(
+            text, model, voice, speed, chunk_duration_ms, reference_audio, is_cancelled
+        ):
+            audio = chunk_data.pop("audio")
+            yield {"chunk": base64.b64encode(audio).decode('utf-8'), **chunk_data}
+    
+    def synthesize_chunks(
+        self,
+        text: str,
+        model: str = "chatterbox",
+        voice: str = None,
+        speed: float = 1.0,
+        chunk_duration_ms: int = 200,
+        reference_audio: str = None,
+        is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        synthesize_streaming with raw audio bytes under "audio" instead of a
+        base64 "chunk" (used by pooled workers, which encode for their protocol)
+        """
         # Get model config
         model_config = self.models.get(model, self.models["chatterbox"])
         sample_rate = model_config.sample_rate
@@ -179,6 +202,10 @@ class StreamingTTSService:
         first_chunk_latency = random.uniform(*model_config.first_chunk_latency_ms)
         
         for chunk_idx in range(num_chunks):
+            if is_cancelled and is_cancelled():
+                print(f"[TTS Streaming] Cancelled after {chunk_idx}/{num_chunks} chunks", file=sys.stderr, flush=True)
+                return
+            
             chunk_start = chunk_idx * chunk_samples
             chunk_end = min((chunk_idx + 1) * chunk_samples, len(audio))
             chunk_audio = audio[chunk_start:chunk_end]
@@ -202,15 +229,12 @@ class StreamingTTSService:
             if chunk_idx == 0:
                 # Estimate total size for header (we'll update client-side)
                 wav_header = self.generate_wav_header(len(audio) * 2, sample_rate)
-                chunk_with_header = wav_header + chunk_bytes
-                chunk_b64 = base64.b64encode(chunk_with_header).decode('utf-8')
-            else:
-                chunk_b64 = base64.b64encode(chunk_bytes).decode('utf-8')
+                chunk_bytes = wav_header + chunk_bytes
             
             is_last = (chunk_idx == num_chunks - 1)
             
             yield {
-                "chunk": chunk_b64,
+                "audio": chunk_bytes,
                 "sequence": chunk_idx,
                 "done": is_last,
                 "latency_ms": latency,
@@ -310,20 +334,29 @@ class StreamingTTSService:
         
         return audio
     
-    def synthesize(self, text: str, model: str, voice: str = None, speed: float = 1.0) -> bytes:
+    def warm_up(self):
+        """Synthesize a short phrase with every model so none is cold on its first request"""
+        for model in self.models:
+            self.synthesize("Warming up.", model)
+    
+    def synthesize(
+        self,
+        text: str,
+        model: str,
+        voice: str = None,
+        speed: float = 1.0,
+        is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> bytes:
         """
         Non-streaming synthesize for compatibility with worker pool
-        Collects all chunks and returns complete audio
+        Collects all chunks and returns complete audio (truncated if
+        is_cancelled fires part-way through)
         """
-        chunks = []
-        for chunk_data in self.synthesize_streaming(text, model, voice, speed):
-            chunk_bytes = base64.b64decode(chunk_data["chunk"])
-            if chunk_data["sequence"] == 0:
-                # First chunk includes WAV header
-                chunks.append(chunk_bytes)
-            else:
-                # Subsequent chunks are raw PCM
-                chunks.append(chunk_bytes)
+        # First chunk includes the WAV header, the rest are raw PCM
+        chunks = [
+            chunk_data["audio"]
+            for chunk_data in self.synthesize_chunks(text, model, voice, speed, is_cancelled=is_cancelled)
+        ]
         
         return b''.join(chunks)
 
@@ -91,6 +91,11 @@ class VADService:
             traceback.print_exc(file=sys.stderr)
             self.model_loaded = False
     
+    def warm_up(self):
+        """Run the model once on a second of silence (first call builds its kernels)"""
+        if self.model_loaded and self.model:
+            self.detect_speech(bytes(32000))
+    
     def detect_speech(self, audio_bytes: bytes) -> List[Dict[str, float]]:
         """
         Detect speech segments in audio using REAL Silero VAD
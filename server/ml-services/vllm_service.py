@@ -9,7 +9,7 @@ import sys
 import json
 import time
 import requests
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Iterator, Optional
 from dataclasses import dataclass
 from collections import defaultdict
 
@@ -144,8 +144,11 @@ class VLLMAgentService:
         self.use_nvidia_api = False
         self.nvidia_api_key = os.environ.get('NVIDIA_API_KEY')
 
-        # Try local vLLM first
-        if VLLM_AVAILABLE:
+        # Try local vLLM first, unless VLLM_BACKEND=nvidia-api asks for the API only
+        if os.environ.get("VLLM_BACKEND") == "nvidia-api":
+            print("[VLLM] VLLM_BACKEND=nvidia-api, skipping local vLLM", file=sys.stderr, flush=True)
+            self._initialize_nvidia_api()
+        elif VLLM_AVAILABLE:
             try:
                 import torch
                 device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -384,34 +387,38 @@ class VLLMAgentService:
             "using_nvidia_api": self.use_nvidia_api
         }
 
-    def stream_response(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Generate streaming response (token by token)"""
+    def stream_response(self, data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """
+        Generate streaming response (token by token)
+
+        The final "done" chunk carries the full generate_response() result
+        under "result".
+        """
         result = self.generate_response(data)
 
         if "error" in result:
-            return [{"type": "error", "error": result["error"]}]
+            yield {"type": "error", "error": result["error"]}
+            return
 
         response_text = result["response"]
         words = response_text.split()
 
-        chunks = []
         current_text = ""
 
         for i, word in enumerate(words):
             current_text += (word + " " if i < len(words) - 1 else word)
-            chunks.append({
+            yield {
                 "type": "token",
                 "text": current_text,
                 "token": word,
                 "index": i
-            })
+            }
 
-        chunks.append({
+        yield {
             "type": "done",
-            "text": response_text
-        })
-
-        return chunks
+            "text": response_text,
+            "result": result
+        }
 
     def reset_session(self, session_id: str):
         """Reset conversation for a session"""
@@ -451,6 +458,7 @@ def main():
             elif request.get("type") == "stream":
                 chunks = service.stream_response(request.get("data", {}))
                 for chunk in chunks:
+                    chunk.pop("result", None)
                     response = {
                         "status": "success",
                         **chunk
@@ -34,7 +34,7 @@ import random
 import numpy as np
 import wave
 import io
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable
 from dataclasses import dataclass, asdict
 from enum import Enum
 import struct
@@ -369,8 +369,19 @@ class VoiceCloningService:
         self.clones[clone_id] = result
         return result
     
-    def create_professional_clone(self, clone_id: str, audio_data: bytes, name: str) -> CloneResult:
-        """Create professional voice clone with fine-tuning"""
+    def create_professional_clone(
+        self,
+        clone_id: str,
+        audio_data: bytes,
+        name: str,
+        is_cancelled: Optional[Callable[[], bool]] = None
+    ) -> CloneResult:
+        """
+        Create professional voice clone with fine-tuning
+        
+        is_cancelled is checked between training steps; a cancelled clone is
+        left with status "cancelled".
+        """
         # Validate audio
         is_valid, message, duration = self.processor.validate_audio(audio_data, CloneMode.PROFESSIONAL)
         if not is_valid:
@@ -406,7 +417,7 @@ class VoiceCloningService:
         self.clones[clone_id] = result
         
         # Simulate training
-        self._simulate_training(clone_id, embedding.sample_duration)
+        self._simulate_training(clone_id, embedding.sample_duration, is_cancelled)
         
         return result
     
@@ -443,11 +454,17 @@ class VoiceCloningService:
         self.clones[clone_id] = result
         return result
     
-    def _simulate_training(self, clone_id: str, audio_duration: float):
+    def _simulate_training(self, clone_id: str, audio_duration: float, is_cancelled: Optional[Callable[[], bool]] = None):
         """Simulate progressive training for professional clone"""
         training_time = min(30 + audio_duration * 0.5, 120)
         
         for progress in [25, 50, 75, 100]:
+            if is_cancelled and is_cancelled():
+                if clone_id in self.clones:
+                    self.clones[clone_id].status = "cancelled"
+                    self.clones[clone_id].message = f"Training cancelled at {self.clones[clone_id].training_progress:.0f}%"
+                return
+            
             time.sleep(0.1)
             if clone_id in self.clones:
                 self.clones[clone_id].training_progress = progress
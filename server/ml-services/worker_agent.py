@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+"""
+Worker Agents: run pool workers on other hosts
+
+A worker agent is a WorkerPool of local workers behind a TCP listener. The
+dispatcher (worker_pool.py --remote-agents host:port ...) connects to each
+agent and treats it as one more worker of the pool, with room for as many
+tasks as the agent registered capacity for:
+
+    dispatcher (worker_pool.py)                 agent (worker_agent.py)
+    RemoteWorker --- submit / cancel / ping --> WorkerAgent -> WorkerPool
+                 <-- register / result / heartbeat --
+
+Messages are length-prefixed frames (ipc_framing.FramedProtocol), so audio
+travels as raw bytes:
+
+- register  (agent, on connect): worker types, capacity, readiness
+- submit    (dispatcher): one task; the deadline travels as seconds left,
+            so the two hosts' clocks need not agree
+- cancel    (dispatcher): task_id
+- ping      (dispatcher, every heartbeat interval) -> heartbeat (agent):
+            capacity, ready workers, running task ids, busy seconds
+- result    (agent): a task result or streaming partial, as the agent's
+            pool produced it
+
+A dispatcher that hears nothing for the heartbeat timeout (or loses the
+connection) fails the agent's tasks over to other workers and keeps
+reconnecting; the agent cancels whatever the lost connection left behind.
+
+Usage:
+    # Two agents on one machine, then a dispatcher with no local workers
+    python worker_agent.py --listen 127.0.0.1:7601 --worker-type stt --workers 2
+    python worker_agent.py --listen 127.0.0.1:7602 --worker-type stt --workers 2
+    python worker_pool.py --worker-type stt --workers 0 \\
+        --remote-agents 127.0.0.1:7601 127.0.0.1:7602
+"""
+
+import os
+import sys
+import time
+import queue
+import socket
+import threading
+import traceback
+from typing import Dict, Any, Optional, List, Tuple
+
+from ipc_framing import FramedProtocol
+from shm_transport import ShmArena, is_handle
+from worker_pool import Worker, WorkerPool, WorkerType, Overloaded, SPAWN_MODES, CPU_AFFINITY_MODES, NoopService, parse_cpuset
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    """"host:port" -> (host, port)"""
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Expected host:port, got {address!r}")
+    return host, int(port)
+
+
+def connect(address: Tuple[str, int], timeout: float) -> Tuple[socket.socket, FramedProtocol]:
+    """Open a framed connection to an agent"""
+    sock = socket.create_connection(address, timeout=timeout)
+    sock.settimeout(None)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock, FramedProtocol(sock.makefile("rb"), sock.makefile("wb"))
+
+
+class _Sender:
+    """Queue-like front for a function (RemoteWorker's task and cancel queues)"""
+
+    def __init__(self, send):
+        self.put = send
+
+
+class RemoteWorker(Worker):
+    """
+    Dispatcher side: stands in for a worker agent in the pool's worker list
+
+    Tasks the pool puts on task_queue and ids it puts on cancel_queue go to
+    the agent through an outbox (so the pool lock is never held on a socket
+    write); the agent's results land on the pool's result_queue under this
+    worker's id. is_alive() means connected with a fresh heartbeat, and
+    ready means the agent has at least one warm worker. The pool never
+    replaces a RemoteWorker: it fails its tasks over and waits for the link
+    thread to reconnect.
+    """
+
+    remote = True
+
+    def __init__(
+        self,
+        worker_id: int,
+        worker_type: WorkerType,
+        address: str,
+        result_queue: Any,
+        shutdown_event: Any,
+        shm_arena: Optional[ShmArena] = None,
+        heartbeat_interval: float = 1.0,
+        heartbeat_timeout: float = 5.0
+    ):
+        super().__init__(
+            worker_id=worker_id,
+            worker_type=worker_type,
+            task_queue=_Sender(self._send_task),
+            result_queue=result_queue,
+            shutdown_event=shutdown_event,
+            cancel_queue=_Sender(lambda task_id: self.outbox.put({"type": "cancel", "task_id": task_id}))
+        )
+        self.address = address
+        self.shm_arena = shm_arena
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.capacity = 0  # Tasks the agent holds at once, from register / heartbeat
+        self.agent: Dict[str, Any] = {}  # Last register / heartbeat message
+        self.running: List[str] = []  # Task ids the agent's workers are executing
+        self.outbox: queue.Queue = queue.Queue()
+        self.protocol: Optional[FramedProtocol] = None
+        self.sock: Optional[socket.socket] = None
+        self.connected = False
+        self.connected_at = 0.0
+        self.last_heartbeat = 0.0
+        self.connects = 0
+        self.link_error: Optional[str] = None  # Why the last connection attempt failed
+        self.busy_offset = 0.0  # Keeps busy_time continuous across reconnects
+        self.dispatch_waits: Dict[str, float] = {}  # task_id -> seconds queued in the dispatcher
+        self.link_lock = threading.Lock()
+
+    def start(self):
+        """Start the link thread (connects, reconnects and sends pings)"""
+        threading.Thread(target=self._link_loop, name=f"Agent-{self.address}", daemon=True).start()
+        threading.Thread(target=self._send_loop, name=f"AgentSend-{self.address}", daemon=True).start()
+
+    def is_alive(self) -> bool:
+        return self.connected and time.time() - self.last_heartbeat <= self.heartbeat_timeout
+
+    def running_task_ids(self) -> List[str]:
+        return list(self.running)
+
+    def rss_mb(self) -> Optional[float]:
+        return None
+
+    def stop(self):
+        """Agents are not retired"""
+
+    def terminate(self):
+        """Close the connection for good (pool shutdown)"""
+        self.disconnect()
+
+    def disconnect(self):
+        """Drop the connection; the agent cancels what it still holds, the link thread reconnects"""
+        with self.link_lock:
+            sock, self.sock, self.protocol = self.sock, None, None
+            self.connected = False
+            self.ready.value = 0
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+
+    def _send_task(self, task_data: Optional[Dict[str, Any]]):
+        """Queue a task for the agent (called by the pool's dispatcher under its lock)"""
+        if task_data is None:
+            return
+        now = time.time()
+        data = task_data["data"]
+        if self.shm_arena is not None and any(is_handle(value) for value in data.values()):
+            data = {key: self.shm_arena.read(value) if is_handle(value) else value for key, value in data.items()}
+        self.dispatch_waits[task_data["task_id"]] = max(0.0, now - task_data["submitted_at"])
+        self.outbox.put({
+            "type": "submit",
+            "task": {
+                "task_id": task_data["task_id"],
+                "data": data,
+                "priority": task_data["priority"],
+                "lane": task_data["lane"],
+                "timeout_s": task_data["deadline"] - now if task_data["deadline"] is not None else None,
+                "stream": task_data["stream"],
+                "affinity": task_data["affinity"]
+            }
+        })
+
+    def _send_loop(self):
+        """Write outbox messages to the current connection"""
+        while not self.shutdown_event.is_set():
+            try:
+                message = self.outbox.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            protocol = self.protocol
+            if protocol is None:
+                continue  # Lost with the connection; the pool fails the task over
+            try:
+                protocol.write_message(message)
+            except OSError as e:
+                print(f"[RemoteWorker {self.worker_id}] Send to {self.address} failed: {e}", file=sys.stderr, flush=True)
+                self.disconnect()
+
+    def _link_loop(self):
+        """Connect (and reconnect) to the agent, then ping it every heartbeat interval"""
+        address = parse_address(self.address)
+        while not self.shutdown_event.is_set():
+            if self.protocol is None:
+                try:
+                    self._connect(address)
+                except (OSError, ValueError) as e:
+                    if self.link_error is None:
+                        print(f"[RemoteWorker {self.worker_id}] Cannot reach agent {self.address}: {e}; retrying", file=sys.stderr, flush=True)
+                    self.link_error = str(e)
+                    self.shutdown_event.wait(self.heartbeat_interval * 2)
+                    continue
+
+            protocol = self.protocol
+            try:
+                if protocol is not None:
+                    protocol.write_message({"type": "ping", "at": time.time()})
+            except OSError:
+                self.disconnect()
+            self.shutdown_event.wait(self.heartbeat_interval)
+
+    def _connect(self, address: Tuple[str, int]):
+        sock, protocol = connect(address, timeout=self.heartbeat_timeout)
+        sock.settimeout(self.heartbeat_timeout)
+        register = protocol.read_message()
+        sock.settimeout(None)
+        if register is None or register.get("type") != "register":
+            sock.close()
+            raise ValueError("agent did not register")
+        if self.worker_type.value not in register.get("worker_types", []):
+            sock.close()
+            raise ValueError(f"agent serves {register.get('worker_types')}, not {self.worker_type.value}")
+
+        # Anything queued for the previous connection was failed over already
+        while not self.outbox.empty():
+            self.outbox.get_nowait()
+        with self.link_lock:
+            self.sock, self.protocol = sock, protocol
+            self.connected = True
+            self.connected_at = self.last_heartbeat = time.time()
+            self.connects += 1
+            self.link_error = None
+            self.busy_offset = self.busy_time.value - register.get("busy_seconds", 0.0)
+        print(f"[RemoteWorker {self.worker_id}] Connected to agent {self.address} ({register.get('host')}, capacity {register.get('capacity')})", file=sys.stderr, flush=True)
+
+        self._update(register)
+        threading.Thread(target=self._read_loop, args=(protocol,), name=f"AgentRead-{self.address}", daemon=True).start()
+
+    def _read_loop(self, protocol: FramedProtocol):
+        """Deliver one connection's results and heartbeats until it closes"""
+        try:
+            while True:
+                message = protocol.read_message()
+                if message is None or protocol is not self.protocol:
+                    break
+                self.last_heartbeat = time.time()
+                if message["type"] == "result":
+                    self._deliver(message["result"])
+                elif message["type"] in ("heartbeat", "register"):
+                    self._update(message)
+        except (OSError, ValueError) as e:
+            if protocol is self.protocol:
+                print(f"[RemoteWorker {self.worker_id}] Connection to {self.address} failed: {e}", file=sys.stderr, flush=True)
+
+        if protocol is self.protocol:
+            print(f"[RemoteWorker {self.worker_id}] Agent {self.address} disconnected", file=sys.stderr, flush=True)
+            self.disconnect()
+
+    def _deliver(self, result: Dict[str, Any]):
+        """Hand an agent result to the pool as if this worker produced it"""
+        task_id = result["task_id"]
+        result["agent_worker_id"] = result.get("worker_id")
+        result["worker_id"] = self.worker_id
+        if "partial" not in result:
+            # Add the time spent queued in the dispatcher to the agent's queue wait
+            waited = self.dispatch_waits.pop(task_id, 0.0)
+            if "timings" in result:
+                result["timings"]["queue_wait"] = result["timings"].get("queue_wait", 0.0) + waited
+        self.result_queue.put(result)
+
+    def _update(self, status: Dict[str, Any]):
+        """Apply an agent's register / heartbeat message"""
+        self.agent = status
+        self.capacity = status.get("capacity", 0)
+        self.running = status.get("running", [])
+        self.busy_time.value = self.busy_offset + status.get("busy_seconds", 0.0)
+
+        ready = status.get("ready_workers", 0) > 0
+        if ready and not self.ready.value:
+            self.ready.value = 1
+            self.result_queue.put({
+                "worker_id": self.worker_id,
+                "event": "worker_ready",
+                "load_s": time.time() - self.connected_at,
+                "warmup_s": 0.0
+            })
+        elif not ready:
+            self.ready.value = 0
+
+    def link_metrics(self) -> Dict[str, Any]:
+        """Connection state and the agent's last report (parent-side)"""
+        return {
+            "address": self.address,
+            "connected": self.connected,
+            "host": self.agent.get("host"),
+            "capacity": self.capacity,
+            "agent_workers": self.agent.get("workers", 0),
+            "ready_workers": self.agent.get("ready_workers", 0) if self.connected else 0,
+            "heartbeat_age_s": round(time.time() - self.last_heartbeat, 2) if self.last_heartbeat else None,
+            "connects": self.connects,
+            "error": self.link_error
+        }
+
+
+class WorkerAgent:
+    """
+    Agent side: serves a local WorkerPool to one dispatcher connection at a time
+
+    A new connection replaces the previous one (a dispatcher reconnecting
+    after a network blip). Tasks submitted over a connection that is gone
+    are cancelled, since the dispatcher has requeued them elsewhere.
+    """
+
+    def __init__(self, pool: WorkerPool, host: str, port: int):
+        self.pool = pool
+        self.host = host
+        self.port = port
+        self.protocol: Optional[FramedProtocol] = None
+        self.tasks: set = set()  # Tasks of the current connection still running here
+        self.lock = threading.Lock()
+
+    def serve_forever(self):
+        """Accept dispatcher connections until the pool shuts down"""
+        self.pool.binary_payloads = True  # Frames carry raw audio
+        self.pool.start_result_forwarder(self._forward)
+        listener = socket.create_server((self.host, self.port))
+        print(f"[WorkerAgent] Listening on {self.host}:{self.port} ({self.pool.worker_type.value}, {self.pool.num_workers} workers)", file=sys.stderr, flush=True)
+
+        while self.pool.running:
+            sock, peer = listener.accept()
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(sock, peer), name=f"Dispatcher-{peer[0]}:{peer[1]}", daemon=True).start()
+
+    def _serve(self, sock: socket.socket, peer: Tuple[str, int]):
+        protocol = FramedProtocol(sock.makefile("rb"), sock.makefile("wb"))
+        with self.lock:
+            previous, self.protocol = self.protocol, protocol
+            abandoned, self.tasks = self.tasks, set()
+        self._abandon(abandoned)
+        if previous is not None:
+            print(f"[WorkerAgent] Dispatcher {peer[0]}:{peer[1]} replaces the previous connection", file=sys.stderr, flush=True)
+        print(f"[WorkerAgent] Dispatcher connected from {peer[0]}:{peer[1]}", file=sys.stderr, flush=True)
+
+        try:
+            protocol.write_message(self._status("register"))
+            while True:
+                message = protocol.read_message()
+                if message is None or protocol is not self.protocol:
+                    break
+                self._handle(protocol, message)
+        except (OSError, ValueError) as e:
+            print(f"[WorkerAgent] Dispatcher connection error: {e}", file=sys.stderr, flush=True)
+        finally:
+            with self.lock:
+                current = protocol is self.protocol
+                if current:
+                    self.protocol = None
+                    abandoned, self.tasks = self.tasks, set()
+            if current:
+                print(f"[WorkerAgent] Dispatcher {peer[0]}:{peer[1]} disconnected", file=sys.stderr, flush=True)
+                self._abandon(abandoned)
+            sock.close()
+
+    def _handle(self, protocol: FramedProtocol, message: Dict[str, Any]):
+        kind = message.get("type")
+        if kind == "ping":
+            protocol.write_message(self._status("heartbeat"))
+        elif kind == "submit":
+            task = message["task"]
+            with self.lock:
+                self.tasks.add(task["task_id"])
+            try:
+                self.pool.submit_task(
+                    task["task_id"],
+                    task["data"],
+                    priority=task.get("priority", 0),
+                    lane=task.get("lane"),
+                    deadline=time.time() + task["timeout_s"] if task.get("timeout_s") is not None else None,
+                    stream=task.get("stream", False),
+                    affinity=task.get("affinity")
+                )
+            except Overloaded as e:
+                self._reply(task["task_id"], "overloaded", str(e), **e.hints)
+            except Exception as e:
+                self._reply(task["task_id"], "error", str(e))
+        elif kind == "cancel":
+            self.pool.cancel_task(message["task_id"])
+
+    def _reply(self, task_id: str, status: str, error: str, **fields):
+        """Report a task the local pool turned away"""
+        self._forward({"task_id": task_id, "status": status, "error": error, "worker_id": None, "processing_time": 0.0, **fields})
+
+    def _forward(self, result: Dict[str, Any]):
+        """Result listener of the local pool: send results to the dispatcher that submitted the task"""
+        with self.lock:
+            protocol = self.protocol
+            if "event" in result:
+                # A worker became ready: tell the dispatcher now, not at the next ping
+                message = self._status("heartbeat")
+            elif result["task_id"] in self.tasks:
+                if "partial" not in result:
+                    self.tasks.discard(result["task_id"])
+                message = {"type": "result", "result": result}
+            else:
+                return  # Submitted over a connection that is gone
+        if protocol is None:
+            return
+        try:
+            protocol.write_message(message)
+        except OSError as e:
+            print(f"[WorkerAgent] Failed to send to dispatcher: {e}", file=sys.stderr, flush=True)
+
+    def _abandon(self, task_ids: set):
+        """Cancel tasks whose dispatcher connection is gone"""
+        for task_id in task_ids:
+            self.pool.cancel_task(task_id)
+        if task_ids:
+            print(f"[WorkerAgent] Cancelled {len(task_ids)} tasks of a lost dispatcher", file=sys.stderr, flush=True)
+
+    def _status(self, kind: str) -> Dict[str, Any]:
+        """register / heartbeat message: what this agent can take and what it is doing"""
+        pool = self.pool
+        now = time.time()
+        readiness = pool.readiness()
+        with pool.lock:
+            serving = [w for w in pool.workers if not w.draining]
+            running = [task_id for w in pool.workers for task_id in w.running_task_ids()]
+            busy = sum(w.busy_total(now) for w in serving) / len(serving) if serving else 0.0
+            in_flight = sum(len(w.in_flight) for w in pool.workers)
+            queue_depth = len(pool.scheduler)
+        return {
+            "type": kind,
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "worker_types": [pool.worker_type.value],
+            # Every worker's prefetch plus one task queued each, so the next
+            # task is already on this host when one finishes
+            "capacity": len(serving) * (pool.prefetch + 1),
+            "workers": len(serving),
+            "ready_workers": readiness["ready_workers"],
+            "running": running,
+            "in_flight": in_flight,
+            "queue_depth": queue_depth,
+            "busy_seconds": busy
+        }
+
+
+def main():
+    """Run a worker agent: a local worker pool served over TCP"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ML Worker Agent")
+    parser.add_argument("--listen", type=str, default="127.0.0.1:7601", help="host:port to accept the dispatcher on")
+    parser.add_argument("--worker-type", type=str, choices=[t.value for t in WorkerType], default="stt")
+    parser.add_argument("--workers", type=int, default=2, help="Number of workers")
+    parser.add_argument("--max-batch-size", type=int, default=1,
+                        help="Micro-batch up to this many tasks per inference call (stt/noop; 1 disables)")
+    parser.add_argument("--batch-window-ms", type=float, default=20.0,
+                        help="How long a worker waits for more tasks to fill a micro-batch")
+    parser.add_argument("--spawn-mode", choices=SPAWN_MODES, default="per-worker",
+                        help="zygote: load the service once and fork workers from it (CPU models share weights)")
+    parser.add_argument("--max-task-seconds", type=float, default=None,
+                        help="Kill a worker stuck on one task this long (default depends on the worker type)")
+    parser.add_argument("--shm-mb", type=int, default=32,
+                        help="Shared memory arena for large payloads in MB (0 disables)")
+    parser.add_argument("--cpu-affinity", choices=CPU_AFFINITY_MODES, default="none",
+                        help="split: pin each worker to its own block of cores; none: let the OS place workers")
+    parser.add_argument("--cpuset", type=parse_cpuset, default=None,
+                        help="Cores split mode divides between workers, e.g. 0-7 (default: all available)")
+    parser.add_argument("--threads-per-worker", type=int, default=0,
+                        help="Cores and intra-op threads per worker (0: available cores / workers)")
+    parser.add_argument("--noop-model-mb", type=int, default=0,
+                        help="Ballast held by the noop service, to benchmark spawn modes without real models")
+    parser.add_argument("--noop-warmup-ms", type=float, default=0.0,
+                        help="Warm-up time of the noop service, to exercise the readiness handshake")
+    args = parser.parse_args()
+    NoopService.model_mb = args.noop_model_mb
+    NoopService.warmup_ms = args.noop_warmup_ms
+    host, port = parse_address(args.listen)
+
+    # Workers are replaced from the watchdog thread while the main thread
+    # waits in accept(); see worker_pool.main() for why stdin is swapped out
+    sys.stdin = open(os.devnull)
+
+    pool = WorkerPool(
+        num_workers=args.workers,
+        worker_type=WorkerType(args.worker_type),
+        shm_size_mb=args.shm_mb,
+        max_batch_size=args.max_batch_size,
+        batch_window_ms=args.batch_window_ms,
+        spawn_mode=args.spawn_mode,
+        max_task_seconds=args.max_task_seconds,
+        cpu_affinity=args.cpu_affinity,
+        threads_per_worker=args.threads_per_worker,
+        cpuset=args.cpuset,
+        max_queue_size=100000,  # The dispatcher never sends more than the registered capacity
+        ready_quorum=0
+    )
+    pool.start()
+
+    try:
+        WorkerAgent(pool, host, port).serve_forever()
+    except Exception as e:
+        print(f"[WorkerAgent] Fatal error: {e}", file=sys.stderr, flush=True)
+        traceback.print_exc(file=sys.stderr)
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
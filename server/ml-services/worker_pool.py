@@ -2,38 +2,127 @@
 """
 Worker Pool Manager for ML Services
 
-Manages a pool of persistent Python workers for STT, TTS, and VLLM processing.
+Manages a pool of persistent Python workers for STT, TTS, VLLM, voice cloning
+and VAD processing.
 Uses multiprocessing.Queue for task distribution and maintains warm workers
 to avoid cold start latency.
 
 Architecture:
 - Workers run in separate processes, each with loaded models
-- JSON-based IPC via stdin/stdout
-- Task queue with priority support
-- Health checks and automatic worker restart
+- Readiness handshake: each worker loads its service, runs a warm-up
+  inference and then reports worker_ready; it gets no tasks before that,
+  and the pool sends "ready" once --ready-quorum workers are warm
+- IPC via stdin/stdout: JSON lines, or length-prefixed frames with raw
+  audio payloads (--protocol framed, see ipc_framing.py)
+- Priority lanes (realtime / interactive / batch) with weighted fair
+  sharing and aging, dispatched to per-worker inboxes
+- Per-task deadlines and cancellation (cancel_task command)
+- Session affinity: tasks with the same key (--affinity-key session_id, or
+  "affinity" on submit_task) are consistent-hashed to one worker, so
+  per-session state held in a worker (LLM conversation memory, streaming
+  STT buffers) survives across tasks; keys move only when workers come
+  and go
+- Batch STT: {"action": "transcribe_batch", "files": [...]} transcribes
+  many recordings in one task, their speech windows batched together
+- Long-form STT: {"action": "transcribe_long", "audio": ...} cuts a long
+  recording at VAD silences and decodes the windows in parallel
+- Streaming STT: tasks carrying a "chunk" (one realtime frame) feed the
+  session's rolling buffer in STTService.transcribe_chunk, which re-decodes
+  the unstable tail and returns is_partial hypotheses or committed segments
+- Streaming: tasks submitted with "stream": true send ordered task_partial
+  messages (TTS audio chunks, STT segments, LLM tokens) before their
+  task_result
+- Request coalescing: an STT/TTS/VAD task identical to one still in
+  flight (same canonical key over its data) shares that task's run, and
+  the result is fanned out to every waiting task_id (--no-coalesce, or
+  "coalesce": false on submit_task, to opt out)
+- Non-blocking admission control: when the queue is full, tasks are
+  rejected with an "overloaded" reply, lower-priority work is shed, or the
+  task waits a bounded time for space (--admission)
+- Large audio payloads handed to workers through shared memory
+  (see shm_transport.py) instead of being pickled through the queue
+- Optional micro-batching: STT workers gather tasks for a short window
+  and transcribe them with one batched inference call
+- Per-worker statistics, busy-time utilization and p50/p95/p99 latency
+  histograms for queue wait, decode, inference and encode; services that
+  report counters (the STT result cache) have them in worker metrics
+- Health checks and automatic worker restart; a watchdog thread kills
+  workers stuck past their type's max execution time and requeues (with a
+  retry limit) or fails the tasks a dead worker was holding
+- Worker recycling: a worker past --max-tasks-per-worker or --max-rss-mb
+  (allocator fragmentation, caches) is replaced by a warm worker before it
+  drains and exits, so capacity never drops
+- Multi-node: --remote-agents host:port ... adds worker agents on other
+  hosts (worker_agent.py), placed by load with heartbeats and failover
+- Optional autoscaling between --min-workers and --max-workers, driven by
+  queue depth and queue wait; idle workers are drained and retired
+- CPU budgeting (--cpu-affinity split): each worker is pinned to its own
+  block of cores and its torch / CTranslate2 / BLAS thread pools sized to
+  match, so N workers do not oversubscribe the machine
+- Optional zygote spawning (--spawn-mode zygote): the service is loaded once
+  in the pool process and workers are forked from it, sharing CPU-resident
+  model weights copy-on-write
 - Target: <50ms task submission latency
 
+Control plane: main() runs an asyncio loop (ControlPlane). A reader thread
+feeds stdin commands to the loop, a writer task flushes replies and pushed
+results in batches, commands that may block run in an executor, and health
+checks run on their own timer.
+
 Usage:
     # Start worker pool
     python worker_pool.py --workers 4 --worker-type stt
 
     # Workers listen on stdin for tasks
     # Tasks format: {"task_id": "uuid", "type": "stt", "data": {...}}
+
+    # Results are pushed to stdout as {"type": "task_result", ...} lines as
+    # soon as a worker finishes. Legacy clients that poll with get_result can
+    # start the pool with --result-delivery poll.
+
+    # Startup: {"type": "worker_ready", "worker_id", "load_s", "warmup_s",
+    # "time_to_ready_s", "readiness": "partial" | "full", ...} per worker as
+    # it warms up; {"type": "ready", "readiness": {...}} once the quorum is met
+
+    # Streaming: {"type": "submit_task", ..., "stream": true} is followed by
+    # {"type": "task_partial", "task_id", "sequence", "partial": {...}} lines
+    # (sequence 0, 1, 2, ...) and then the task_result, which counts them
+    # under "partials"
+
+    # Coalescing: a task that shared another task's run gets its own
+    # task_result with "coalesced_with": <task_id that ran>
+
+    # Binary framing: audio fields travel as raw bytes instead of base64
+    python worker_pool.py --workers 2 --worker-type tts --protocol framed
 """
 
+import os
+import gc
 import sys
+import asyncio
 import json
+import math
 import time
+import bisect
+import base64
+import hashlib
 import signal
+import threading
 import multiprocessing as mp
 from multiprocessing import Process, Queue, Event
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Callable, Tuple
+from dataclasses import dataclass, field
+from collections import deque
 from enum import Enum
 import traceback
 from datetime import datetime
 import queue
 
+import numpy as np
+
+from ipc_framing import JsonLinesProtocol, FramingError, make_protocol, PROTOCOLS
+from shm_transport import ShmArena, ShmReader, materialize
+
 
 class WorkerType(Enum):
     STT = "stt"
@@ -41,6 +130,8 @@ class WorkerType(Enum):
     VLLM = "vllm"
     HF_TTS = "hf_tts"
     CLONE = "clone"
+    VAD = "vad"
+    NOOP = "noop"  # Echo worker without models, used for benchmarks and diagnostics
 
 
 @dataclass
@@ -51,6 +142,33 @@ class Task:
     data: Dict[str, Any]
     priority: int = 0
     submitted_at: float = 0.0
+    lane: str = "interactive"
+    deadline: Optional[float] = None  # Unix time after which the result is useless
+    binary: bool = False  # Return audio as raw bytes (framed protocol) instead of base64
+    attempts: int = 0  # Times a worker died or hung while running this task
+    affinity: Optional[str] = None  # Tasks with the same key run on the same worker (session state)
+    stream: bool = False  # Send ordered partial results (task_partial) before the final result
+
+
+class TaskCancelled(Exception):
+    """Raised inside a worker when its current task was cancelled or expired"""
+    
+    def __init__(self, reason: str):
+        super().__init__(f"Task {reason}")
+        self.reason = reason  # "cancelled" or "expired"
+
+
+class Overloaded(Exception):
+    """Raised by submit_task when admission control turns a task away"""
+    
+    def __init__(self, hints: Dict[str, Any]):
+        super().__init__(f"Worker pool overloaded ({hints['queue_depth']} tasks queued)")
+        self.hints = hints  # Queue depth and back-off hints for the caller
+
+
+# What submit_task does when the queue is full: answer "overloaded" at once,
+# shed the newest task of a lower-priority lane, or park the task for a bounded wait
+ADMISSION_POLICIES = ("reject", "shed", "wait")
 
 
 @dataclass
@@ -61,19 +179,531 @@ class WorkerStats:
     errors: int
     avg_processing_time: float
     last_task_at: float
-    status: str  # "idle", "busy", "error", "starting"
+    status: str  # "idle", "busy", "draining", "dead", "starting"
+
+
+# Stages timed for every task; each worker reports its timings with the result
+LATENCY_STAGES = ("queue_wait", "decode", "inference", "encode")
+
+# Histogram bucket upper bounds: 0.05ms growing by 20% up to ~10 minutes
+LATENCY_BUCKETS_MS = [0.05 * 1.2 ** i for i in range(int(math.log(600_000 / 0.05, 1.2)) + 1)]
+
+
+class LatencyHistogram:
+    """
+    Fixed-size latency histogram with log-spaced buckets
+    
+    Buckets (LATENCY_BUCKETS_MS) grow by 20%, so percentiles are accurate
+    to one bucket and memory stays constant no matter how many samples are
+    recorded.
+    """
+    
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def record(self, ms: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+    
+    def percentile(self, pct: float) -> float:
+        """Upper bound of the bucket holding the pct-th percentile (capped at the max seen)"""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(pct / 100.0 * self.count)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                bound = LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max_ms
+                return min(bound, self.max_ms)
+        return self.max_ms
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "p50": round(self.percentile(50), 2),
+            "p95": round(self.percentile(95), 2),
+            "p99": round(self.percentile(99), 2),
+            "max": round(self.max_ms, 2)
+        }
+
+
+@dataclass
+class LaneConfig:
+    """Scheduling parameters for a priority lane"""
+    name: str
+    weight: int  # Share of dispatch slots while every lane is backlogged
+    max_wait: float  # Seconds a task may wait before it is aged to the front
+
+
+DEFAULT_LANES = [
+    LaneConfig(name="realtime", weight=8, max_wait=0.05),
+    LaneConfig(name="interactive", weight=4, max_wait=0.5),
+    LaneConfig(name="batch", weight=1, max_wait=5.0),
+]
+
+
+def lane_for_priority(priority: int) -> str:
+    """Map Task.priority to a lane: >0 realtime, 0 interactive, <0 batch"""
+    if priority > 0:
+        return "realtime"
+    if priority < 0:
+        return "batch"
+    return "interactive"
+
+
+@dataclass
+class LaneStats:
+    """Counters and recent queue wait times for a lane"""
+    submitted: int = 0
+    dispatched: int = 0
+    aged: int = 0
+    recent_waits: deque = field(default_factory=lambda: deque(maxlen=1000))  # (dispatched_at, wait)
+
+
+@dataclass
+class AutoscalePolicy:
+    """Thresholds for the queue-driven autoscaler"""
+    scale_up_queue_depth: int = 4  # Queued tasks per worker that trigger a scale-up
+    scale_up_p95_wait_ms: float = 500.0  # Recent p95 queue wait that triggers a scale-up
+    scale_up_cooldown: float = 30.0  # Seconds between scale-ups (new workers load models first)
+    idle_cooldown: float = 120.0  # Seconds a worker must sit idle before it is retired
+    wait_window: float = 10.0  # Seconds of dispatch history for the p95 wait
+    interval: float = 1.0  # Seconds between controller ticks
+
+
+class LaneScheduler:
+    """
+    Priority-aware task dispatcher
+    
+    Keeps one FIFO lane per priority class and picks the next task with
+    smooth weighted round-robin across the non-empty lanes. A lane whose
+    oldest task has waited longer than its max_wait is served first (aging),
+    so batch work cannot starve behind a steady stream of realtime tasks.
+    
+    Tasks with an affinity key whose worker is busy are parked on that
+    worker's own FIFO after leaving their lane; they still count towards
+    the queue size.
+    
+    Not thread-safe; WorkerPool serializes access with its lock.
+    """
+    
+    def __init__(self, lanes: Optional[List[LaneConfig]] = None, max_size: int = 1000):
+        self.lanes = {lane.name: lane for lane in (lanes or DEFAULT_LANES)}
+        self.queues: Dict[str, deque] = {name: deque() for name in self.lanes}
+        self.credit: Dict[str, int] = {name: 0 for name in self.lanes}
+        self.stats: Dict[str, LaneStats] = {name: LaneStats() for name in self.lanes}
+        self.parked: Dict[int, deque] = {}  # worker_id -> affine tasks waiting for that worker
+        self.max_size = max_size
+    
+    def __len__(self) -> int:
+        return sum(len(q) for q in self.queues.values()) + self.parked_count()
+    
+    def parked_count(self) -> int:
+        return sum(len(q) for q in self.parked.values())
+    
+    def park(self, worker_id: int, task_data: Dict[str, Any]):
+        """Hold a popped affine task until its worker has a free slot"""
+        self.parked.setdefault(worker_id, deque()).append((time.time(), task_data))
+    
+    def pop_parked(self, worker_id: int) -> Optional[Dict[str, Any]]:
+        """Oldest task parked for worker_id, or None"""
+        parked = self.parked.get(worker_id)
+        if not parked:
+            return None
+        task_data = parked.popleft()[1]
+        if not parked:
+            del self.parked[worker_id]
+        return task_data
+    
+    def unpark(self, worker_id: int) -> List[Dict[str, Any]]:
+        """Take back everything parked for a worker that left the pool"""
+        return [task_data for _, task_data in self.parked.pop(worker_id, ())]
+    
+    def push(self, task_data: Dict[str, Any], lane: str):
+        """Enqueue a task on a lane"""
+        if lane not in self.queues:
+            raise ValueError(f"Unknown lane: {lane}")
+        if len(self) >= self.max_size:
+            raise queue.Full(f"Task queue full ({self.max_size} tasks)")
+        
+        self.queues[lane].append((time.time(), task_data))
+        self.stats[lane].submitted += 1
+    
+    def requeue(self, task_data: Dict[str, Any]):
+        """Put a task back at the head of its lane (ignores max_size: it was already admitted)"""
+        lane = task_data["lane"] if task_data["lane"] in self.queues else next(iter(self.queues))
+        self.queues[lane].appendleft((time.time(), task_data))
+    
+    def shed_below(self, lane: str) -> Optional[Dict[str, Any]]:
+        """Remove and return the newest task of the lowest-weight lane ranked below lane"""
+        weight = self.lanes[lane].weight
+        lower = [l for l in self.lanes.values() if l.weight < weight and self.queues[l.name]]
+        if not lower:
+            return None
+        victim_lane = min(lower, key=lambda l: l.weight).name
+        return self.queues[victim_lane].pop()[1]
+    
+    def dispatch_rate(self, window: float) -> float:
+        """Tasks dispatched per second over the last window seconds, all lanes"""
+        now = time.time()
+        dispatched = sum(
+            1
+            for stats in self.stats.values()
+            for dispatched_at, _ in stats.recent_waits
+            if now - dispatched_at <= window
+        )
+        return dispatched / window
+    
+    def remove(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a queued or parked task, returning it if it was still waiting"""
+        for q in list(self.queues.values()) + list(self.parked.values()):
+            for entry in q:
+                if entry[1]["task_id"] == task_id:
+                    q.remove(entry)
+                    return entry[1]
+        return None
+    
+    def pop(self) -> Optional[Dict[str, Any]]:
+        """Dequeue the next task to dispatch, or None if all lanes are empty"""
+        now = time.time()
+        active = [name for name, q in self.queues.items() if q]
+        if not active:
+            return None
+        
+        # Aging: the most overdue lane wins outright
+        overdue = {
+            name: (now - self.queues[name][0][0]) / self.lanes[name].max_wait
+            for name in active
+        }
+        lane = max(active, key=overdue.get)
+        aged = overdue[lane] >= 1.0
+        
+        if not aged:
+            # Smooth weighted round-robin over backlogged lanes
+            total = 0
+            for name in self.lanes:
+                if name in active:
+                    self.credit[name] += self.lanes[name].weight
+                    total += self.lanes[name].weight
+                else:
+                    self.credit[name] = 0
+            lane = max(active, key=self.credit.get)
+            self.credit[lane] -= total
+        
+        enqueued_at, task_data = self.queues[lane].popleft()
+        stats = self.stats[lane]
+        stats.dispatched += 1
+        stats.recent_waits.append((now, now - enqueued_at))
+        if aged:
+            stats.aged += 1
+        
+        return task_data
+    
+    def recent_wait_p95(self, window: float) -> float:
+        """
+        p95 queue wait in seconds over all lanes for the last window seconds
+        
+        Tasks still queued count with their current age, so a stalled queue
+        shows up even when nothing is being dispatched.
+        """
+        now = time.time()
+        waits = [
+            wait
+            for stats in self.stats.values()
+            for dispatched_at, wait in stats.recent_waits
+            if now - dispatched_at <= window
+        ]
+        waits.extend(now - q[0][0] for q in list(self.queues.values()) + list(self.parked.values()) if q)
+        if not waits:
+            return 0.0
+        waits.sort()
+        return waits[int(0.95 * (len(waits) - 1))]
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Per-lane depth, throughput and queue wait"""
+        now = time.time()
+        metrics = {}
+        
+        for name, lane in self.lanes.items():
+            stats = self.stats[name]
+            waits = sorted(wait for _, wait in stats.recent_waits)
+            metrics[name] = {
+                "weight": lane.weight,
+                "depth": len(self.queues[name]),
+                "submitted": stats.submitted,
+                "dispatched": stats.dispatched,
+                "aged": stats.aged,
+                "oldest_wait_ms": (now - self.queues[name][0][0]) * 1000 if self.queues[name] else 0.0,
+                "avg_wait_ms": sum(waits) / len(waits) * 1000 if waits else 0.0,
+                "p95_wait_ms": waits[int(0.95 * (len(waits) - 1))] * 1000 if waits else 0.0,
+                "max_wait_ms": waits[-1] * 1000 if waits else 0.0
+            }
+        
+        return metrics
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping affinity keys to worker slots
+    
+    Each slot gets `replicas` points on the ring; a key belongs to the slot
+    owning the first point at or after the key's hash. Adding or removing a
+    slot only moves the keys on its own arcs (about 1/n of them), and a
+    replacement worker that takes over a slot inherits all of its keys.
+    """
+    
+    def __init__(self, replicas: int = 64):
+        self.replicas = replicas
+        self.points: List[int] = []
+        self.slots: List[int] = []
+    
+    @staticmethod
+    def hash(value: str) -> int:
+        return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+    
+    def rebuild(self, slots: List[int]):
+        """Place the given slots on the ring (replacing the previous set)"""
+        ring = sorted(
+            (self.hash(f"slot-{slot}#{replica}"), slot)
+            for slot in slots
+            for replica in range(self.replicas)
+        )
+        self.points = [point for point, _ in ring]
+        self.slots = [slot for _, slot in ring]
+    
+    def lookup(self, key: str) -> Optional[int]:
+        """Slot owning key, or None when the ring is empty"""
+        if not self.points:
+            return None
+        index = bisect.bisect_left(self.points, self.hash(key))
+        return self.slots[index % len(self.slots)]
+
+
+# Worker types whose services can run several tasks in one inference call
+BATCHABLE_WORKER_TYPES = {WorkerType.STT, WorkerType.NOOP}
+
+# Worker types whose tasks are pure functions of their data, so identical
+# in-flight tasks can share one run. LLM replies are sampled and voice
+# cloning actions create voices, so those always run per task.
+COALESCABLE_WORKER_TYPES = {WorkerType.STT, WorkerType.TTS, WorkerType.HF_TTS, WorkerType.VAD, WorkerType.NOOP}
+
+# Longest a worker may spend on one task (or micro-batch) before the
+# watchdog treats it as hung; professional cloning trains for minutes
+DEFAULT_MAX_TASK_SECONDS = {
+    WorkerType.STT: 120.0,
+    WorkerType.TTS: 120.0,
+    WorkerType.HF_TTS: 180.0,
+    WorkerType.VLLM: 180.0,
+    WorkerType.CLONE: 1800.0,
+    WorkerType.VAD: 60.0,
+    WorkerType.NOOP: 60.0,
+}
+
+# How workers get their service: each loads its own, or all fork from one
+# process that has loaded it already
+SPAWN_MODES = ("per-worker", "zygote")
+
+# How workers share the machine's cores: each pinned to its own block of
+# cores, or all free to run anywhere. Every pool plans its blocks on its own,
+# so pools sharing a host need disjoint cpusets before split pays off
+CPU_AFFINITY_MODES = ("split", "none")
+
+# Thread pool sizes read by OpenMP (torch, CTranslate2), MKL and OpenBLAS
+# when they initialise in a worker
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def parse_cpuset(spec: str) -> List[int]:
+    """Cores named by a cpuset list, e.g. 0-3,8,10-11"""
+    cpus = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        cpus.update(range(int(first), int(last or first) + 1))
+    if not cpus:
+        raise ValueError(f"Empty cpuset: {spec!r}")
+    return sorted(cpus)
+
+
+def plan_cpu_layout(slots: int, cpus: Optional[List[int]] = None, threads_per_worker: int = 0) -> List[List[int]]:
+    """
+    Cores for each worker slot, from the cores this process may run on
+    
+    Each slot gets a contiguous block of threads_per_worker cores (default:
+    the cores divided evenly between the slots, at least one). When there
+    are more slots than blocks, blocks are shared round-robin.
+    """
+    cpus = sorted(cpus if cpus is not None else os.sched_getaffinity(0))
+    per_worker = min(threads_per_worker or max(1, len(cpus) // max(slots, 1)), len(cpus))
+    blocks = [cpus[start:start + per_worker] for start in range(0, len(cpus) - per_worker + 1, per_worker)]
+    return [blocks[slot % len(blocks)] for slot in range(slots)]
+
+
+def apply_thread_budget(cpus: Optional[List[int]], threads: int):
+    """
+    Pin the calling process to cpus and size its math thread pools to threads
+    
+    Libraries that have not initialised yet pick the budget up from the
+    environment; torch and BLAS pools inherited already running from the
+    zygote or the pool process are resized in place.
+    """
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+    if threads <= 0:
+        return
+    
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(threads)
+
+
+def coalesce_key(worker_type: WorkerType, data: Dict[str, Any], stream: bool = False) -> Optional[str]:
+    """
+    Canonical key for a deterministic task, or None if its type never coalesces
+    
+    A SHA-256 over the worker type, the stream flag and the task data as
+    sorted-key JSON, with binary values (raw audio) folded in by digest, so
+    the same text, model and voice always produce the same key.
+    """
+    if worker_type not in COALESCABLE_WORKER_TYPES or "chunk" in data:
+        # Stream frames advance per-stream state, so equal frames are not equal tasks
+        return None
+    
+    def binary_digest(value: Any) -> str:
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return "sha256:" + hashlib.sha256(value).hexdigest()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=binary_digest)
+    return hashlib.sha256(f"{worker_type.value}:{int(stream)}:{canonical}".encode("utf-8")).hexdigest()
+
+
+class NoopService:
+    """Service for the noop worker type; model_mb of ballast stands in for weights in benchmarks"""
+    
+    model_mb = 0
+    warmup_ms = 0  # Stands in for a model's first-inference cost
+    
+    def __init__(self):
+        self.weights = np.ones(self.model_mb * 1024 * 1024 // 8) if self.model_mb else None
+        self.leaked: List[np.ndarray] = []  # Grown by tasks with leak_kb, to exercise RSS recycling
+    
+    def warm_up(self):
+        time.sleep(self.warmup_ms / 1000.0)
+
+
+def create_service(worker_type: WorkerType) -> Any:
+    """Import and construct the service for a worker type (loads its models)"""
+    if worker_type == WorkerType.STT:
+        from stt_service import STTService
+        return STTService()
+    elif worker_type == WorkerType.TTS:
+        from tts_streaming import StreamingTTSService
+        return StreamingTTSService()
+    elif worker_type == WorkerType.HF_TTS:
+        from hf_tts_service import HFTTSService
+        return HFTTSService()
+    elif worker_type == WorkerType.VLLM:
+        from vllm_service import VLLMAgentService
+        return VLLMAgentService()
+    elif worker_type == WorkerType.CLONE:
+        from voice_cloning_service import VoiceCloningService
+        return VoiceCloningService()
+    elif worker_type == WorkerType.VAD:
+        from vad_service import VADService
+        return VADService()
+    elif worker_type == WorkerType.NOOP:
+        return NoopService()
+    raise ValueError(f"Unknown worker type: {worker_type}")
+
+
+def cuda_available() -> bool:
+    """
+    Whether torch can see a GPU, checked without initialising CUDA
+    
+    A CUDA context does not survive fork(), so models that would land on
+    the GPU cannot be loaded before forking workers.
+    """
+    os.environ.setdefault("PYTORCH_NVML_BASED_CUDA_CHECK", "1")
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
 
 
 class Worker:
     """Individual worker process"""
     
-    def __init__(self, worker_id: int, worker_type: WorkerType, task_queue: Any, result_queue: Any, shutdown_event: Any):
+    remote = False  # RemoteWorker (worker_agent.py) stands in for a worker agent on another host
+    
+    def __init__(
+        self,
+        worker_id: int,
+        worker_type: WorkerType,
+        task_queue: Any,
+        result_queue: Any,
+        shutdown_event: Any,
+        cancel_queue: Any = None,
+        max_batch_size: int = 1,
+        batch_window_ms: float = 20.0,
+        service: Any = None,
+        cpus: Optional[List[int]] = None,
+        threads: int = 0
+    ):
         self.worker_id = worker_id
         self.worker_type = worker_type
         self.task_queue = task_queue
         self.result_queue = result_queue
         self.shutdown_event = shutdown_event
+        self.cancel_queue = cancel_queue
+        self.max_batch_size = max_batch_size
+        self.batch_window_ms = batch_window_ms
+        self.service = service  # Preloaded service inherited through fork (zygote mode)
+        self.cpus = cpus  # Cores the worker is pinned to (None: any core)
+        self.threads = threads  # Intra-op threads for torch / CTranslate2 / BLAS (0: library default)
+        self.cancelled: deque = deque(maxlen=256)  # Worker-side: recently cancelled task ids
+        self.shm_reader: Optional[ShmReader] = None  # Worker-side: attached shared memory
         self.process: Optional[Process] = None
+        # Parent-side: tasks dispatched to this worker's inbox, by task_id
+        self.in_flight: Dict[str, Dict[str, Any]] = {}
+        self.idle_since: Optional[float] = time.time()  # Parent-side: None while busy
+        self.slot = worker_id  # Parent-side: hash ring position, kept by a replacement worker
+        self.loaded_rss_mb: Optional[float] = None  # Parent-side: RSS first seen after loading (recycler)
+        self.service_metrics: Optional[Dict[str, Any]] = None  # Parent-side: service counters from the latest result
+        self.draining = False  # Parent-side: retiring, gets no new tasks
+        self.capacity: Optional[int] = None  # Parent-side: tasks held at once; None means the pool's prefetch
+        self.stopping = False  # Worker-side: stop sentinel received
+        self.stage_times: Dict[str, float] = {}  # Worker-side: decode/encode seconds of the current task
+        self.partials_sent = 0  # Worker-side: partial results sent for the current streaming task
+        # Shared with the parent: cumulative busy seconds, and start of the current task (0 when idle)
+        self.busy_time = mp.RawValue("d", 0.0)
+        self.busy_since = mp.RawValue("d", 0.0)
+        self.current_tasks = mp.RawArray("c", 4096)  # Newline-separated ids of the running task(s)
+        self.ready = mp.RawValue("b", 0)  # Set by the worker once its service is loaded and warmed up
+        self.ready_at: Optional[float] = None  # Parent-side: when the worker's ready event arrived
+        self.load_time = 0.0  # Parent-side: service load and warm-up seconds, from the ready event
+        self.warmup_time = 0.0
+        # Parent-side: per-stage latency and (time, busy seconds) samples for utilization
+        self.latency = {stage: LatencyHistogram() for stage in LATENCY_STAGES}
+        self.started_at = time.time()
+        self.busy_samples: deque = deque([(self.started_at, 0.0)], maxlen=256)
         self.stats = WorkerStats(
             worker_id=worker_id,
             tasks_processed=0,
@@ -87,37 +717,112 @@ class Worker:
         """Start the worker process"""
         self.process = Process(target=self._run, name=f"Worker-{self.worker_id}")
         self.process.start()
-        self.stats.status = "idle"
+    
+    def busy_total(self, now: float) -> float:
+        """Busy seconds so far, including the task running right now (parent-side)"""
+        since = self.busy_since.value
+        return self.busy_time.value + (now - since if since else 0.0)
+    
+    def utilization(self, window: float) -> float:
+        """Fraction of the last window seconds spent processing tasks (parent-side)"""
+        now = time.time()
+        since, busy_then = self.busy_samples[0]
+        for at, busy in self.busy_samples:
+            if at > now - window:
+                break
+            since, busy_then = at, busy
+        elapsed = now - since
+        return min(1.0, (self.busy_total(now) - busy_then) / elapsed) if elapsed > 0 else 0.0
+    
+    def record_result(self, result: Dict[str, Any]):
+        """Update stats and histograms from a result this worker produced (parent-side)"""
+        now = time.time()
+        stats = self.stats
+        stats.tasks_processed += 1
+        if result["status"] == "error":
+            stats.errors += 1
+        stats.avg_processing_time += (result.get("processing_time", 0.0) - stats.avg_processing_time) / stats.tasks_processed
+        stats.last_task_at = now
+        
+        timings = result.get("timings", {})
+        if "queue_wait" in timings:
+            self.latency["queue_wait"].record(timings["queue_wait"] * 1000)
+        if result["status"] == "success":
+            for stage in ("decode", "inference", "encode"):
+                if stage in timings:
+                    self.latency[stage].record(timings[stage] * 1000)
+        
+        if now - self.busy_samples[-1][0] >= 1.0:
+            self.busy_samples.append((now, self.busy_total(now)))
+    
+    def rss_mb(self) -> Optional[float]:
+        """Resident memory of the worker process in MB, None if unavailable (parent-side)"""
+        if self.process is None or self.process.pid is None:
+            return None
+        try:
+            with open(f"/proc/{self.process.pid}/statm") as f:
+                resident_pages = int(f.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return None
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    
+    def running_task_ids(self) -> List[str]:
+        """Ids of the task(s) the worker is executing right now (parent-side)"""
+        if not self.busy_since.value:
+            return []
+        return [task_id for task_id in self.current_tasks.value.decode().split("\n") if task_id]
+    
+    def _begin_busy(self, tasks: List[Task]):
+        self.stage_times = {"decode": 0.0, "encode": 0.0}
+        self.current_tasks.value = "\n".join(task.task_id for task in tasks).encode()[:len(self.current_tasks) - 1]
+        self.busy_since.value = time.time()
+    
+    def _end_busy(self):
+        since = self.busy_since.value
+        if since:
+            self.busy_time.value += time.time() - since
+            self.busy_since.value = 0.0
+        self.current_tasks.value = b""
     
     def _run(self):
         """Main worker loop"""
-        # Import the appropriate service based on worker type
-        service = None
+        # Forked workers inherit the pool's signal handlers; a terminated worker
+        # must just exit, not run WorkerPool.shutdown() (which owns shared memory)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        
+        # Stay on our own cores before any model allocates its thread pools
         try:
-            if self.worker_type == WorkerType.STT:
-                from stt_service import STTService
-                service = STTService()
-                print(f"[Worker {self.worker_id}] STT service initialized", file=sys.stderr, flush=True)
-            elif self.worker_type == WorkerType.TTS:
-                from tts_streaming import StreamingTTSService
-                service = StreamingTTSService()
-                print(f"[Worker {self.worker_id}] TTS streaming service initialized", file=sys.stderr, flush=True)
-            elif self.worker_type == WorkerType.HF_TTS:
-                from hf_tts_service import HFTTSService
-                service = HFTTSService()
-                print(f"[Worker {self.worker_id}] HF TTS service initialized", file=sys.stderr, flush=True)
-            elif self.worker_type == WorkerType.VLLM:
-                from vllm_service import VLLMAgentService
-                service = VLLMAgentService()
-                print(f"[Worker {self.worker_id}] VLLM agent service initialized", file=sys.stderr, flush=True)
-            elif self.worker_type == WorkerType.CLONE:
-                from voice_cloning_service import VoiceCloningService
-                service = VoiceCloningService()
-                print(f"[Worker {self.worker_id}] Voice cloning service initialized", file=sys.stderr, flush=True)
+            apply_thread_budget(self.cpus, self.threads)
+        except (OSError, RuntimeError) as e:
+            print(f"[Worker {self.worker_id}] Could not apply CPU budget: {e}", file=sys.stderr, flush=True)
+        
+        # Use the service inherited from the zygote, or load our own
+        service = self.service
+        started = time.time()
+        try:
+            if service is None:
+                service = create_service(self.worker_type)
+                print(f"[Worker {self.worker_id}] {self.worker_type.value} service initialized", file=sys.stderr, flush=True)
+            else:
+                print(f"[Worker {self.worker_id}] {self.worker_type.value} service inherited from zygote", file=sys.stderr, flush=True)
         except Exception as e:
             print(f"[Worker {self.worker_id}] Failed to initialize service: {e}", file=sys.stderr, flush=True)
             traceback.print_exc(file=sys.stderr)
             return
+        load_time = time.time() - started
+        self.service = service
+        warmup_time = self._warm_up(service)
+        
+        # Only now may the pool send this worker tasks
+        self.shm_reader = ShmReader()
+        self.ready.value = 1
+        self.result_queue.put({
+            "worker_id": self.worker_id,
+            "event": "worker_ready",
+            "load_s": load_time,
+            "warmup_s": warmup_time
+        })
         
         # Process tasks until shutdown
         while not self.shutdown_event.is_set():
@@ -128,63 +833,317 @@ class Worker:
                 except queue.Empty:
                     continue
                 
-                task = Task(**task_data)
-                start_time = time.time()
+                if task_data is None:
+                    # Drain sentinel: every task dispatched before it is done
+                    break
+                
+                if self.max_batch_size > 1 and self.worker_type in BATCHABLE_WORKER_TYPES:
+                    tasks = [self._load_task(task_data)] + self._gather_batch()
+                    self._begin_busy(tasks)
+                    try:
+                        self._run_batch(service, tasks)
+                    finally:
+                        self._end_busy()
+                    continue
                 
-                # Process task based on type
+                task = self._load_task(task_data)
+                self._begin_busy([task])
                 try:
-                    result = self._process_task(service, task)
-                    processing_time = time.time() - start_time
-                    
-                    # Send result
-                    self.result_queue.put({
-                        "task_id": task.task_id,
-                        "status": "success",
-                        "result": result,
-                        "worker_id": self.worker_id,
-                        "processing_time": processing_time
-                    })
-                    
-                except Exception as e:
-                    processing_time = time.time() - start_time
-                    self.result_queue.put({
-                        "task_id": task.task_id,
-                        "status": "error",
-                        "error": str(e),
-                        "worker_id": self.worker_id,
-                        "processing_time": processing_time
-                    })
-                    print(f"[Worker {self.worker_id}] Task error: {e}", file=sys.stderr, flush=True)
+                    self._run_task(service, task)
+                finally:
+                    self._end_busy()
                 
             except Exception as e:
                 print(f"[Worker {self.worker_id}] Unexpected error: {e}", file=sys.stderr, flush=True)
                 traceback.print_exc(file=sys.stderr)
+            
+            if self.stopping:
+                break
+        
+        print(f"[Worker {self.worker_id}] Stopped", file=sys.stderr, flush=True)
+    
+    def _warm_up(self, service) -> float:
+        """
+        Run the service's warm-up inference, if it has one; returns its seconds
+        
+        The first inference pays for lazy initialisation (CUDA kernels, memory
+        pools, caches), which should not land on the first real request. A
+        failed warm-up is logged and the worker serves anyway.
+        """
+        warm_up = getattr(service, "warm_up", None)
+        if warm_up is None:
+            return 0.0
+        
+        started = time.time()
+        try:
+            warm_up()
+        except Exception as e:
+            print(f"[Worker {self.worker_id}] Warm-up failed: {e}", file=sys.stderr, flush=True)
+            traceback.print_exc(file=sys.stderr)
+        elapsed = time.time() - started
+        print(f"[Worker {self.worker_id}] Warmed up in {elapsed:.2f}s", file=sys.stderr, flush=True)
+        return elapsed
+    
+    def _run_task(self, service, task: Task):
+        """Process one task and report its outcome"""
+        self.stage_times = {"decode": 0.0, "encode": 0.0}
+        self.partials_sent = 0
+        start_time = time.time()
+        
+        # Process task based on type
+        try:
+            self._check_cancelled(task)
+            result = self._process_task(service, task)
+            self._check_cancelled(task)
+            self._put_result(task, "success", start_time, result=result)
+            
+        except TaskCancelled as e:
+            self._put_result(task, e.reason, start_time, error=str(e))
+            
+        except Exception as e:
+            self._put_result(task, "error", start_time, error=str(e))
+            print(f"[Worker {self.worker_id}] Task error: {e}", file=sys.stderr, flush=True)
+    
+    def _emit_partial(self, task: Task, partial: Dict[str, Any]):
+        """
+        Send a partial result of a streaming task
+        
+        Partials travel through the result queue ahead of the final result,
+        so the pool delivers them in order and always before task_result.
+        """
+        self.result_queue.put({
+            "task_id": task.task_id,
+            "worker_id": self.worker_id,
+            "sequence": self.partials_sent,
+            "partial": partial
+        })
+        self.partials_sent += 1
+    
+    def _load_task(self, task_data: Dict[str, Any]) -> Task:
+        """Build a Task, mapping shared-memory handles to NumPy views"""
+        task = Task(**task_data)
+        task.data = self.shm_reader.resolve(task.data)
+        return task
+    
+    def _put_result(self, task: Task, status: str, start_time: float, **fields):
+        """Send a task outcome back to the pool, with its per-stage timings"""
+        processing_time = time.time() - start_time
+        decode = self.stage_times.get("decode", 0.0)
+        encode = self.stage_times.get("encode", 0.0)
+        get_metrics = getattr(self.service, "get_metrics", None)
+        if get_metrics is not None:
+            # Service counters (STT result cache) ride along to the parent's metrics
+            fields["service_metrics"] = get_metrics()
+        self.result_queue.put({
+            "task_id": task.task_id,
+            "status": status,
+            "worker_id": self.worker_id,
+            "processing_time": processing_time,
+            "timings": {
+                "queue_wait": max(0.0, start_time - task.submitted_at) if task.submitted_at else 0.0,
+                "decode": decode,
+                "inference": max(0.0, processing_time - decode - encode),
+                "encode": encode
+            },
+            **fields
+        })
+    
+    def _gather_batch(self) -> List[Task]:
+        """Collect tasks arriving within the batch window, up to max_batch_size - 1 more"""
+        tasks = []
+        window_end = time.time() + self.batch_window_ms / 1000.0
+        
+        while len(tasks) < self.max_batch_size - 1:
+            remaining = window_end - time.time()
+            if remaining <= 0:
+                break
+            try:
+                task_data = self.task_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if task_data is None:
+                # Drain sentinel: finish this batch, then exit
+                self.stopping = True
+                break
+            tasks.append(self._load_task(task_data))
+        
+        return tasks
+    
+    def _run_batch(self, service, tasks: List[Task]):
+        """Run a micro-batch: drop dead tasks, group compatible ones, one inference call per group"""
+        start_time = time.time()
+        groups: Dict[Any, List[Task]] = {}
+        
+        for task in tasks:
+            if task.stream or "chunk" in task.data or task.data.get("action"):
+                # Partials are per task, stream frames feed per-stream state and
+                # actions batch internally; none of them shares an inference call
+                self._run_task(service, task)
+                continue
+            reason = self._cancel_reason(task)
+            if reason:
+                self._put_result(task, reason, start_time, error=f"Task {reason}")
+                continue
+            # Tasks in one inference call must share decoding options and model tier
+            key = (
+                (task.data.get("language", "en"), task.data.get("tier"), task.data.get("channel"))
+                if self.worker_type == WorkerType.STT else None
+            )
+            groups.setdefault(key, []).append(task)
+        
+        for group in groups.values():
+            self.stage_times = {"decode": 0.0, "encode": 0.0}
+            group_start = time.time()
+            try:
+                results = self._process_batch(service, group)
+            except Exception as e:
+                print(f"[Worker {self.worker_id}] Batch error: {e}", file=sys.stderr, flush=True)
+                for task in group:
+                    self._put_result(task, "error", group_start, error=str(e), batch_size=len(group))
+                continue
+            
+            for index, (task, result) in enumerate(zip(group, results)):
+                self._put_result(task, "success", group_start, result=result, batch_size=len(group), batch_index=index)
+    
+    def _process_batch(self, service, tasks: List[Task]) -> List[Dict[str, Any]]:
+        """Process same-type tasks with one batched inference call; results in task order"""
+        if self.worker_type == WorkerType.STT:
+            language = tasks[0].data.get("language", "en")
+            with_audio = [i for i, task in enumerate(tasks) if task.data.get("audio")]
+            transcripts = service.transcribe_clips(
+                [self._decode_audio(tasks[i].data["audio"]) for i in with_audio],
+                language,
+                tier=tasks[0].data.get("tier"),
+                channel=tasks[0].data.get("channel")
+            ) if with_audio else []
+            
+            results: List[Dict[str, Any]] = [{"error": "No audio provided"} for _ in tasks]
+            for i, transcript in zip(with_audio, transcripts):
+                results[i] = transcript
+            return results
+        elif self.worker_type == WorkerType.NOOP:
+            # One simulated inference for the whole batch
+            sleep_ms = max(task.data.get("sleep_ms", 0) for task in tasks)
+            if sleep_ms:
+                time.sleep(sleep_ms / 1000.0)
+            return [{"echo": materialize(task.data)} for task in tasks]
+        else:
+            raise ValueError(f"Batching not supported for worker type: {self.worker_type}")
+    
+    def _cancel_reason(self, task: Task) -> Optional[str]:
+        """Return "cancelled"/"expired" if the task should stop, else None"""
+        if self.cancel_queue is not None:
+            while True:
+                try:
+                    self.cancelled.append(self.cancel_queue.get_nowait())
+                except queue.Empty:
+                    break
+        
+        if task.task_id in self.cancelled:
+            return "cancelled"
+        if task.deadline is not None and time.time() > task.deadline:
+            return "expired"
+        return None
+    
+    def _check_cancelled(self, task: Task):
+        """Raise TaskCancelled if the task was cancelled or its deadline passed"""
+        reason = self._cancel_reason(task)
+        if reason:
+            raise TaskCancelled(reason)
+    
+    def _decode_audio(self, value: Any) -> Any:
+        """
+        Audio arrives as a base64 string (JSON), raw bytes (framed protocol) or
+        a NumPy view of shared memory; the latter two are passed on without copying
+        """
+        started = time.time()
+        if isinstance(value, str):
+            audio = base64.b64decode(value)
+        elif isinstance(value, (bytes, bytearray)):
+            audio = value
+        else:
+            audio = memoryview(value).cast("B")
+        self.stage_times["decode"] = self.stage_times.get("decode", 0.0) + time.time() - started
+        return audio
+    
+    def _encode_audio(self, task: Task, audio_bytes: bytes) -> Any:
+        """Return audio in the representation the caller's protocol expects"""
+        started = time.time()
+        audio = audio_bytes if task.binary else base64.b64encode(audio_bytes).decode('utf-8')
+        self.stage_times["encode"] = self.stage_times.get("encode", 0.0) + time.time() - started
+        return audio
     
     def _process_task(self, service, task: Task) -> Dict[str, Any]:
         """Process a task using the loaded service"""
+        is_cancelled = lambda: self._cancel_reason(task) is not None
+        
         if self.worker_type == WorkerType.STT:
+            if task.data.get("action") == "transcribe_batch":
+                # Offline jobs: many recordings, VAD-split and decoded in batches
+                return service.transcribe_batch(
+                    [self._decode_audio(audio) for audio in task.data.get("files", [])],
+                    task.data.get("language", "en"),
+                    batch_size=task.data.get("batch_size", 16),
+                    tier=task.data.get("tier")
+                )
+            
+            if task.data.get("action") == "transcribe_long":
+                # One long recording, cut at silences and decoded as parallel windows
+                return service.transcribe_long(
+                    self._decode_audio(task.data["audio"]),
+                    task.data.get("language", "en"),
+                    parallelism=task.data.get("parallelism"),
+                    tier=task.data.get("tier")
+                )
+            
+            if "chunk" in task.data:
+                # Realtime frame: incremental decoding in its stream's rolling buffer
+                chunk = task.data["chunk"]
+                return service.transcribe_chunk(
+                    str(task.data.get("session_id") or "default"),
+                    self._decode_audio(chunk) if chunk else b"",
+                    task.data.get("language", "en"),
+                    sequence=task.data.get("sequence", 0),
+                    final=task.data.get("final", False),
+                    tier=task.data.get("tier"),
+                    return_partial=task.data.get("return_partial", True)
+                )
+            
             # STT task processing - use transcribe method for real STT
-            import base64
-            audio_b64 = task.data.get("audio", "")
+            audio_data = task.data.get("audio", "")
             language = task.data.get("language", "en")
             
-            if not audio_b64:
+            if not audio_data:
                 return {"error": "No audio provided"}
             
-            audio_bytes = base64.b64decode(audio_b64)
-            result = service.transcribe(audio_bytes, language)
+            audio_bytes = self._decode_audio(audio_data)
+            on_segment = None
+            if task.stream:
+                # Partial hypotheses: each decoded segment plus the text so far
+                on_segment = lambda segment, text: self._emit_partial(task, {"segment": segment, "text": text})
+            result = service.transcribe(
+                audio_bytes,
+                language,
+                on_segment=on_segment,
+                tier=task.data.get("tier"),
+                channel=task.data.get("channel")
+            )
             return result
         elif self.worker_type == WorkerType.TTS:
+            if task.stream:
+                return self._stream_tts(service, task, is_cancelled)
+            
             # TTS task processing
             audio_bytes = service.synthesize(
                 text=task.data.get("text", ""),
                 model=task.data.get("model", "chatterbox"),
                 voice=task.data.get("voice"),
-                speed=task.data.get("speed", 1.0)
+                speed=task.data.get("speed", 1.0),
+                is_cancelled=is_cancelled
             )
-            import base64
+            self._check_cancelled(task)
             return {
-                "audio": base64.b64encode(audio_bytes).decode('utf-8')
+                "audio": self._encode_audio(task, audio_bytes)
             }
         elif self.worker_type == WorkerType.HF_TTS:
             # HF TTS task processing
@@ -193,26 +1152,34 @@ class Worker:
                 model=task.data.get("model", "parler_tts_multilingual"),
                 voice_prompt=task.data.get("voice_prompt", "A clear and natural voice")
             )
-            import base64
             return {
-                "audio": base64.b64encode(audio_bytes).decode('utf-8'),
+                "audio": self._encode_audio(task, audio_bytes),
                 "format": "wav",
                 "sample_rate": 44100
             }
         elif self.worker_type == WorkerType.VLLM:
             # VLLM agent task processing
-            return service.generate_response(task.data)
+            if not task.stream:
+                return service.generate_response(task.data)
+            
+            # Token streaming: one partial per token, the full response as the result
+            for chunk in service.stream_response(task.data):
+                if chunk["type"] == "token":
+                    self._emit_partial(task, {"token": chunk["token"], "text": chunk["text"], "index": chunk["index"]})
+                    self._check_cancelled(task)
+                elif chunk["type"] == "done":
+                    return chunk["result"]
+                else:
+                    return {"error": chunk.get("error", "Generation failed")}
+            return {"error": "Generation produced no result"}
         elif self.worker_type == WorkerType.CLONE:
             # Voice cloning task processing
             action = task.data.get("action")
             
             if action == "create_instant":
                 clone_id = task.data["clone_id"]
-                audio_b64 = task.data["audio"]
                 name = task.data.get("name", "Untitled")
-                
-                import base64
-                audio_bytes = base64.b64decode(audio_b64)
+                audio_bytes = self._decode_audio(task.data["audio"])
                 result = service.create_instant_clone(clone_id, audio_bytes, name)
                 
                 # Convert dataclasses to dicts for JSON serialization
@@ -234,12 +1201,10 @@ class Worker:
             
             elif action == "create_professional":
                 clone_id = task.data["clone_id"]
-                audio_b64 = task.data["audio"]
                 name = task.data.get("name", "Untitled")
-                
-                import base64
-                audio_bytes = base64.b64decode(audio_b64)
-                result = service.create_professional_clone(clone_id, audio_bytes, name)
+                audio_bytes = self._decode_audio(task.data["audio"])
+                result = service.create_professional_clone(clone_id, audio_bytes, name, is_cancelled=is_cancelled)
+                self._check_cancelled(task)
                 
                 from dataclasses import asdict
                 return {
@@ -291,11 +1256,81 @@ class Worker:
                 else:
                     raise ValueError(f"Clone not found: {clone_id}")
             
+            elif action == "analyze":
+                # Voice characteristics only, no clone is stored
+                from dataclasses import asdict
+                characteristics = service.processor.extract_characteristics(self._decode_audio(task.data["audio"]))
+                return {
+                    "characteristics": asdict(characteristics),
+                    "duration": characteristics.formants["f1"] / 100  # Approximate, as the CLI reports it
+                }
+            
             else:
                 raise ValueError(f"Unknown voice cloning action: {action}")
+        elif self.worker_type == WorkerType.VAD:
+            # Voice activity detection - speech segments in seconds
+            audio_data = task.data.get("audio", "")
+            if not audio_data:
+                return {"error": "No audio provided"}
+            
+            return {"segments": service.detect_speech(self._decode_audio(audio_data))}
+        elif self.worker_type == WorkerType.NOOP:
+            # No-op task processing - optionally sleep, then echo the payload
+            # (streaming: the sleep is split across data["partials"] partials)
+            sleep_ms = task.data.get("sleep_ms", 0)
+            if task.data.get("leak_kb"):
+                service.leaked.append(np.ones(task.data["leak_kb"] * 1024 // 8))
+            if task.data.get("matmul"):
+                # CPU-bound stand-in for inference: BLAS runs on the worker's thread budget
+                size = task.data["matmul"]
+                matrix = np.ones((size, size), dtype=np.float32)
+                for _ in range(task.data.get("rounds", 1)):
+                    matrix @ matrix
+            partials = task.data.get("partials", 3) if task.stream else 0
+            for index in range(partials):
+                time.sleep(sleep_ms / partials / 1000.0)
+                self._check_cancelled(task)
+                self._emit_partial(task, {"index": index})
+            if sleep_ms and not partials:
+                time.sleep(sleep_ms / 1000.0)
+            self._check_cancelled(task)
+            return {"echo": materialize(task.data)}
         else:
             raise ValueError(f"Unknown worker type: {self.worker_type}")
     
+    def _stream_tts(self, service, task: Task, is_cancelled: Callable[[], bool]) -> Dict[str, Any]:
+        """Streaming TTS: audio chunks as partials, a summary as the result"""
+        chunks = 0
+        duration_ms = 0.0
+        model_info = None
+        
+        for chunk in service.synthesize_chunks(
+            text=task.data.get("text", ""),
+            model=task.data.get("model", "chatterbox"),
+            voice=task.data.get("voice"),
+            speed=task.data.get("speed", 1.0),
+            chunk_duration_ms=task.data.get("chunk_duration_ms", 200),
+            reference_audio=task.data.get("reference_audio"),
+            is_cancelled=is_cancelled
+        ):
+            self._emit_partial(task, {
+                "audio": self._encode_audio(task, chunk["audio"]),
+                "done": chunk["done"],
+                "latency_ms": chunk["latency_ms"],
+                "duration_ms": chunk["duration_ms"],
+                "model_info": chunk["model_info"]
+            })
+            chunks += 1
+            duration_ms += chunk["duration_ms"]
+            model_info = chunk["model_info"]
+        
+        self._check_cancelled(task)
+        return {"chunks": chunks, "duration_ms": duration_ms, "model_info": model_info}
+    
+    def stop(self):
+        """Ask the worker to exit once it has finished every task already in its inbox"""
+        self.task_queue.put(None)
+    
     def is_alive(self) -> bool:
         """Check if worker process is alive"""
         return self.process is not None and self.process.is_alive()
@@ -314,109 +1349,1321 @@ class WorkerPool:
     Worker pool manager
     
     Maintains a pool of persistent workers and distributes tasks among them.
+    Tasks wait in a LaneScheduler in the parent and are handed to a worker's
+    own inbox only when that worker has a free slot, so the scheduler (not a
+    shared FIFO) decides what runs next.
     Handles worker lifecycle, health checks, and graceful shutdown.
     """
     
-    def __init__(self, num_workers: int, worker_type: WorkerType):
+    def __init__(
+        self,
+        num_workers: int,
+        worker_type: WorkerType,
+        lanes: Optional[List[LaneConfig]] = None,
+        max_queue_size: int = 1000,
+        prefetch: int = 1,
+        shm_size_mb: int = 32,
+        shm_threshold: int = 256 * 1024,
+        max_batch_size: int = 1,
+        batch_window_ms: float = 20.0,
+        min_workers: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        autoscale_policy: Optional[AutoscalePolicy] = None,
+        spawn_mode: str = "per-worker",
+        max_task_seconds: Optional[float] = None,
+        max_task_retries: int = 1,
+        watchdog_interval: float = 1.0,
+        admission_policy: str = "reject",
+        admission_wait_ms: float = 500.0,
+        affinity_key: Optional[str] = None,
+        max_tasks_per_worker: int = 0,
+        max_rss_mb: float = 0.0,
+        ready_quorum: int = 1,
+        remote_agents: Optional[List[str]] = None,
+        heartbeat_interval: float = 1.0,
+        heartbeat_timeout: float = 5.0,
+        coalesce: bool = True,
+        cpu_affinity: str = "none",
+        threads_per_worker: int = 0,
+        cpuset: Optional[List[int]] = None
+    ):
         self.num_workers = num_workers
         self.worker_type = worker_type
         self.workers: List[Worker] = []
-        self.task_queue = Queue(maxsize=1000)
+        self.next_worker_id = 0
+        
+        # Autoscaling is active when max_workers > min_workers
+        self.min_workers = min_workers if min_workers is not None else num_workers
+        self.max_workers = max(max_workers if max_workers is not None else num_workers, self.min_workers)
+        self.num_workers = min(max(num_workers, self.min_workers), self.max_workers)
+        self.autoscale_policy = autoscale_policy or AutoscalePolicy()
+        self.autoscaler_thread: Optional[threading.Thread] = None
+        self.last_scale_up = 0.0
+        self.scale_ups = 0
+        self.scale_downs = 0
+        self.scaling_events: deque = deque(maxlen=20)
+        
+        # Zygote mode: the service is loaded here once, then inherited by every fork
+        if spawn_mode not in SPAWN_MODES:
+            raise ValueError(f"Unknown spawn mode: {spawn_mode}")
+        self.spawn_mode = spawn_mode
+        self.service: Any = None
+        self.service_load_time = 0.0
+        self.scheduler = LaneScheduler(lanes, max_size=max_queue_size)
+        
+        # CPU budget: split mode gives each local worker slot its own block of
+        # cores out of cpuset (default: every core this process may use), sized
+        # for max_workers so scaling up never oversubscribes, and matching
+        # intra-op thread counts; none leaves placement to the OS
+        if cpu_affinity not in CPU_AFFINITY_MODES:
+            raise ValueError(f"Unknown CPU affinity mode: {cpu_affinity}")
+        if cpuset is not None and not set(cpuset) <= os.sched_getaffinity(0):
+            raise ValueError(f"cpuset {cpuset} includes cores this process may not use")
+        self.cpu_affinity = cpu_affinity
+        self.threads_per_worker = threads_per_worker
+        self.cpuset = sorted(cpuset) if cpuset is not None else None
+        self.cpu_layout: List[List[int]] = []
+        if cpu_affinity == "split" and self.max_workers > 0:
+            self.cpu_layout = plan_cpu_layout(self.max_workers, cpus=self.cpuset, threads_per_worker=threads_per_worker)
+        
+        # Admission control once the scheduler holds max_queue_size tasks
+        if admission_policy not in ADMISSION_POLICIES:
+            raise ValueError(f"Unknown admission policy: {admission_policy}")
+        self.admission_policy = admission_policy
+        self.admission_wait_ms = admission_wait_ms
+        self.admission_waiters: deque = deque()  # (expires_at, task_data), "wait" policy only
+        self.admission_thread: Optional[threading.Thread] = None
+        self.tasks_rejected = 0
+        self.tasks_shed = 0
+        self.started_at = time.time()
+        self.prefetch = prefetch  # Max tasks outstanding per worker
+        
+        # Micro-batching: a worker needs a full batch's worth of tasks in its inbox
+        self.max_batch_size = max_batch_size if worker_type in BATCHABLE_WORKER_TYPES else 1
+        self.batch_window_ms = batch_window_ms
+        if self.max_batch_size > 1:
+            self.prefetch = max(self.prefetch, self.max_batch_size)
+        self.batch_histogram: Dict[int, int] = {}  # batch size -> batches run
+        self.binary_payloads = False  # Set when the client speaks the framed protocol
+        
+        # Shared-memory transport for payloads >= shm_threshold bytes (0 MB disables)
+        self.shm_size_mb = shm_size_mb
+        self.shm_threshold = shm_threshold
+        self.shm_arena: Optional[ShmArena] = None
+        self.shm_blocks: Dict[str, List[int]] = {}  # task_id -> arena offsets
+        self.lock = threading.RLock()
         self.result_queue = Queue()
         self.shutdown_event = Event()
         self.running = False
         
+        # Result collection: pushed to result_listener, or buffered for get_result()
+        self.result_listener: Optional[Callable[[Dict[str, Any]], None]] = None
+        self.completed_results: queue.Queue = queue.Queue()
+        self.collector_thread: Optional[threading.Thread] = None
+        
         # Metrics
         self.tasks_submitted = 0
         self.tasks_completed = 0
         self.tasks_failed = 0
+        self.tasks_cancelled = 0
+        self.tasks_expired = 0
+        self.latency = {stage: LatencyHistogram() for stage in LATENCY_STAGES}
+        self.utilization_window = 60.0  # Seconds of busy time behind worker_utilization
+        
+        # Watchdog: replaces dead workers and kills ones stuck on a task for too long
+        self.max_task_seconds = max_task_seconds or DEFAULT_MAX_TASK_SECONDS[worker_type]
+        self.max_task_retries = max_task_retries  # Reruns allowed after the worker running a task dies
+        self.watchdog_interval = watchdog_interval  # 0: the owner runs health_check on its own timer
+        self.watchdog_thread: Optional[threading.Thread] = None
+        self.worker_crashes = 0
+        self.worker_hangs = 0
+        self.tasks_requeued = 0
+        self.stale_results = 0
+        
+        # Streaming: partial results forwarded so far, per running task
+        self.partials_sent: Dict[str, int] = {}
+        self.partials_forwarded = 0
+        
+        # Session affinity: tasks carrying a key (explicit, or data[affinity_key])
+        # are consistent-hashed to a worker slot. A key stays pinned to the
+        # worker running it while it has tasks outstanding there, so one
+        # session's tasks never run on two workers at once.
+        self.affinity_key = affinity_key
+        self.ring = HashRing()
+        self.affinity_pins: Dict[str, Tuple[int, set]] = {}  # key -> (worker_id, outstanding task ids)
+        self.affine_tasks_routed = 0
+        self.affine_tasks_parked = 0
+        
+        # Recycling: a worker past max_tasks_per_worker or max_rss_mb (0 disables)
+        # is replaced by a fresh one, which takes over once its service is loaded
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.max_rss_mb = max_rss_mb
+        self.recycling: Dict[int, Tuple[Worker, str, float]] = {}  # old worker_id -> (replacement, reason, started)
+        self.recycles = 0
+        self.recycle_failures = 0
+        self.recycle_events: deque = deque(maxlen=20)
+        
+        # Remote worker agents (host:port), each one RemoteWorker in self.workers.
+        # They are not autoscaled or recycled; a lost agent's tasks fail over
+        # to other workers and the agent rejoins when it reconnects
+        self.remote_agents = list(remote_agents or [])
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.agent_failovers = 0
+        
+        # Coalescing: a deterministic task identical to one already queued or
+        # running in its lane (same coalesce_key) attaches to it as a follower
+        # instead of running again; the leader's partials and result fan out
+        # to followers
+        self.coalesce = coalesce
+        self.coalesce_leaders: Dict[Tuple[str, str], str] = {}  # (lane, key) -> leader task_id
+        self.coalesce_groups: Dict[str, Dict[str, Any]] = {}  # leader task_id -> {key, deadline, followers, leader_cancelled}
+        self.coalesce_followers: Dict[str, str] = {}  # follower task_id -> leader task_id
+        self.coalesce_hits = 0
+        self.coalesce_leads = 0
+        self.coalesced_results = 0
+        
+        # Readiness: a worker gets tasks once it has loaded its service and run a
+        # warm-up inference; the pool counts as ready with ready_quorum such workers
+        self.ready_quorum = min(max(ready_quorum, 0), self.num_workers + len(self.remote_agents))
         
         # Setup signal handlers
         signal.signal(signal.SIGTERM, self._handle_shutdown)
         signal.signal(signal.SIGINT, self._handle_shutdown)
     
-    def start(self):
-        """Start the worker pool"""
-        print(f"[WorkerPool] Starting {self.num_workers} {self.worker_type.value} workers...", file=sys.stderr, flush=True)
-        
-        for i in range(self.num_workers):
-            worker = Worker(
-                worker_id=i,
-                worker_type=self.worker_type,
-                task_queue=self.task_queue,
-                result_queue=self.result_queue,
-                shutdown_event=self.shutdown_event
-            )
-            worker.start()
-            self.workers.append(worker)
-        
-        self.running = True
-        print(f"[WorkerPool] All workers started", file=sys.stderr, flush=True)
-    
-    def submit_task(self, task_id: str, data: Dict[str, Any], priority: int = 0) -> float:
+    def _create_worker(self, slot: Optional[int] = None) -> Worker:
         """
-        Submit a task to the worker pool
+        Create and start a worker with its own inbox
         
-        Returns: Task submission latency in milliseconds
+        Every worker gets a new id. A replacement passes the slot of the
+        worker it replaces so it inherits that worker's affinity keys; new
+        workers take the lowest free slot.
         """
-        start_time = time.time()
+        worker_id = self.next_worker_id
+        self.next_worker_id += 1
+        if slot is None:
+            slot = self._free_slot()
+        cpus = self.cpu_layout[slot % len(self.cpu_layout)] if self.cpu_layout else None
         
-        task_data = {
+        worker = Worker(
+            worker_id=worker_id,
+            worker_type=self.worker_type,
+            task_queue=Queue(),
+            result_queue=self.result_queue,
+            shutdown_event=self.shutdown_event,
+            cancel_queue=Queue(),
+            max_batch_size=self.max_batch_size,
+            batch_window_ms=self.batch_window_ms,
+            service=self.service,
+            cpus=cpus,
+            threads=len(cpus) if cpus else self.threads_per_worker
+        )
+        worker.slot = slot
+        worker.start()
+        return worker
+    
+    def _free_slot(self) -> int:
+        """Lowest hash ring slot no serving worker has"""
+        taken = {w.slot for w in self.workers if not w.draining}
+        return next(i for i in range(len(taken) + 1) if i not in taken)
+    
+    def _create_remote_worker(self, address: str) -> Worker:
+        """Create a RemoteWorker for a worker agent and start connecting to it"""
+        from worker_agent import RemoteWorker
+        
+        worker = RemoteWorker(
+            worker_id=self.next_worker_id,
+            worker_type=self.worker_type,
+            address=address,
+            result_queue=self.result_queue,
+            shutdown_event=self.shutdown_event,
+            shm_arena=self.shm_arena,
+            heartbeat_interval=self.heartbeat_interval,
+            heartbeat_timeout=self.heartbeat_timeout
+        )
+        self.next_worker_id += 1
+        worker.slot = self._free_slot()
+        worker.start()
+        return worker
+    
+    def _load_zygote_service(self):
+        """Load the service in this process so forked workers share its memory"""
+        if self.worker_type != WorkerType.NOOP and cuda_available():
+            print("[WorkerPool] CUDA device present, models cannot be shared across fork; falling back to per-worker loading", file=sys.stderr, flush=True)
+            self.spawn_mode = "per-worker"
+            return
+        
+        started = time.time()
+        try:
+            self.service = create_service(self.worker_type)
+        except Exception as e:
+            print(f"[WorkerPool] Zygote failed to load {self.worker_type.value} service, falling back to per-worker loading: {e}", file=sys.stderr, flush=True)
+            traceback.print_exc(file=sys.stderr)
+            self.spawn_mode = "per-worker"
+            return
+        self.service_load_time = time.time() - started
+        
+        # Move everything allocated so far out of the collector's reach, so GC
+        # passes in the workers do not write to (and un-share) the model's pages
+        gc.freeze()
+        print(f"[WorkerPool] Zygote loaded {self.worker_type.value} service in {self.service_load_time:.2f}s", file=sys.stderr, flush=True)
+    
+    def start(self):
+        """Start the worker pool"""
+        print(f"[WorkerPool] Starting {self.num_workers} {self.worker_type.value} workers...", file=sys.stderr, flush=True)
+        
+        if self.shm_size_mb > 0:
+            try:
+                self.shm_arena = ShmArena(self.shm_size_mb * 1024 * 1024, self.shm_threshold)
+                print(f"[WorkerPool] Shared memory arena {self.shm_arena.name}: {self.shm_size_mb} MB", file=sys.stderr, flush=True)
+            except OSError as e:
+                print(f"[WorkerPool] Shared memory unavailable, sending payloads inline: {e}", file=sys.stderr, flush=True)
+        
+        if self.spawn_mode == "zygote":
+            self._load_zygote_service()
+        
+        for _ in range(self.num_workers):
+            self.workers.append(self._create_worker())
+        for address in self.remote_agents:
+            self.workers.append(self._create_remote_worker(address))
+        self._rebuild_ring()
+        
+        self.running = True
+        self.collector_thread = threading.Thread(
+            target=self._collect_results,
+            name="ResultCollector",
+            daemon=True
+        )
+        self.collector_thread.start()
+        
+        if self.watchdog_interval > 0:
+            self.watchdog_thread = threading.Thread(
+                target=self._watchdog_loop,
+                name="Watchdog",
+                daemon=True
+            )
+            self.watchdog_thread.start()
+        
+        if self.admission_policy == "wait":
+            self.admission_thread = threading.Thread(
+                target=self._admission_loop,
+                name="Admission",
+                daemon=True
+            )
+            self.admission_thread.start()
+        
+        if self.max_workers > self.min_workers:
+            self.autoscaler_thread = threading.Thread(
+                target=self._autoscale_loop,
+                name="Autoscaler",
+                daemon=True
+            )
+            self.autoscaler_thread.start()
+            print(f"[WorkerPool] Autoscaling between {self.min_workers} and {self.max_workers} workers", file=sys.stderr, flush=True)
+        print(f"[WorkerPool] All workers started", file=sys.stderr, flush=True)
+    
+    def submit_task(
+        self,
+        task_id: str,
+        data: Dict[str, Any],
+        priority: int = 0,
+        lane: Optional[str] = None,
+        deadline: Optional[float] = None,
+        stream: bool = False,
+        affinity: Optional[str] = None,
+        coalesce: bool = True
+    ) -> float:
+        """
+        Submit a task to the worker pool
+        
+        The lane defaults to lane_for_priority(priority). deadline is a Unix
+        timestamp; tasks still waiting when it passes are dropped with an
+        "expired" result instead of running. With stream=True the worker
+        also sends ordered partial results (TTS audio chunks, STT segments,
+        LLM tokens) before the final result. affinity (default: the value of
+        data[affinity_key]) routes all tasks with the same key to one worker.
+        
+        A deterministic task identical to one still queued or running in the
+        same lane, whose deadline is no earlier than its own, is coalesced
+        with it: it never reaches a worker and gets a copy of the first
+        task's partials and result under its own task_id (tagged
+        "coalesced_with"). Tasks with an affinity key touch per-session
+        worker state and are never coalesced; coalesce=False opts out.
+        
+        Never blocks: when the queue is full the admission policy applies,
+        and Overloaded is raised if the task is turned away.
+        
+        Returns: Task submission latency in milliseconds
+        """
+        start_time = time.time()
+        lane = lane or lane_for_priority(priority)
+        if affinity is None and self.affinity_key and data.get(self.affinity_key) not in (None, ""):
+            affinity = str(data[self.affinity_key])
+        
+        key = coalesce_key(self.worker_type, data, stream) if self.coalesce and coalesce and affinity is None else None
+        if key is not None:
+            with self.lock:
+                if self._attach(task_id, key, lane, deadline):
+                    self.tasks_submitted += 1
+                    return (time.time() - start_time) * 1000
+        
+        if self.shm_arena is not None:
+            data, offsets = self.shm_arena.offload(data)
+            if offsets:
+                with self.lock:
+                    self.shm_blocks[task_id] = offsets
+        
+        task_data = {
             "task_id": task_id,
             "worker_type": self.worker_type,
             "data": data,
             "priority": priority,
-            "submitted_at": start_time
+            "submitted_at": start_time,
+            "lane": lane,
+            "deadline": deadline,
+            "binary": self.binary_payloads,
+            "attempts": 0,
+            "stream": stream,
+            "affinity": affinity
         }
         
-        self.task_queue.put(task_data)
-        self.tasks_submitted += 1
+        with self.lock:
+            try:
+                self._admit(task_data)
+            except Exception:
+                self._release_shm(task_id)
+                raise
+            self.tasks_submitted += 1
+            if key is not None and (lane, key) not in self.coalesce_leaders:
+                # An identical task admitted since the check above keeps the key
+                self.coalesce_leaders[(lane, key)] = task_id
+                self.coalesce_groups[task_id] = {
+                    "key": (lane, key),
+                    "deadline": deadline,
+                    "followers": [],
+                    "leader_cancelled": False
+                }
+                self.coalesce_leads += 1
+            self._dispatch()
         
         submission_latency = (time.time() - start_time) * 1000  # Convert to ms
         return submission_latency
     
-    def get_result(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
-        """Get a result from the result queue"""
+    def _attach(self, task_id: str, key: str, lane: str, deadline: Optional[float]) -> bool:
+        """
+        Make a task a follower of the in-flight task with the same key, if
+        any (caller holds self.lock)
+        
+        Only a leader in the same lane qualifies, so a follower never waits
+        behind a lower lane's queue, and only one that outlives the follower:
+        a leader that expires takes its followers with it.
+        """
+        leader = self.coalesce_leaders.get((lane, key))
+        if leader is None or self.partials_sent.get(leader):
+            # A stream that has started would reach the follower without its head
+            return False
+        leader_deadline = self.coalesce_groups[leader]["deadline"]
+        if leader_deadline is not None and (deadline is None or deadline > leader_deadline):
+            return False
+        self.coalesce_groups[leader]["followers"].append(task_id)
+        self.coalesce_followers[task_id] = leader
+        self.coalesce_hits += 1
+        return True
+    
+    def _fan_out(self, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """The messages a result turns into: the leader's own plus a copy per follower (caller holds self.lock)"""
+        leader = result["task_id"]
+        group = self.coalesce_groups.get(leader)
+        if group is None:
+            return [result]
+        
+        copies = [{**result, "task_id": follower, "coalesced_with": leader} for follower in group["followers"]]
+        final = "partial" not in result
+        if final:
+            self._close_group(leader)
+            for _ in copies:
+                self._count_outcome(result["status"])
+            self.coalesced_results += len(copies)
+        
+        if not group["leader_cancelled"]:
+            return [result] + copies
+        if not final:
+            return copies
+        cancelled = {
+            "task_id": leader,
+            "status": "cancelled",
+            "error": "Task cancelled",
+            "worker_id": result.get("worker_id"),
+            "processing_time": 0.0
+        }
+        return [cancelled] + copies
+    
+    def _close_group(self, leader: str):
+        """Forget a leader's coalescing group once its result is out (caller holds self.lock)"""
+        group = self.coalesce_groups.pop(leader, None)
+        if group is None:
+            return
+        if self.coalesce_leaders.get(group["key"]) == leader:
+            del self.coalesce_leaders[group["key"]]
+        for follower in group["followers"]:
+            self.coalesce_followers.pop(follower, None)
+    
+    def _admit(self, task_data: Dict[str, Any]):
+        """Queue a task, applying the admission policy if the queue is full (caller holds self.lock)"""
+        lane = task_data["lane"]
+        if lane not in self.scheduler.queues:
+            raise ValueError(f"Unknown lane: {lane}")
+        
+        # Waiters are ahead of new arrivals
+        if len(self.scheduler) < self.scheduler.max_size and not self.admission_waiters:
+            self.scheduler.push(task_data, lane)
+            return
+        
+        if self.admission_policy == "shed":
+            victim = self.scheduler.shed_below(lane)
+            if victim is not None:
+                self.tasks_shed += 1
+                self._release_shm(victim["task_id"])
+                self._drop_task(victim, "overloaded", error="Shed to admit higher-priority work",
+                                **self._overload_hints("shed"))
+                self.scheduler.push(task_data, lane)
+                return
+        elif self.admission_policy == "wait" and len(self.admission_waiters) < self.scheduler.max_size:
+            self.admission_waiters.append((time.time() + self.admission_wait_ms / 1000.0, task_data))
+            return
+        
+        self.tasks_rejected += 1
+        raise Overloaded(self._overload_hints("queue_full"))
+    
+    def _admit_waiters(self):
+        """Move parked tasks into freed queue space, failing those whose wait ran out (caller holds self.lock)"""
+        now = time.time()
+        while self.admission_waiters:
+            expires_at, task_data = self.admission_waiters[0]
+            if len(self.scheduler) < self.scheduler.max_size:
+                self.admission_waiters.popleft()
+                self.scheduler.push(task_data, task_data["lane"])
+            elif now >= expires_at:
+                self.admission_waiters.popleft()
+                self.tasks_rejected += 1
+                self._release_shm(task_data["task_id"])
+                self._drop_task(task_data, "overloaded", error=f"No queue space within {self.admission_wait_ms:g}ms",
+                                **self._overload_hints("wait_timeout"))
+            else:
+                return
+    
+    def _admission_loop(self):
+        """Expire parked tasks on time even when nothing else is happening ("wait" policy)"""
+        while not self.shutdown_event.wait(0.05):
+            with self.lock:
+                self._admit_waiters()
+    
+    def _overload_hints(self, reason: str) -> Dict[str, Any]:
+        """Queue depth and back-off hints for an overloaded reply (caller holds self.lock)"""
+        rate = self.scheduler.dispatch_rate(min(10.0, max(time.time() - self.started_at, 1.0)))
+        backlog = len(self.scheduler) + len(self.admission_waiters)
+        return {
+            "reason": reason,
+            "policy": self.admission_policy,
+            "queue_depth": len(self.scheduler),
+            "max_queue_size": self.scheduler.max_size,
+            "waiting": len(self.admission_waiters),
+            "lane_depths": {name: len(q) for name, q in self.scheduler.queues.items()},
+            "in_flight": sum(len(w.in_flight) for w in self.workers),
+            "alive_workers": sum(1 for w in self.workers if w.is_alive()),
+            # Rough time until a queue slot frees up, from the recent dispatch rate
+            "retry_after_ms": round(1000 * (backlog - self.scheduler.max_size + 1) / rate) if rate else None
+        }
+    
+    def _dispatch(self):
+        """Hand queued tasks to workers with free slots (caller holds self.lock)"""
+        while True:
+            if self.admission_waiters:
+                self._admit_waiters()
+            
+            candidates = [
+                w for w in self.workers
+                if not w.draining and w.ready.value and len(w.in_flight) < (w.capacity or self.prefetch) and w.is_alive()
+            ]
+            if not candidates:
+                return
+            
+            # Affine tasks parked for a worker that now has room go first
+            worker = next((w for w in candidates if w.worker_id in self.scheduler.parked), None)
+            if worker is not None:
+                task_data = self.scheduler.pop_parked(worker.worker_id)
+            else:
+                task_data = self.scheduler.pop()
+                if task_data is None:
+                    return
+            
+            if task_data["deadline"] is not None and time.time() > task_data["deadline"]:
+                self._unpin(task_data)
+                self._drop_task(task_data, "expired")
+                continue
+            
+            if worker is None and task_data.get("affinity") is not None:
+                worker = self._route(task_data["affinity"]) or min(candidates, key=self._load)
+                self._pin(task_data, worker)
+                self.affine_tasks_routed += 1
+                if worker not in candidates:
+                    # Its worker is busy: wait for it rather than run elsewhere
+                    self.scheduler.park(worker.worker_id, task_data)
+                    self.affine_tasks_parked += 1
+                    continue
+            elif worker is None:
+                worker = min(candidates, key=self._load)
+            
+            worker.in_flight[task_data["task_id"]] = task_data
+            worker.idle_since = None
+            worker.task_queue.put(task_data)
+    
+    def _load(self, worker: Worker) -> float:
+        """Fraction of a worker's task slots in use; agents hold several tasks each"""
+        return len(worker.in_flight) / (worker.capacity or self.prefetch)
+    
+    def _route(self, key: str) -> Optional[Worker]:
+        """Worker for an affinity key: its pinned worker, else the ring owner (caller holds self.lock)"""
+        pin = self.affinity_pins.get(key)
+        if pin is not None:
+            # A retiring worker keeps its keys until its last task is done
+            pinned = next((w for w in self.workers if w.worker_id == pin[0]), None)
+            if pinned is not None and (not pinned.draining or pinned.in_flight):
+                return pinned
+        slot = self.ring.lookup(key)
+        owner = next((w for w in self.workers if not w.draining and w.slot == slot), None)
+        if owner is not None and owner.remote and not owner.is_alive():
+            # A lost agent's keys go to the least loaded worker until it reconnects
+            return None
+        return owner
+    
+    def _pin(self, task_data: Dict[str, Any], worker: Worker):
+        """Record an outstanding affine task on worker (caller holds self.lock)"""
+        key = task_data["affinity"]
+        pin = self.affinity_pins.get(key)
+        if pin is None or pin[0] != worker.worker_id:
+            pin = self.affinity_pins[key] = (worker.worker_id, set())
+        pin[1].add(task_data["task_id"])
+    
+    def _unpin(self, task_data: Dict[str, Any]):
+        """Forget a finished or dropped affine task; the key is free to move once none remain (caller holds self.lock)"""
+        key = task_data.get("affinity")
+        pin = self.affinity_pins.get(key) if key is not None else None
+        if pin is None:
+            return
+        pin[1].discard(task_data["task_id"])
+        if not pin[1]:
+            del self.affinity_pins[key]
+    
+    def _rebuild_ring(self):
+        """
+        Re-place worker slots on the hash ring after the worker set changed
+        (caller holds self.lock)
+        
+        Keys pinned to, and tasks parked for, workers that left are released
+        and routed again from their lane. A retiring worker that is still
+        running tasks keeps them until it finishes (see _complete).
+        """
+        holding = {w.worker_id for w in self.workers if not w.draining or w.in_flight}
+        self.ring.rebuild([w.slot for w in self.workers if not w.draining])
+        
+        for key, (worker_id, _) in list(self.affinity_pins.items()):
+            if worker_id not in holding:
+                del self.affinity_pins[key]
+        for worker_id in list(self.scheduler.parked):
+            if worker_id not in holding:
+                self._release_parked(worker_id)
+    
+    def _release_parked(self, worker_id: int):
+        """Send tasks parked for a worker back to the head of their lanes (caller holds self.lock)"""
+        for task_data in reversed(self.scheduler.unpark(worker_id)):
+            self._unpin(task_data)
+            self.scheduler.requeue(task_data)
+    
+    def _drop_task(self, task_data: Dict[str, Any], status: str, error: Optional[str] = None, **fields):
+        """Report a task outcome on behalf of a worker (never started, or its worker died)"""
+        self.result_queue.put({
+            "task_id": task_data["task_id"],
+            "status": status,
+            "error": error or f"Task {status} before start",
+            "worker_id": None,
+            "processing_time": 0.0,
+            **fields
+        })
+    
+    def _release_shm(self, task_id: str):
+        """Free a task's shared memory blocks (caller holds self.lock)"""
+        offsets = self.shm_blocks.pop(task_id, None)
+        if offsets and self.shm_arena is not None:
+            self.shm_arena.release(offsets)
+    
+    def cancel_task(self, task_id: str) -> str:
+        """
+        Cancel a task
+        
+        Queued tasks are removed immediately; tasks already handed to a worker
+        are flagged so the worker skips them or stops between chunks. A
+        coalesced follower is detached from its leader; a leader that still
+        has followers keeps running for them and gets its "cancelled" result
+        when it finishes.
+        
+        Returns: "queued", "in_flight", "coalesced" or "unknown"
+        """
+        with self.lock:
+            leader = self.coalesce_followers.pop(task_id, None)
+            if leader is not None:
+                group = self.coalesce_groups[leader]
+                group["followers"].remove(task_id)
+                self._drop_task({"task_id": task_id}, "cancelled")
+                if group["followers"] or not group["leader_cancelled"]:
+                    return "coalesced"
+                # Nobody is waiting for the shared run any more: cancel it for real
+                self._close_group(leader)
+                task_id = leader
+            elif self.coalesce_groups.get(task_id, {}).get("followers"):
+                self.coalesce_groups[task_id]["leader_cancelled"] = True
+                return "coalesced"
+            
+            task_data = self.scheduler.remove(task_id)
+            if task_data is not None:
+                self._unpin(task_data)
+                self._drop_task(task_data, "cancelled")
+                return "queued"
+            
+            for worker in self.workers:
+                if task_id in worker.in_flight:
+                    worker.cancel_queue.put(task_id)
+                    return "in_flight"
+        
+        return "unknown"
+    
+    def _collect_results(self):
+        """Drain result_queue, free worker slots and deliver results"""
+        while not self.shutdown_event.is_set():
+            try:
+                result = self.result_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            if "event" in result:
+                self._deliver_event(result)
+                continue
+            
+            with self.lock:
+                # Results are only accepted from the worker currently holding the
+                # task; anything else comes from a worker the watchdog already
+                # replaced, and the task has been requeued or failed since
+                worker = None
+                if result.get("worker_id") is not None:
+                    worker = next((w for w in self.workers if w.worker_id == result["worker_id"]), None)
+                    if worker is None or result["task_id"] not in worker.in_flight:
+                        self.stale_results += 1
+                        continue
+                service_metrics = result.pop("service_metrics", None)
+                if service_metrics is not None and worker is not None:
+                    worker.service_metrics = service_metrics
+                
+                if "partial" in result:
+                    # Streaming: the task is still running, its slot stays taken
+                    self.partials_sent[result["task_id"]] = result["sequence"] + 1
+                    self.partials_forwarded += 1
+                    listener = self.result_listener
+                else:
+                    listener = self._complete(result, worker)
+                messages = self._fan_out(result)
+            
+            for message in messages:
+                if listener is None:
+                    self.completed_results.put(message)
+                    continue
+                
+                try:
+                    listener(message)
+                except Exception as e:
+                    print(f"[WorkerPool] Failed to forward result {message.get('task_id')}: {e}", file=sys.stderr, flush=True)
+                    traceback.print_exc(file=sys.stderr)
+    
+    def _deliver_event(self, event: Dict[str, Any]):
+        """Handle a worker lifecycle event; pushed to the listener only (pollers see metrics)"""
+        with self.lock:
+            message = self._worker_ready(event)
+            listener = self.result_listener
+        
+        if message is None or listener is None:
+            return
         try:
-            result = self.result_queue.get(timeout=timeout)
-            if result["status"] == "success":
-                self.tasks_completed += 1
+            listener(message)
+        except Exception as e:
+            print(f"[WorkerPool] Failed to forward {message['event']} event: {e}", file=sys.stderr, flush=True)
+    
+    def _worker_ready(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Record a worker's ready event and start feeding it (caller holds self.lock)"""
+        worker_id = event["worker_id"]
+        worker = next((w for w in self.workers if w.worker_id == worker_id), None)
+        if worker is None:
+            # A recycle replacement joins self.workers at the next health check
+            worker = next((r for r, _, _ in self.recycling.values() if r.worker_id == worker_id), None)
+        if worker is None:
+            return None
+        
+        worker.ready_at = time.time()
+        worker.load_time = event["load_s"]
+        worker.warmup_time = event["warmup_s"]
+        readiness = self.readiness()
+        time_to_ready = worker.ready_at - worker.started_at
+        print(f"[WorkerPool] Worker {worker_id} ready after {time_to_ready:.2f}s (load {worker.load_time:.2f}s, warm-up {worker.warmup_time:.2f}s); {readiness['ready_workers']}/{readiness['num_workers']} workers ready", file=sys.stderr, flush=True)
+        
+        self._dispatch()
+        return {
+            "event": "worker_ready",
+            "worker_id": worker_id,
+            "slot": worker.slot,
+            "load_s": round(worker.load_time, 3),
+            "warmup_s": round(worker.warmup_time, 3),
+            "time_to_ready_s": round(time_to_ready, 3),
+            "readiness": readiness["state"],
+            "ready_workers": readiness["ready_workers"],
+            "num_workers": readiness["num_workers"]
+        }
+    
+    def readiness(self) -> Dict[str, Any]:
+        """
+        Pool readiness: "starting" (no worker ready), "partial" or "full"
+        
+        Counts the workers that are serving (not draining) and have loaded and
+        warmed up their service; ready is True once ready_quorum of them are.
+        """
+        with self.lock:
+            serving = [w for w in self.workers if not w.draining]
+            ready = [w for w in serving if w.ready.value and w.is_alive()]
+            if not ready:
+                state = "starting"
             else:
-                self.tasks_failed += 1
-            return result
+                state = "full" if len(ready) == len(serving) else "partial"
+            return {
+                "state": state,
+                "ready": len(ready) >= self.ready_quorum,
+                "quorum": self.ready_quorum,
+                "ready_workers": len(ready),
+                "num_workers": len(serving),
+                "time_to_ready_s": {
+                    str(w.worker_id): round(w.ready_at - w.started_at, 3)
+                    for w in ready if w.ready_at is not None
+                }
+            }
+    
+    def _complete(self, result: Dict[str, Any], worker: Optional[Worker]) -> Optional[Callable[[Dict[str, Any]], None]]:
+        """Account for a final result and refill the worker (caller holds self.lock); returns the listener"""
+        status = result["status"]
+        if self.coalesce_groups.get(result["task_id"], {}).get("leader_cancelled"):
+            # The run finished for its followers; its own submitter had cancelled
+            self._count_outcome("cancelled")
+        else:
+            self._count_outcome(status)
+        
+        if result.get("batch_index") == 0:
+            size = result["batch_size"]
+            self.batch_histogram[size] = self.batch_histogram.get(size, 0) + 1
+        
+        if worker is not None:
+            task_data = worker.in_flight.pop(result["task_id"], None)
+            if task_data is not None:
+                self._unpin(task_data)
+            if not worker.in_flight:
+                worker.idle_since = time.time()
+                if worker.draining:
+                    # Sessions that waited for this retiring worker can move now
+                    self._release_parked(worker.worker_id)
+            worker.record_result(result)
+        
+        timings = result.get("timings", {})
+        for stage, seconds in timings.items():
+            if stage == "queue_wait" or status == "success":
+                self.latency[stage].record(seconds * 1000)
+        
+        self._release_shm(result["task_id"])
+        partials = self.partials_sent.pop(result["task_id"], 0)
+        if partials:
+            result["partials"] = partials
+        
+        self._dispatch()
+        return self.result_listener
+    
+    def _count_outcome(self, status: str):
+        """Count one submitted task's final status (caller holds self.lock)"""
+        if status == "success":
+            self.tasks_completed += 1
+        elif status == "cancelled":
+            self.tasks_cancelled += 1
+        elif status == "expired":
+            self.tasks_expired += 1
+        else:
+            self.tasks_failed += 1
+    
+    def get_result(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Get a buffered result (only used when no result listener is set)"""
+        try:
+            return self.completed_results.get(timeout=timeout)
         except queue.Empty:
             return None
     
+    def start_result_forwarder(self, listener: Callable[[Dict[str, Any]], None]):
+        """
+        Deliver results to listener as soon as workers finish them
+        
+        Callers no longer need to poll with get_result().
+        """
+        with self.lock:
+            self.result_listener = listener
+        
+        # Flush anything collected before the listener was attached
+        while True:
+            result = self.get_result(timeout=0)
+            if result is None:
+                break
+            listener(result)
+    
+    def _autoscale_loop(self):
+        """Autoscaler controller loop"""
+        while not self.shutdown_event.wait(self.autoscale_policy.interval):
+            try:
+                self.autoscale()
+            except Exception as e:
+                print(f"[WorkerPool] Autoscaler error: {e}", file=sys.stderr, flush=True)
+                traceback.print_exc(file=sys.stderr)
+    
+    def autoscale(self):
+        """One controller tick: reap retired workers, then scale up or retire one idle worker"""
+        policy = self.autoscale_policy
+        now = time.time()
+        
+        with self.lock:
+            self._reap_retired()
+            active = [w for w in self.workers if not w.draining and not w.remote]
+            self.num_workers = len(active)
+            
+            queue_depth = len(self.scheduler)
+            p95_wait_ms = self.scheduler.recent_wait_p95(policy.wait_window) * 1000
+            
+            if len(active) < self.max_workers and now - self.last_scale_up >= policy.scale_up_cooldown:
+                reason = None
+                if queue_depth >= policy.scale_up_queue_depth * max(len(active), 1):
+                    reason = f"queue_depth={queue_depth}"
+                elif queue_depth > 0 and p95_wait_ms >= policy.scale_up_p95_wait_ms:
+                    reason = f"p95_wait_ms={p95_wait_ms:.0f}"
+                
+                if reason:
+                    worker = self._create_worker()
+                    self.workers.append(worker)
+                    self._rebuild_ring()
+                    self.last_scale_up = now
+                    self._record_scaling("scale_up", worker.worker_id, reason)
+                    self._dispatch()
+                    return
+            
+            if len(active) > self.min_workers and queue_depth == 0:
+                idle = [
+                    w for w in active
+                    if w.idle_since is not None and now - w.idle_since >= policy.idle_cooldown
+                ]
+                if idle:
+                    worker = min(idle, key=lambda w: w.idle_since)
+                    self._retire_worker(worker, f"idle_s={now - worker.idle_since:.0f}")
+    
+    def _reap_retired(self):
+        """Drained workers exit on their own; drop them once their last results are in (caller holds self.lock)"""
+        self.workers = [w for w in self.workers if not (w.draining and not w.is_alive() and not w.in_flight)]
+    
+    def _retire_worker(self, worker: Worker, reason: str):
+        """Stop dispatching to a worker and let it exit after its inbox drains (caller holds self.lock)"""
+        worker.draining = True
+        worker.stop()
+        self._rebuild_ring()
+        self._record_scaling("scale_down", worker.worker_id, reason)
+    
+    def _record_scaling(self, action: str, worker_id: int, reason: str):
+        """Log a scaling decision (caller holds self.lock)"""
+        self.num_workers = sum(1 for w in self.workers if not w.draining and not w.remote)
+        if action == "scale_up":
+            self.scale_ups += 1
+        else:
+            self.scale_downs += 1
+        
+        self.scaling_events.append({
+            "at": time.time(),
+            "action": action,
+            "worker_id": worker_id,
+            "reason": reason,
+            "num_workers": self.num_workers
+        })
+        print(f"[WorkerPool] {action} worker {worker_id} ({reason}), now {self.num_workers} workers", file=sys.stderr, flush=True)
+    
     def get_metrics(self) -> Dict[str, Any]:
         """Get worker pool metrics"""
         alive_workers = sum(1 for w in self.workers if w.is_alive())
         
+        with self.lock:
+            queue_depth = len(self.scheduler)
+            lanes = self.scheduler.get_metrics()
+            in_flight = sum(len(w.in_flight) for w in self.workers)
+            histogram = dict(sorted(self.batch_histogram.items()))
+            draining_workers = sum(1 for w in self.workers if w.draining)
+            scaling_events = list(self.scaling_events)
+            waiting = len(self.admission_waiters)
+            workers = [self._worker_metrics(w) for w in self.workers]
+            latency = {stage: hist.summary() for stage, hist in self.latency.items()}
+            active_streams = len(self.partials_sent)
+            parked = self.scheduler.parked_count()
+            pinned_keys = len(self.affinity_pins)
+            recycling = [
+                {"worker_id": old_id, "replacement_id": replacement.worker_id, "reason": reason, "since": started}
+                for old_id, (replacement, reason, started) in self.recycling.items()
+            ]
+            recycle_events = list(self.recycle_events)
+            readiness = self.readiness()
+            agents = [
+                {"worker_id": w.worker_id, "in_flight": len(w.in_flight), **w.link_metrics()}
+                for w in self.workers if w.remote
+            ]
+            coalesce_groups = len(self.coalesce_groups)
+            coalesce_waiting = len(self.coalesce_followers)
+        
+        batches = sum(histogram.values())
+        eligible = self.coalesce_hits + self.coalesce_leads
+        active = [w for w in workers if w["status"] in ("idle", "busy")]
+        
         return {
             "worker_type": self.worker_type.value,
+            "result_delivery": "push" if self.result_listener is not None else "poll",
+            "spawn_mode": self.spawn_mode,
+            "cpu_affinity": self.cpu_affinity,
+            "cpuset": self.cpuset,
             "num_workers": self.num_workers,
             "alive_workers": alive_workers,
+            "readiness": readiness,
             "tasks_submitted": self.tasks_submitted,
             "tasks_completed": self.tasks_completed,
             "tasks_failed": self.tasks_failed,
-            "queue_depth": self.task_queue.qsize(),
-            "worker_utilization": (self.num_workers - alive_workers) / self.num_workers if self.num_workers > 0 else 0
+            "tasks_cancelled": self.tasks_cancelled,
+            "tasks_expired": self.tasks_expired,
+            "queue_depth": queue_depth,
+            "in_flight": in_flight,
+            "lanes": lanes,
+            "shm": self.shm_arena.get_metrics() if self.shm_arena is not None else None,
+            "batching": {
+                "max_batch_size": self.max_batch_size,
+                "window_ms": self.batch_window_ms,
+                "batches": batches,
+                "avg_batch_size": sum(size * count for size, count in histogram.items()) / batches if batches else 0.0,
+                "histogram": histogram
+            },
+            "affinity": {
+                "key": self.affinity_key,
+                "pinned_keys": pinned_keys,
+                "parked": parked,
+                "routed": self.affine_tasks_routed,
+                "parked_total": self.affine_tasks_parked
+            },
+            "streaming": {
+                "active_streams": active_streams,
+                "partials_forwarded": self.partials_forwarded
+            },
+            "coalescing": {
+                "enabled": self.coalesce and self.worker_type in COALESCABLE_WORKER_TYPES,
+                "hits": self.coalesce_hits,  # Tasks answered by another task's run
+                "leaders": self.coalesce_leads,
+                "hit_rate": round(self.coalesce_hits / eligible, 4) if eligible else 0.0,
+                "open_groups": coalesce_groups,
+                "waiting_followers": coalesce_waiting,
+                "fanned_out_results": self.coalesced_results
+            },
+            "admission": {
+                "policy": self.admission_policy,
+                "max_queue_size": self.scheduler.max_size,
+                "wait_ms": self.admission_wait_ms,
+                "waiting": waiting,
+                "rejected": self.tasks_rejected,
+                "shed": self.tasks_shed
+            },
+            "watchdog": {
+                "max_task_seconds": self.max_task_seconds,
+                "max_task_retries": self.max_task_retries,
+                "worker_crashes": self.worker_crashes,
+                "worker_hangs": self.worker_hangs,
+                "tasks_requeued": self.tasks_requeued,
+                "stale_results": self.stale_results
+            },
+            "autoscaling": {
+                "enabled": self.max_workers > self.min_workers,
+                "min_workers": self.min_workers,
+                "max_workers": self.max_workers,
+                "draining_workers": draining_workers,
+                "scale_ups": self.scale_ups,
+                "scale_downs": self.scale_downs,
+                "recent_events": scaling_events
+            },
+            "recycling": {
+                "max_tasks_per_worker": self.max_tasks_per_worker,
+                "max_rss_mb": self.max_rss_mb,
+                "recycles": self.recycles,
+                "failures": self.recycle_failures,
+                "in_progress": recycling,
+                "recent_events": recycle_events
+            },
+            "remote": {
+                "heartbeat_interval_s": self.heartbeat_interval,
+                "heartbeat_timeout_s": self.heartbeat_timeout,
+                "failovers": self.agent_failovers,
+                "agents": agents
+            },
+            "latency_ms": latency,
+            "result_cache": self._cache_totals(workers),
+            "workers": workers,
+            # Mean busy fraction of live workers over the last utilization_window seconds
+            "worker_utilization": sum(w["utilization"] for w in active) / len(active) if active else 0.0,
+            "utilization_window_s": self.utilization_window
+        }
+    
+    @staticmethod
+    def _cache_totals(workers: List[Dict[str, Any]]) -> Optional[Dict[str, int]]:
+        """Result cache counters summed over workers whose service reports a cache (STT), else None"""
+        caches = [w["service"]["cache"] for w in workers if (w.get("service") or {}).get("cache")]
+        if not caches:
+            return None
+        totals = {
+            key: sum(cache[key] for cache in caches)
+            for key in ("memory_hits", "disk_hits", "misses", "stores", "memory_evictions", "disk_evictions")
+        }
+        lookups = totals["memory_hits"] + totals["disk_hits"] + totals["misses"]
+        totals["hit_rate"] = round((totals["memory_hits"] + totals["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return totals
+    
+    def _worker_metrics(self, worker: Worker) -> Dict[str, Any]:
+        """Stats, state and stage percentiles for one worker (caller holds self.lock)"""
+        stats = worker.stats
+        if not worker.is_alive():
+            stats.status = "dead"
+        elif worker.draining:
+            stats.status = "draining"
+        elif not worker.ready.value:
+            stats.status = "starting"
+        else:
+            stats.status = "busy" if worker.busy_since.value else "idle"
+        
+        rss_mb = worker.rss_mb()
+        return {
+            "worker_id": worker.worker_id,
+            "slot": worker.slot,
+            "pid": worker.process.pid if worker.process is not None else None,
+            "remote": worker.address if worker.remote else None,
+            "capacity": worker.capacity or self.prefetch,
+            "cpus": worker.cpus,
+            "threads": worker.threads or None,
+            "status": stats.status,
+            "tasks_processed": stats.tasks_processed,
+            "errors": stats.errors,
+            "in_flight": len(worker.in_flight),
+            "parked": len(self.scheduler.parked.get(worker.worker_id, ())),
+            "avg_processing_ms": round(stats.avg_processing_time * 1000, 2),
+            "last_task_at": stats.last_task_at,
+            "busy_seconds": round(worker.busy_total(time.time()), 3),
+            "rss_mb": round(rss_mb, 1) if rss_mb is not None else None,
+            "load_s": round(worker.load_time, 3) if worker.ready_at is not None else None,
+            "warmup_s": round(worker.warmup_time, 3) if worker.ready_at is not None else None,
+            "time_to_ready_s": round(worker.ready_at - worker.started_at, 3) if worker.ready_at is not None else None,
+            "utilization": round(worker.utilization(self.utilization_window), 4),
+            "service": worker.service_metrics,
+            "latency_ms": {
+                stage: {key: value for key, value in hist.summary().items() if key in ("count", "p50", "p95", "p99")}
+                for stage, hist in worker.latency.items()
+            }
         }
     
+    def _watchdog_loop(self):
+        """Watchdog loop: health checks on a timer, independent of the stdin control loop"""
+        while not self.shutdown_event.wait(self.watchdog_interval):
+            try:
+                self.health_check()
+            except Exception as e:
+                print(f"[WorkerPool] Watchdog error: {e}", file=sys.stderr, flush=True)
+                traceback.print_exc(file=sys.stderr)
+    
     def health_check(self):
-        """Check worker health and restart failed workers"""
-        for i, worker in enumerate(self.workers):
-            if not worker.is_alive():
-                print(f"[WorkerPool] Worker {i} died, restarting...", file=sys.stderr, flush=True)
+        """Replace dead and hung workers, recovering the tasks they held"""
+        with self.lock:
+            if not self.running:
+                return
+            now = time.time()
+            replaced = False
+            
+            for i, worker in enumerate(self.workers):
+                if worker.is_alive():
+                    busy_since = worker.busy_since.value
+                    limit = self._task_limit(worker, busy_since)
+                    if not busy_since or now - busy_since <= limit:
+                        continue
+                    failure = "hung"
+                    self.worker_hangs += 1
+                    print(f"[WorkerPool] Worker {worker.worker_id} hung for {now - busy_since:.1f}s (limit {limit:g}s), killing...", file=sys.stderr, flush=True)
+                elif worker.remote:
+                    # Lost agent: fail its tasks over; it rejoins once it reconnects
+                    if worker.connected or worker.in_flight:
+                        self.agent_failovers += 1
+                        print(f"[WorkerPool] Agent {worker.address} (worker {worker.worker_id}) lost, failing over {len(worker.in_flight)} tasks", file=sys.stderr, flush=True)
+                        running = worker.running_task_ids()
+                        worker.disconnect()
+                        self._recover_tasks(worker, running, "lost")
+                        self._release_parked(worker.worker_id)
+                    continue
+                else:
+                    if worker.draining and worker.process.exitcode == 0:
+                        # Retired normally; the autoscaler reaps it once its results are in
+                        continue
+                    failure = "crashed"
+                    self.worker_crashes += 1
+                    print(f"[WorkerPool] Worker {worker.worker_id} died (exit code {worker.process.exitcode}), restarting...", file=sys.stderr, flush=True)
+                
+                running = worker.running_task_ids()
                 worker.terminate()
-                new_worker = Worker(
-                    worker_id=i,
-                    worker_type=self.worker_type,
-                    task_queue=self.task_queue,
-                    result_queue=self.result_queue,
-                    shutdown_event=self.shutdown_event
-                )
-                new_worker.start()
-                self.workers[i] = new_worker
+                self._recover_tasks(worker, running, failure)
+                if not worker.draining:
+                    # A fresh id, so late results from the old process are recognisably
+                    # stale; the same slot, so it takes over the old worker's sessions.
+                    # A replacement already starting for a recycle is used as is.
+                    pending = self.recycling.pop(worker.worker_id, None)
+                    self.workers[i] = pending[0] if pending else self._create_worker(slot=worker.slot)
+                replaced = True
+            
+            if self._check_recycling(now):
+                replaced = True
+            if replaced:
+                self._rebuild_ring()
+            self._reap_retired()
+            self._dispatch()
+    
+    def _task_limit(self, worker: Worker, busy_since: float) -> float:
+        """
+        Seconds the worker's running task(s) may take before counting as hung
+        (caller holds self.lock)
+        
+        The worker type's limit, or longer for a task whose deadline is later
+        (batch transcription of many files, say).
+        """
+        deadlines = [
+            task_data["deadline"]
+            for task_data in (worker.in_flight.get(task_id) for task_id in worker.running_task_ids())
+            if task_data is not None and task_data.get("deadline") is not None
+        ]
+        return max([self.max_task_seconds] + [deadline - busy_since for deadline in deadlines])
+    
+    def _check_recycling(self, now: float) -> bool:
+        """
+        Swap in replacements that have finished loading, and start one for
+        the next worker past its task or memory limit (caller holds self.lock)
+        
+        The replacement loads outside the dispatch set while the old worker
+        keeps serving; once it is ready it takes the old worker's place and
+        slot, and the old worker drains its inbox and exits. One recycle runs
+        at a time so a pool started together does not reload all at once.
+        Returns True if the worker set changed.
+        """
+        changed = False
+        
+        for old_id, (replacement, reason, started) in list(self.recycling.items()):
+            old = next((w for w in self.workers if w.worker_id == old_id), None)
+            if old is None or not replacement.is_alive():
+                del self.recycling[old_id]
+                if old is not None:
+                    self.recycle_failures += 1
+                    print(f"[WorkerPool] Replacement for worker {old_id} died while loading (exit code {replacement.process.exitcode})", file=sys.stderr, flush=True)
+                replacement.terminate()
+                continue
+            if not replacement.ready.value:
+                continue
+            
+            del self.recycling[old_id]
+            old.draining = True
+            old.stop()
+            self.workers[self.workers.index(old)] = replacement
+            self.workers.append(old)
+            self.recycles += 1
+            changed = True
+            
+            self.recycle_events.append({
+                "at": now,
+                "worker_id": old_id,
+                "replacement_id": replacement.worker_id,
+                "reason": reason,
+                "tasks_processed": old.stats.tasks_processed,
+                "rss_mb": round(old.rss_mb() or 0.0, 1),
+                "warmup_s": round(now - started, 2)
+            })
+            print(f"[WorkerPool] Recycled worker {old_id} ({reason}) -> worker {replacement.worker_id}, warm-up {now - started:.1f}s", file=sys.stderr, flush=True)
+        
+        if self.recycling or not (self.max_tasks_per_worker or self.max_rss_mb):
+            return changed
+        
+        for worker in self.workers:
+            if worker.remote or worker.draining or not worker.ready.value or not worker.is_alive():
+                continue
+            reason = None
+            if self.max_tasks_per_worker and worker.stats.tasks_processed >= self.max_tasks_per_worker:
+                reason = f"tasks={worker.stats.tasks_processed}"
+            elif self.max_rss_mb:
+                rss = worker.rss_mb()
+                if worker.loaded_rss_mb is None and rss is not None:
+                    worker.loaded_rss_mb = rss
+                    if rss >= self.max_rss_mb:
+                        print(f"[WorkerPool] Worker {worker.worker_id} needs {rss:.0f} MB just to load, above --max-rss-mb {self.max_rss_mb:g}; not recycling it for memory", file=sys.stderr, flush=True)
+                # A fresh worker would be over the limit too; recycling it would only loop
+                if rss is not None and rss >= self.max_rss_mb > worker.loaded_rss_mb:
+                    reason = f"rss_mb={rss:.0f}"
+            if reason:
+                print(f"[WorkerPool] Recycling worker {worker.worker_id} ({reason}), starting replacement...", file=sys.stderr, flush=True)
+                self.recycling[worker.worker_id] = (self._create_worker(slot=worker.slot), reason, now)
+                break
+        
+        return changed
+    
+    def _recover_tasks(self, worker: Worker, running: List[str], failure: str):
+        """
+        Requeue the tasks a dead worker held (caller holds self.lock)
+        
+        Tasks still waiting in its inbox go back to the head of their lane.
+        The task(s) it was executing count an attempt: they are rerun until
+        max_task_retries is used up, then failed with the reason. Streaming
+        tasks that already sent partials are failed straight away, since a
+        rerun would send the client the same partials again.
+        """
+        # Requeueing puts each task at the head of its lane, so walk the
+        # backlog newest first to keep it in dispatch order (a session's frames)
+        for task_id, task_data in reversed(list(worker.in_flight.items())):
+            self._unpin(task_data)
+            if task_id in running:
+                task_data["attempts"] = task_data.get("attempts", 0) + 1
+                partials = self.partials_sent.pop(task_id, 0)
+                if partials:
+                    error = f"Worker {worker.worker_id} {failure} after streaming {partials} partial results"
+                elif task_data["attempts"] > self.max_task_retries:
+                    error = (f"Worker {worker.worker_id} {failure} while running this task "
+                             f"(attempt {task_data['attempts']} of {self.max_task_retries + 1})")
+                else:
+                    error = None
+                if error:
+                    self._release_shm(task_id)
+                    self._drop_task(
+                        task_data,
+                        "error",
+                        error=error,
+                        error_type=f"worker_{failure}",
+                        attempts=task_data["attempts"]
+                    )
+                    continue
+            
+            self.scheduler.requeue(task_data)
+            self.tasks_requeued += 1
+        
+        worker.in_flight.clear()
     
     def shutdown(self):
         """Gracefully shutdown the worker pool"""
@@ -428,9 +2675,12 @@ class WorkerPool:
         self.shutdown_event.set()
         
         # Wait for workers to finish
-        for worker in self.workers:
+        for worker in self.workers + [pending[0] for pending in self.recycling.values()]:
             worker.terminate()
         
+        if self.shm_arena is not None:
+            self.shm_arena.close()
+        
         print(f"[WorkerPool] Shutdown complete", file=sys.stderr, flush=True)
     
     def _handle_shutdown(self, signum, frame):
@@ -440,113 +2690,364 @@ class WorkerPool:
         sys.exit(0)
 
 
+def result_message(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap a collected result for stdout: worker events by name, task_partial for streaming partials, else task_result"""
+    if "event" in result:
+        return {"type": result["event"], **{key: value for key, value in result.items() if key != "event"}}
+    return {"type": "task_partial" if "partial" in result else "task_result", **result}
+
+
+class ControlPlane:
+    """
+    asyncio front end of the pool process
+    
+    The event loop reads commands from stdin and writes every outgoing
+    message (replies and pushed results) through one outbox that a writer
+    task flushes in batches, with backpressure. Submits and cancels are
+    handled inline, in order; commands that can block (metrics, health
+    checks, get_result polling, shutdown) run in the default executor so
+    they never hold up the commands behind them. Health checks run on their
+    own timer.
+    """
+    
+    # Largest JSON line accepted (base64 audio of long uploads)
+    MAX_LINE_BYTES = 256 * 1024 * 1024
+    
+    def __init__(self, pool: WorkerPool, protocol: JsonLinesProtocol, health_interval: float = 1.0):
+        self.pool = pool
+        self.protocol = protocol
+        self.health_interval = health_interval
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None  # None: stdout is not a pipe, write directly
+        self.outbox: Optional[asyncio.Queue] = None
+        self.commands: set = set()  # Executor-backed commands still running
+    
+    def send(self, message: Dict[str, Any]):
+        """Queue a message for stdout (event loop thread only)"""
+        self.outbox.put_nowait(message)
+    
+    def send_threadsafe(self, message: Dict[str, Any]):
+        """Queue a message for stdout from any thread"""
+        self.loop.call_soon_threadsafe(self.outbox.put_nowait, message)
+    
+    async def _open_streams(self):
+        """Attach stdin/stdout to the loop; regular files fall back to a feeder thread / plain writes"""
+        self.reader = asyncio.StreamReader(limit=self.MAX_LINE_BYTES)
+        try:
+            await self.loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(self.reader), self.protocol.reader)
+        except ValueError:
+            threading.Thread(target=self._feed_reader, name="ProtocolReader", daemon=True).start()
+        
+        try:
+            transport, flow = await self.loop.connect_write_pipe(asyncio.streams.FlowControlMixin, self.protocol.writer)
+            self.writer = asyncio.StreamWriter(transport, flow, None, self.loop)
+        except ValueError:
+            self.writer = None
+    
+    def _feed_reader(self):
+        """Feeder thread for stdin that is not a pipe"""
+        while True:
+            chunk = self.protocol.reader.read1(65536)
+            if not chunk:
+                self.loop.call_soon_threadsafe(self.reader.feed_eof)
+                return
+            self.loop.call_soon_threadsafe(self.reader.feed_data, chunk)
+    
+    async def run(self, ready: Dict[str, Any], push_results: bool = True):
+        """Serve commands until EOF, a shutdown command or an unrecoverable stream error"""
+        self.loop = asyncio.get_running_loop()
+        self.outbox = asyncio.Queue()
+        await self._open_streams()
+        writer = asyncio.create_task(self._write_loop())
+        health = asyncio.create_task(self._health_loop())
+        
+        if push_results:
+            self.pool.start_result_forwarder(lambda result: self.send_threadsafe(result_message(result)))
+        announce = asyncio.create_task(self._announce_ready(ready))
+        
+        try:
+            while self.pool.running:
+                try:
+                    request = await self.protocol.read_message_async(self.reader)
+                except json.JSONDecodeError as e:
+                    self.send({"type": "error", "error": f"Invalid JSON: {e}"})
+                    continue
+                except (FramingError, ValueError) as e:
+                    # A corrupt frame or oversized line leaves the stream unsynchronized
+                    self.send({"type": "error", "error": f"Invalid frame: {e}"})
+                    break
+                if request is None:
+                    # EOF reached
+                    break
+                
+                try:
+                    if not await self._handle(request):
+                        break
+                except Exception as e:
+                    self.send({"type": "error", "error": str(e)})
+                    traceback.print_exc(file=sys.stderr)
+        finally:
+            health.cancel()
+            announce.cancel()
+            if self.commands:
+                await asyncio.gather(*self.commands, return_exceptions=True)
+            await self.loop.run_in_executor(None, self.pool.shutdown)
+            await self.outbox.join()
+            writer.cancel()
+    
+    async def _announce_ready(self, ready: Dict[str, Any]):
+        """
+        Send ready once ready_quorum workers are loaded and warmed up
+        
+        Commands are served in the meantime; tasks submitted early wait in the
+        scheduler until a worker is ready for them.
+        """
+        while True:
+            readiness = self.pool.readiness()
+            if readiness["ready"]:
+                break
+            await asyncio.sleep(0.05)
+        self.send({**ready, "readiness": readiness})
+    
+    async def _write_loop(self):
+        """Writer task: flush everything queued so far with one write"""
+        while True:
+            batch = [await self.outbox.get()]
+            while not self.outbox.empty() and len(batch) < 512:
+                batch.append(self.outbox.get_nowait())
+            try:
+                data = b"".join(self.protocol.encode(message) for message in batch)
+                if self.writer is not None:
+                    self.writer.write(data)
+                    await self.writer.drain()
+                else:
+                    self.protocol.writer.write(data)
+                    self.protocol.writer.flush()
+            except Exception as e:
+                print(f"[ControlPlane] Failed to write {len(batch)} messages: {e}", file=sys.stderr, flush=True)
+            finally:
+                for _ in batch:
+                    self.outbox.task_done()
+    
+    async def _health_loop(self):
+        """Health checks on their own timer, whatever the command traffic"""
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.loop.run_in_executor(None, self.pool.health_check)
+            except Exception as e:
+                print(f"[ControlPlane] Health check failed: {e}", file=sys.stderr, flush=True)
+                traceback.print_exc(file=sys.stderr)
+    
+    def _spawn(self, blocking: Callable[[], Optional[Dict[str, Any]]]):
+        """Run a blocking command in the executor and send its reply when it finishes"""
+        async def command():
+            try:
+                reply = await self.loop.run_in_executor(None, blocking)
+            except Exception as e:
+                reply = {"type": "error", "error": str(e)}
+                traceback.print_exc(file=sys.stderr)
+            if reply is not None:
+                self.send(reply)
+        
+        task = asyncio.create_task(command())
+        self.commands.add(task)
+        task.add_done_callback(self.commands.discard)
+    
+    async def _handle(self, request: Dict[str, Any]) -> bool:
+        """Handle one command; returns False when the pool should stop serving"""
+        pool = self.pool
+        request_type = request.get("type")
+        
+        if request_type == "submit_task":
+            # Submit task to pool (never blocks, see admission control)
+            task_id = request.get("task_id")
+            try:
+                latency = pool.submit_task(
+                    task_id,
+                    request.get("data", {}),
+                    request.get("priority", 0),
+                    request.get("lane"),
+                    request.get("deadline"),
+                    request.get("stream", False),
+                    request.get("affinity"),
+                    request.get("coalesce", True)
+                )
+            except Overloaded as e:
+                # Turned away by admission control; the task will not run
+                self.send({"type": "overloaded", "task_id": task_id, **e.hints})
+            else:
+                self.send({"type": "task_submitted", "task_id": task_id, "submission_latency": latency})
+        
+        elif request_type == "get_result":
+            # Backward compatibility only: in push mode results are
+            # already delivered by the forwarder, so never block here
+            if pool.result_listener is not None:
+                self.send({"type": "no_result", "message": "No result available"})
+            else:
+                timeout = request.get("timeout", 1.0)
+                self._spawn(lambda: self._poll_result(timeout))
+        
+        elif request_type == "cancel_task":
+            # Cancel a queued or running task
+            task_id = request.get("task_id")
+            self.send({"type": "cancel_requested", "task_id": task_id, "state": pool.cancel_task(task_id)})
+        
+        elif request_type == "get_metrics":
+            self._spawn(lambda: {"type": "metrics", **pool.get_metrics()})
+        
+        elif request_type == "health_check":
+            self._spawn(self._health_check)
+        
+        elif request_type == "shutdown":
+            # Graceful shutdown
+            await self.loop.run_in_executor(None, pool.shutdown)
+            self.send({"type": "shutdown_complete"})
+            return False
+        
+        return True
+    
+    def _poll_result(self, timeout: float) -> Dict[str, Any]:
+        result = self.pool.get_result(timeout=timeout)
+        if result:
+            return result_message(result)
+        return {"type": "no_result", "message": "No result available"}
+    
+    def _health_check(self) -> Dict[str, Any]:
+        self.pool.health_check()
+        return {"type": "health_check_complete"}
+
+
 def main():
     """
     Main entry point for worker pool
     
     Runs as a persistent process, accepting tasks via stdin and returning
-    results via stdout in JSON format.
+    results via stdout as JSON lines or binary frames (--protocol).
     """
     import argparse
     
     parser = argparse.ArgumentParser(description="ML Worker Pool")
-    parser.add_argument("--workers", type=int, default=2, help="Number of workers")
-    parser.add_argument("--worker-type", type=str, choices=["stt", "tts", "hf_tts", "vllm", "clone"], default="stt")
+    parser.add_argument("--workers", type=int, default=2, help="Number of local workers (0 with --remote-agents: dispatch only)")
+    parser.add_argument("--min-workers", type=int, default=None,
+                        help="Autoscaling lower bound (defaults to --workers)")
+    parser.add_argument("--max-workers", type=int, default=None,
+                        help="Autoscaling upper bound (defaults to --workers; larger enables autoscaling)")
+    parser.add_argument("--max-queue-size", type=int, default=1000,
+                        help="Tasks queued across all lanes before admission control applies")
+    parser.add_argument("--admission", choices=ADMISSION_POLICIES, default="reject",
+                        help="When the queue is full: reject with 'overloaded', shed lower-priority tasks, or wait")
+    parser.add_argument("--admission-wait-ms", type=float, default=500.0,
+                        help="Longest a task waits for queue space under --admission wait")
+    parser.add_argument("--health-interval", type=float, default=1.0,
+                        help="Seconds between health checks (dead and hung worker detection)")
+    parser.add_argument("--max-task-seconds", type=float, default=None,
+                        help="Kill a worker stuck on one task this long (default depends on the worker type)")
+    parser.add_argument("--max-task-retries", type=int, default=1,
+                        help="Rerun a task this many times after the worker running it crashed or hung")
+    parser.add_argument("--spawn-mode", choices=SPAWN_MODES, default="per-worker",
+                        help="zygote: load the service once and fork workers from it (CPU models share weights)")
+    parser.add_argument("--noop-model-mb", type=int, default=0,
+                        help="Ballast held by the noop service, to benchmark spawn modes without real models")
+    parser.add_argument("--noop-warmup-ms", type=float, default=0.0,
+                        help="Warm-up time of the noop service, to exercise the readiness handshake")
+    parser.add_argument("--remote-agents", type=str, nargs="*", default=[],
+                        help="host:port of worker agents (worker_agent.py) to dispatch to alongside local workers")
+    parser.add_argument("--heartbeat-interval", type=float, default=1.0,
+                        help="Seconds between pings to each worker agent")
+    parser.add_argument("--heartbeat-timeout", type=float, default=5.0,
+                        help="Fail over an agent's tasks after this long without hearing from it")
+    parser.add_argument("--ready-quorum", type=int, default=1,
+                        help="Workers that must be loaded and warmed up before the pool reports ready (0: at once)")
+    parser.add_argument("--scale-idle-seconds", type=float, default=AutoscalePolicy.idle_cooldown,
+                        help="Retire a worker after it has been idle this long")
+    parser.add_argument("--worker-type", type=str, choices=[t.value for t in WorkerType], default="stt")
+    parser.add_argument("--result-delivery", type=str, choices=["push", "poll"], default="push",
+                        help="push: write task_result as soon as a task finishes; poll: only on get_result")
+    parser.add_argument("--protocol", type=str, choices=list(PROTOCOLS), default="json",
+                        help="json: JSON lines with base64 audio; framed: length-prefixed frames with raw audio")
+    parser.add_argument("--shm-mb", type=int, default=32,
+                        help="Shared memory arena for large payloads in MB (0 disables)")
+    parser.add_argument("--shm-threshold-kb", type=int, default=256,
+                        help="Payloads at least this large go through shared memory")
+    parser.add_argument("--max-batch-size", type=int, default=1,
+                        help="Micro-batch up to this many tasks per inference call (stt/noop; 1 disables)")
+    parser.add_argument("--batch-window-ms", type=float, default=20.0,
+                        help="How long a worker waits for more tasks to fill a micro-batch")
+    parser.add_argument("--affinity-key", type=str, default=None,
+                        help="Task data field (e.g. session_id) whose value pins tasks to one worker")
+    parser.add_argument("--max-tasks-per-worker", type=int, default=0,
+                        help="Recycle a worker after this many tasks (0: never)")
+    parser.add_argument("--max-rss-mb", type=float, default=0.0,
+                        help="Recycle a worker whose resident memory reaches this many MB (0: never)")
+    parser.add_argument("--no-coalesce", action="store_true",
+                        help="Run every task even when an identical one is already in flight")
+    parser.add_argument("--cpu-affinity", choices=CPU_AFFINITY_MODES, default="none",
+                        help="split: pin each worker to its own block of cores; none: let the OS place workers")
+    parser.add_argument("--cpuset", type=parse_cpuset, default=None,
+                        help="Cores split mode divides between workers, e.g. 0-7 (default: all available); "
+                             "give each pool on a host its own")
+    parser.add_argument("--threads-per-worker", type=int, default=0,
+                        help="Cores and intra-op threads per worker (0: available cores / max workers)")
     args = parser.parse_args()
+    NoopService.model_mb = args.noop_model_mb
+    NoopService.warmup_ms = args.noop_warmup_ms
+    
+    protocol = make_protocol(args.protocol, sys.stdin.buffer, sys.stdout.buffer)
+    
+    # The autoscaler forks workers from a background thread while the main
+    # thread is blocked reading stdin. multiprocessing closes sys.stdin in the
+    # child, which would wait forever on that reader's lock, so give it a
+    # stand-in; the protocol keeps reading the real stdin buffer.
+    sys.stdin = open(os.devnull)
     
     worker_type = WorkerType(args.worker_type)
-    pool = WorkerPool(num_workers=args.workers, worker_type=worker_type)
+    pool = WorkerPool(
+        num_workers=args.workers,
+        worker_type=worker_type,
+        shm_size_mb=args.shm_mb,
+        shm_threshold=args.shm_threshold_kb * 1024,
+        max_batch_size=args.max_batch_size,
+        batch_window_ms=args.batch_window_ms,
+        min_workers=args.min_workers,
+        max_workers=args.max_workers,
+        autoscale_policy=AutoscalePolicy(idle_cooldown=args.scale_idle_seconds),
+        spawn_mode=args.spawn_mode,
+        max_task_seconds=args.max_task_seconds,
+        max_task_retries=args.max_task_retries,
+        max_queue_size=args.max_queue_size,
+        admission_policy=args.admission,
+        admission_wait_ms=args.admission_wait_ms,
+        affinity_key=args.affinity_key,
+        max_tasks_per_worker=args.max_tasks_per_worker,
+        max_rss_mb=args.max_rss_mb,
+        ready_quorum=args.ready_quorum,
+        remote_agents=args.remote_agents,
+        heartbeat_interval=args.heartbeat_interval,
+        heartbeat_timeout=args.heartbeat_timeout,
+        coalesce=not args.no_coalesce,
+        cpu_affinity=args.cpu_affinity,
+        threads_per_worker=args.threads_per_worker,
+        cpuset=args.cpuset,
+        watchdog_interval=0  # The control plane runs health checks on its own timer
+    )
+    pool.binary_payloads = protocol.binary_payloads
     pool.start()
     
-    # Send ready signal
-    print(json.dumps({
+    control_plane = ControlPlane(pool, protocol, health_interval=args.health_interval)
+    ready = {
         "type": "ready",
         "worker_type": worker_type.value,
-        "num_workers": args.workers
-    }), flush=True)
+        "num_workers": pool.num_workers,
+        "result_delivery": args.result_delivery,
+        "protocol": protocol.name,
+        "spawn_mode": pool.spawn_mode
+    }
     
-    # Main loop: accept tasks from stdin, return results on stdout
+    # Serve stdin commands; results are pushed to stdout as they complete
     try:
-        while pool.running:
-            # Check for incoming tasks
-            try:
-                line = sys.stdin.readline()
-                if not line:
-                    # EOF reached
-                    break
-                
-                request = json.loads(line)
-                request_type = request.get("type")
-                
-                if request_type == "submit_task":
-                    # Submit task to pool
-                    task_id = request.get("task_id")
-                    data = request.get("data", {})
-                    priority = request.get("priority", 0)
-                    
-                    latency = pool.submit_task(task_id, data, priority)
-                    
-                    # Send acknowledgment
-                    print(json.dumps({
-                        "type": "task_submitted",
-                        "task_id": task_id,
-                        "submission_latency": latency
-                    }), flush=True)
-                    
-                elif request_type == "get_result":
-                    # Get result with timeout
-                    timeout = request.get("timeout", 1.0)
-                    result = pool.get_result(timeout=timeout)
-                    
-                    if result:
-                        print(json.dumps({
-                            "type": "task_result",
-                            **result
-                        }), flush=True)
-                    else:
-                        print(json.dumps({
-                            "type": "no_result",
-                            "message": "No result available"
-                        }), flush=True)
-                
-                elif request_type == "get_metrics":
-                    # Return metrics
-                    metrics = pool.get_metrics()
-                    print(json.dumps({
-                        "type": "metrics",
-                        **metrics
-                    }), flush=True)
-                
-                elif request_type == "health_check":
-                    # Perform health check
-                    pool.health_check()
-                    print(json.dumps({
-                        "type": "health_check_complete"
-                    }), flush=True)
-                
-                elif request_type == "shutdown":
-                    # Graceful shutdown
-                    pool.shutdown()
-                    print(json.dumps({
-                        "type": "shutdown_complete"
-                    }), flush=True)
-                    break
-                
-            except json.JSONDecodeError as e:
-                print(json.dumps({
-                    "type": "error",
-                    "error": f"Invalid JSON: {e}"
-                }), flush=True)
-            except Exception as e:
-                print(json.dumps({
-                    "type": "error",
-                    "error": str(e)
-                }), flush=True)
-                traceback.print_exc(file=sys.stderr)
-            
-            # Periodic health check
-            pool.health_check()
-    
+        asyncio.run(control_plane.run(ready, push_results=args.result_delivery == "push"))
     finally:
         pool.shutdown()
 
@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+"""
+Worker Pool Benchmarks
+
+Drives worker_pool.py as a subprocess exactly like the TypeScript bridge does
+(JSON lines or binary frames over stdin/stdout) and reports latency figures.
+
+Usage:
+    # Median completion latency, push delivery vs. 100ms get_result polling
+    python worker_pool_benchmark.py result-delivery --tasks 200
+
+    # Audio round-trip throughput, JSON+base64 vs. binary framing
+    python worker_pool_benchmark.py framing --clips 1 10 60
+
+    # Control-message latency while submitting thousands of tasks per second
+    python worker_pool_benchmark.py stress --rates 500 1000 2000 4000
+
+    # Streaming TTS time-to-first-chunk, process per request vs. warm pool
+    python worker_pool_benchmark.py streaming --requests 20
+
+    # VAD / voice analysis latency, fresh service process per request vs. warm pool
+    python worker_pool_benchmark.py services --worker-type clone --requests 20
+    python worker_pool_benchmark.py services --worker-type vad --requests 20
+
+    # CPU-bound throughput against workers x intra-op threads, pinned vs. unpinned
+    python worker_pool_benchmark.py threads --layouts 1x8 2x4 4x2 8x1 4xall
+
+    # Offline transcription of many recordings, audio-hours per wall-hour by batch size
+    python worker_pool_benchmark.py stt-batch --files 32 --batch-sizes 1 4 8 16
+
+    # Long-form transcription wall time against windows decoded in parallel
+    python worker_pool_benchmark.py stt-long --minutes 60 --parallelism 1 2 4
+
+    # Memory per worker and time-to-ready, per-worker loading vs. zygote fork
+    python worker_pool_benchmark.py spawn --workers 4 --worker-type stt
+    python worker_pool_benchmark.py spawn --workers 4 --noop-model-mb 1024
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import base64
+import argparse
+import threading
+import statistics
+import subprocess
+from typing import Dict, Any, List, Optional
+
+from ipc_framing import make_protocol
+
+
+WORKER_POOL_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker_pool.py")
+TTS_STREAMING_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_streaming.py")
+
+# Standalone service scripts the bridge used to spawn per request, with the
+# request each one takes and the equivalent pool task
+SERVICE_SCRIPTS = {
+    "vad": ("vad_service.py", lambda audio: {"type": "detect", "audio": audio}, lambda audio: {"audio": audio}),
+    "clone": ("voice_cloning_service.py", lambda audio: {"command": "analyze", "audio": audio},
+              lambda audio: {"action": "analyze", "audio": audio}),
+}
+
+
+class PoolClient:
+    """Minimal worker_pool.py client that records message arrival times"""
+
+    def __init__(
+        self,
+        worker_type: str = "noop",
+        workers: int = 2,
+        extra_args: Optional[List[str]] = None,
+        protocol: str = "json"
+    ):
+        args = [
+            sys.executable, WORKER_POOL_SCRIPT,
+            "--workers", str(workers),
+            "--worker-type", worker_type,
+            "--protocol", protocol
+        ] + (extra_args or [])
+        self.started = time.perf_counter()
+        self.process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self.protocol = make_protocol(protocol, self.process.stdout, self.process.stdin)
+        self.results: Dict[str, float] = {}
+        self.result_messages: Dict[str, Dict[str, Any]] = {}
+        self.submitted: Dict[str, float] = {}
+        self.acks: Dict[str, float] = {}
+        self.first_partials: Dict[str, float] = {}
+        self.message_counts: Dict[str, int] = {}
+        self.messages: List[Dict[str, Any]] = []
+        self.condition = threading.Condition()
+        self.ready = threading.Event()
+        self.reader = threading.Thread(target=self._read, daemon=True)
+        self.reader.start()
+
+    def _read(self):
+        while True:
+            message = self.protocol.read_message()
+            if message is None:
+                return
+            now = time.perf_counter()
+            with self.condition:
+                if message.get("type") == "ready":
+                    self.ready.set()
+                elif message.get("type") == "task_result":
+                    self.results[message["task_id"]] = now
+                    self.result_messages[message["task_id"]] = message
+                elif message.get("type") in ("task_submitted", "overloaded"):
+                    self.acks[message["task_id"]] = now
+                elif message.get("type") == "task_partial":
+                    self.first_partials.setdefault(message["task_id"], now)
+                else:
+                    self.messages.append(message)
+                self.message_counts[message.get("type")] = self.message_counts.get(message.get("type"), 0) + 1
+                self.condition.notify_all()
+
+    def send(self, command: Dict[str, Any]):
+        self.protocol.write_message(command)
+
+    def submit(self, data: Dict[str, Any], priority: int = 0, stream: bool = False) -> str:
+        task_id = str(uuid.uuid4())
+        self.submitted[task_id] = time.perf_counter()
+        self.send({"type": "submit_task", "task_id": task_id, "data": data, "priority": priority, "stream": stream})
+        return task_id
+    
+    def request(self, command: Dict[str, Any], reply_type: str, timeout: float = 30.0) -> float:
+        """Send a control command, wait for its reply and return the round trip in ms"""
+        with self.condition:
+            seen = self.message_counts.get(reply_type, 0)
+        started = time.perf_counter()
+        self.send(command)
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.message_counts.get(reply_type, 0) > seen, timeout):
+                raise TimeoutError(f"No {reply_type} reply")
+        return (time.perf_counter() - started) * 1000
+
+    def wait_result(self, task_id: str, timeout: float = 30.0) -> float:
+        """Block until task_id has a result and return its arrival time"""
+        deadline = time.perf_counter() + timeout
+        with self.condition:
+            while task_id not in self.results:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    raise TimeoutError(f"No result for task {task_id}")
+                self.condition.wait(remaining)
+            return self.results[task_id]
+
+    def close(self):
+        try:
+            self.send({"type": "shutdown"})
+            self.process.wait(timeout=10)
+        except Exception:
+            self.process.kill()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def worker_pids(pool_pid: int) -> List[int]:
+    """Worker processes of a running pool (its children, minus multiprocessing helpers)"""
+    with open(f"/proc/{pool_pid}/task/{pool_pid}/children") as f:
+        children = [int(pid) for pid in f.read().split()]
+    
+    pids = []
+    for pid in children:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            if b"resource_tracker" not in f.read():
+                pids.append(pid)
+    return pids
+
+
+def memory_mb(pid: int) -> Dict[str, float]:
+    """
+    RSS, PSS and private memory of a process in MB
+    
+    RSS counts shared pages in full for every process that maps them, so
+    it barely moves when weights are shared copy-on-write; PSS splits shared
+    pages between their users and private memory is what each worker adds.
+    """
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss_mb": round(fields.get("Rss", 0.0), 1),
+        "pss_mb": round(fields.get("Pss", 0.0), 1),
+        "private_mb": round(fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0), 1)
+    }
+
+
+def probe_task(worker_type: str) -> Dict[str, Any]:
+    """A small task each worker type can run"""
+    if worker_type == "stt":
+        # One second of 16kHz PCM16 silence
+        return {"audio": base64.b64encode(bytes(32000)).decode("utf-8"), "language": "en"}
+    return {"sleep_ms": 50}
+
+
+def bench_result_delivery(args):
+    """Median completion latency of no-op tasks, push vs. poll delivery"""
+    report = {}
+
+    for mode in ("poll", "push"):
+        client = PoolClient("noop", args.workers, ["--result-delivery", mode])
+        client.ready.wait(30)
+        latencies = []
+
+        for _ in range(args.tasks):
+            submitted = time.perf_counter()
+            task_id = client.submit({"sleep_ms": args.sleep_ms})
+
+            if mode == "poll":
+                # Same polling cadence as the bridge used: get_result every 100ms
+                stop = threading.Event()
+
+                def poll():
+                    while not stop.wait(0.1):
+                        client.send({"type": "get_result", "timeout": 0.1})
+
+                poller = threading.Thread(target=poll, daemon=True)
+                poller.start()
+                finished = client.wait_result(task_id)
+                stop.set()
+                poller.join()
+            else:
+                finished = client.wait_result(task_id)
+
+            latencies.append((finished - submitted) * 1000)
+
+        client.close()
+        report[mode] = {
+            "tasks": len(latencies),
+            "p50_ms": round(statistics.median(latencies), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "mean_ms": round(statistics.mean(latencies), 2)
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+def bench_framing(args):
+    """Round-trip throughput of audio payloads, JSON+base64 vs. framed"""
+    report = {}
+
+    for protocol in ("json", "framed"):
+        client = PoolClient("noop", args.workers, protocol=protocol)
+        client.ready.wait(30)
+        report[protocol] = {}
+
+        for seconds in args.clips:
+            # 16kHz mono PCM16, the format the STT and clone paths receive
+            audio = os.urandom(int(seconds * 16000) * 2)
+            latencies = []
+
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                submitted = time.perf_counter()
+                payload = audio if protocol == "framed" else base64.b64encode(audio).decode("utf-8")
+                task_id = client.submit({"audio": payload})
+                client.wait_result(task_id)
+                echoed = client.result_messages.pop(task_id)["result"]["echo"]["audio"]
+                if protocol == "json":
+                    echoed = base64.b64decode(echoed)
+                assert len(echoed) == len(audio)
+                latencies.append((time.perf_counter() - submitted) * 1000)
+            elapsed = time.perf_counter() - started
+
+            report[protocol][f"{seconds:g}s"] = {
+                "bytes": len(audio),
+                "p50_ms": round(statistics.median(latencies), 2),
+                "audio_mb_per_s": round(len(audio) * args.repeat / elapsed / 1e6, 1)
+            }
+
+        client.close()
+
+    print(json.dumps(report, indent=2))
+
+
+def bench_stress(args):
+    """Control-message round trips and submit acks under a steady stream of no-op submits"""
+    report = {}
+    client = PoolClient("noop", args.workers, ["--max-queue-size", "100000"])
+    client.ready.wait(30)
+    
+    for rate in args.rates:
+        stop = threading.Event()
+        task_ids: List[str] = []
+        
+        def submitter():
+            # Paced in 10ms ticks so the offered load stays at rate tasks/s
+            started = time.perf_counter()
+            sent = 0
+            while not stop.is_set():
+                due = int((time.perf_counter() - started) * rate)
+                while sent < due:
+                    task_ids.append(client.submit({"sleep_ms": 0}))
+                    sent += 1
+                time.sleep(0.01)
+        
+        thread = threading.Thread(target=submitter, daemon=True)
+        thread.start()
+        metrics_ms = []
+        cancel_ms = []
+        started = time.perf_counter()
+        while time.perf_counter() - started < args.duration:
+            # A heavy control message and a trivial one (cancelling an unknown task)
+            metrics_ms.append(client.request({"type": "get_metrics"}, "metrics"))
+            cancel_ms.append(client.request({"type": "cancel_task", "task_id": "probe"}, "cancel_requested"))
+            time.sleep(args.control_interval_ms / 1000.0)
+        stop.set()
+        thread.join()
+        elapsed = time.perf_counter() - started
+        
+        for task_id in task_ids:
+            client.wait_result(task_id, timeout=60)
+        ack_ms = [(client.acks[t] - client.submitted[t]) * 1000 for t in task_ids if t in client.acks]
+        result_ms = [(client.results[t] - client.submitted[t]) * 1000 for t in task_ids]
+        
+        report[f"{rate}/s"] = {
+            "submitted": len(task_ids),
+            "achieved_rate": round(len(task_ids) / elapsed),
+            "metrics_p50_ms": round(statistics.median(metrics_ms), 2),
+            "metrics_p99_ms": round(percentile(metrics_ms, 99), 2),
+            "cancel_p50_ms": round(statistics.median(cancel_ms), 2),
+            "cancel_p99_ms": round(percentile(cancel_ms, 99), 2),
+            "ack_p50_ms": round(statistics.median(ack_ms), 2),
+            "ack_p99_ms": round(percentile(ack_ms, 99), 2),
+            "result_p50_ms": round(statistics.median(result_ms), 2),
+            "result_p99_ms": round(percentile(result_ms, 99), 2)
+        }
+    
+    client.close()
+    print(json.dumps(report, indent=2))
+
+
+def bench_streaming(args):
+    """Streaming TTS first-chunk and total latency: fresh tts_streaming.py process per request vs. warm pool"""
+    request = {"text": args.text, "model": "chatterbox", "chunk_duration_ms": args.chunk_ms}
+    report = {}
+    
+    first_ms, total_ms = [], []
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, TTS_STREAMING_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        process.stdin.write(json.dumps({**request, "streaming": True}).encode() + b"\n")
+        process.stdin.close()
+        first = None
+        for line in process.stdout:
+            chunk = json.loads(line)
+            if first is None:
+                first = time.perf_counter()
+            if chunk.get("done") or chunk.get("type") == "error":
+                break
+        total_ms.append((time.perf_counter() - started) * 1000)
+        first_ms.append((first - started) * 1000)
+        process.wait()
+    report["process_per_request"] = {
+        "first_chunk_p50_ms": round(statistics.median(first_ms), 1),
+        "first_chunk_p95_ms": round(percentile(first_ms, 95), 1),
+        "total_p50_ms": round(statistics.median(total_ms), 1)
+    }
+    
+    client = PoolClient("tts", args.workers)
+    client.ready.wait(60)
+    first_ms, total_ms = [], []
+    for _ in range(args.requests):
+        task_id = client.submit(request, stream=True)
+        finished = client.wait_result(task_id)
+        first_ms.append((client.first_partials[task_id] - client.submitted[task_id]) * 1000)
+        total_ms.append((finished - client.submitted[task_id]) * 1000)
+    client.close()
+    report["warm_pool"] = {
+        "first_chunk_p50_ms": round(statistics.median(first_ms), 1),
+        "first_chunk_p95_ms": round(percentile(first_ms, 95), 1),
+        "total_p50_ms": round(statistics.median(total_ms), 1)
+    }
+    
+    print(json.dumps(report, indent=2))
+
+
+def speech_wav(seconds: float) -> bytes:
+    """16kHz mono PCM16 WAV of a voiced tone with pauses (VAD and voice analysis input)"""
+    import io
+    import wave
+    import numpy as np
+    
+    t = np.arange(int(seconds * 16000)) / 16000
+    envelope = (np.sin(2 * np.pi * 0.5 * t) > 0).astype(np.float64)
+    tone = 0.3 * envelope * (np.sin(2 * np.pi * 140 * t) + 0.5 * np.sin(2 * np.pi * 280 * t))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes((tone * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def bench_services(args):
+    """Request latency of a model service: fresh process per request (old bridge path) vs. warm pool worker"""
+    script, process_request, pool_task = SERVICE_SCRIPTS[args.worker_type]
+    audio = base64.b64encode(speech_wav(args.seconds)).decode("utf-8")
+    report = {}
+    
+    latencies = []
+    for _ in range(args.requests):
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(WORKER_POOL_SCRIPT), script)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        process.stdin.write(json.dumps(process_request(audio)).encode() + b"\n")
+        process.stdin.close()
+        for line in process.stdout:
+            if json.loads(line).get("status") != "ready":
+                break
+        latencies.append((time.perf_counter() - started) * 1000)
+        process.wait()
+    report["process_per_request"] = {
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(percentile(latencies, 95), 1)
+    }
+    
+    client = PoolClient(args.worker_type, args.workers)
+    client.ready.wait(args.timeout)
+    latencies = []
+    for _ in range(args.requests):
+        task_id = client.submit(pool_task(audio))
+        finished = client.wait_result(task_id, timeout=args.timeout)
+        assert client.result_messages[task_id]["status"] == "success", client.result_messages[task_id]
+        latencies.append((finished - client.submitted[task_id]) * 1000)
+    client.close()
+    report["warm_pool"] = {
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(percentile(latencies, 95), 1)
+    }
+    
+    print(json.dumps(report, indent=2))
+
+
+def bench_stt_batch(args):
+    """Offline transcription throughput (audio-hours per wall-hour) per batch size"""
+    files = [
+        base64.b64encode(speech_wav(args.min_seconds + (args.max_seconds - args.min_seconds) * i / max(args.files - 1, 1))).decode("utf-8")
+        for i in range(args.files)
+    ]
+    report = {}
+    
+    client = PoolClient("stt", 1, ["--no-coalesce"])
+    client.ready.wait(args.timeout)
+    for batch_size in args.batch_sizes:
+        task_id = client.submit({"action": "transcribe_batch", "files": files, "batch_size": batch_size}, priority=-1)
+        client.wait_result(task_id, timeout=args.timeout)
+        message = client.result_messages[task_id]
+        assert message["status"] == "success", message
+        result = message["result"]
+        report[f"batch_{batch_size}"] = {
+            "windows": result["windows"],
+            "audio_seconds": round(result["audio_seconds"], 1),
+            "wall_seconds": round(result["wall_seconds"], 2),
+            "audio_hours_per_wall_hour": round(result["audio_hours_per_wall_hour"], 1)
+        }
+    client.close()
+    
+    print(json.dumps(report, indent=2))
+
+
+def bench_stt_long(args):
+    """Wall time of one long recording against the number of windows decoded in parallel"""
+    audio = base64.b64encode(speech_wav(args.minutes * 60)).decode("utf-8")
+    report = {}
+    
+    # The worker's WhisperModel needs as many replicas as the widest run
+    os.environ["STT_DECODE_PARALLELISM"] = str(max(args.parallelism))
+    client = PoolClient("stt", 1, ["--no-coalesce"])
+    client.ready.wait(args.timeout)
+    for parallelism in args.parallelism:
+        task_id = client.submit({"action": "transcribe_long", "audio": audio, "parallelism": parallelism}, priority=-1)
+        finished = client.wait_result(task_id, timeout=args.timeout)
+        message = client.result_messages[task_id]
+        assert message["status"] == "success", message
+        report[f"parallelism_{parallelism}"] = {
+            "windows": message["result"].get("windows"),
+            "wall_s": round(finished - client.submitted[task_id], 2),
+            "segments": len(message["result"]["segments"])
+        }
+    client.close()
+    
+    print(json.dumps({"audio_minutes": args.minutes, "runs": report}, indent=2))
+
+
+def bench_spawn(args):
+    """RSS per worker and time until all workers have answered, per-worker loading vs. zygote fork"""
+    report = {}
+    
+    for mode in ("per-worker", "zygote"):
+        extra = ["--spawn-mode", mode, "--noop-model-mb", str(args.noop_model_mb)]
+        client = PoolClient(args.worker_type, args.workers, extra)
+        client.ready.wait(args.timeout)
+        
+        # With prefetch 1 each task lands on a different worker, so the last
+        # result marks the moment every worker has its service loaded
+        task_ids = [client.submit(probe_task(args.worker_type)) for _ in range(args.workers)]
+        finished = max(client.wait_result(task_id, timeout=args.timeout) for task_id in task_ids)
+        
+        workers = [memory_mb(pid) for pid in worker_pids(client.process.pid)]
+        report[mode] = {
+            "time_to_ready_s": round(finished - client.started, 2),
+            "pool_process": memory_mb(client.process.pid),
+            "workers": workers,
+            "total_pss_mb": round(
+                memory_mb(client.process.pid)["pss_mb"] + sum(w["pss_mb"] for w in workers), 1
+            )
+        }
+        client.close()
+    
+    print(json.dumps(report, indent=2))
+
+
+def bench_threads(args):
+    """CPU-bound task throughput per thread layout: workers x threads pinned, vs. unpinned library defaults"""
+    report = {}
+    
+    for layout in args.layouts:
+        workers, _, threads = layout.partition("x")
+        if threads == "all":
+            # Every worker free to run anywhere with full-size thread pools (the old behaviour)
+            extra = ["--cpu-affinity", "none"]
+        else:
+            extra = ["--cpu-affinity", "split", "--threads-per-worker", threads]
+        client = PoolClient("noop", int(workers), extra + ["--no-coalesce", "--max-queue-size", "100000"])
+        client.ready.wait(60)
+        
+        started = time.perf_counter()
+        task_ids = [client.submit({"matmul": args.size, "rounds": args.rounds, "n": n}) for n in range(args.tasks)]
+        finished = max(client.wait_result(task_id, timeout=600) for task_id in task_ids)
+        client.request({"type": "get_metrics"}, "metrics")
+        metrics = next(m for m in reversed(client.messages) if m.get("type") == "metrics")
+        
+        report[layout] = {
+            "tasks_per_s": round(args.tasks / (finished - started), 2),
+            "worker_cpus": [w["cpus"] for w in metrics["workers"]],
+            "worker_threads": [w["threads"] for w in metrics["workers"]]
+        }
+        client.close()
+    
+    print(json.dumps({"available_cpus": len(os.sched_getaffinity(0)), "layouts": report}, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker pool benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    delivery = subparsers.add_parser("result-delivery", help="push vs. poll completion latency")
+    delivery.add_argument("--tasks", type=int, default=100)
+    delivery.add_argument("--workers", type=int, default=2)
+    delivery.add_argument("--sleep-ms", type=float, default=0)
+    delivery.set_defaults(func=bench_result_delivery)
+
+    framing = subparsers.add_parser("framing", help="JSON+base64 vs. framed audio throughput")
+    framing.add_argument("--clips", type=float, nargs="+", default=[1, 10, 60], help="Clip lengths in seconds")
+    framing.add_argument("--repeat", type=int, default=20)
+    framing.add_argument("--workers", type=int, default=1)
+    framing.set_defaults(func=bench_framing)
+
+    stress = subparsers.add_parser("stress", help="control-message latency under high submit rates")
+    stress.add_argument("--rates", type=int, nargs="+", default=[500, 1000, 2000, 4000], help="Submits per second")
+    stress.add_argument("--duration", type=float, default=3.0, help="Seconds per rate")
+    stress.add_argument("--control-interval-ms", type=float, default=20.0, help="Gap between get_metrics probes")
+    stress.add_argument("--workers", type=int, default=2)
+    stress.set_defaults(func=bench_stress)
+    
+    streaming = subparsers.add_parser("streaming", help="streaming TTS: process per request vs. warm pool")
+    streaming.add_argument("--requests", type=int, default=20)
+    streaming.add_argument("--workers", type=int, default=1)
+    streaming.add_argument("--text", default="The quick brown fox jumps over the lazy dog near the river bank")
+    streaming.add_argument("--chunk-ms", type=int, default=200)
+    streaming.set_defaults(func=bench_streaming)
+    
+    services = subparsers.add_parser("services", help="VAD / voice analysis: process per request vs. warm pool")
+    services.add_argument("--worker-type", choices=sorted(SERVICE_SCRIPTS), default="vad")
+    services.add_argument("--requests", type=int, default=20)
+    services.add_argument("--workers", type=int, default=1)
+    services.add_argument("--seconds", type=float, default=1.0, help="Length of the test clip")
+    services.add_argument("--timeout", type=float, default=300.0, help="Seconds to wait for model loading")
+    services.set_defaults(func=bench_services)
+    
+    stt_batch = subparsers.add_parser("stt-batch", help="offline transcription throughput per batch size")
+    stt_batch.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16])
+    stt_batch.add_argument("--files", type=int, default=32)
+    stt_batch.add_argument("--min-seconds", type=float, default=10.0, help="Length of the shortest file")
+    stt_batch.add_argument("--max-seconds", type=float, default=120.0, help="Length of the longest file")
+    stt_batch.add_argument("--timeout", type=float, default=1800.0, help="Seconds to wait for loading and each batch")
+    stt_batch.set_defaults(func=bench_stt_batch)
+    
+    stt_long = subparsers.add_parser("stt-long", help="long-form transcription wall time per parallel window count")
+    stt_long.add_argument("--parallelism", type=int, nargs="+", default=[1, 2, 4])
+    stt_long.add_argument("--minutes", type=float, default=10.0, help="Length of the synthetic recording")
+    stt_long.add_argument("--timeout", type=float, default=1800.0, help="Seconds to wait for loading and each run")
+    stt_long.set_defaults(func=bench_stt_long)
+    
+    spawn = subparsers.add_parser("spawn", help="per-worker loading vs. zygote fork: memory and time-to-ready")
+    spawn.add_argument("--workers", type=int, default=4)
+    spawn.add_argument("--worker-type", default="noop", help="noop or stt")
+    spawn.add_argument("--noop-model-mb", type=int, default=512, help="Stand-in model size for the noop type")
+    spawn.add_argument("--timeout", type=float, default=600.0, help="Seconds to wait for model loading")
+    spawn.set_defaults(func=bench_spawn)
+    
+    threads = subparsers.add_parser("threads", help="CPU-bound throughput per workers x threads layout")
+    threads.add_argument("--layouts", nargs="+", default=["1x8", "2x4", "4x2", "8x1", "4xall"],
+                         help="WORKERSxTHREADS; xall leaves workers unpinned with default thread pools")
+    threads.add_argument("--tasks", type=int, default=64)
+    threads.add_argument("--size", type=int, default=512, help="Matrix size of each task's products")
+    threads.add_argument("--rounds", type=int, default=20, help="Matrix products per task")
+    threads.set_defaults(func=bench_threads)
+    
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -67,11 +67,17 @@ interface TTSChunkResponse {
   message?: string;
 }
 
+// Whisper model tier: "realtime" decodes greedily on a small/turbo model, "accurate" runs large-v3 beam search
+type STTTier = "realtime" | "accurate";
+
 interface STTChunkRequest {
   chunk: string;  // base64 encoded PCM16
   sequence: number;
   language?: string;
-  return_partial?: boolean;
+  return_partial?: boolean;  // false: partial results come back with empty text (default: true)
+  session_id?: string;  // Keeps a stream's chunks on one STT worker (and names its buffer)
+  final?: boolean;  // Last frame: commit what is left and drop the stream
+  tier?: STTTier;  // Fixed by the stream's first frame (default: realtime)
 }
 
 interface STTChunkResponse {
@@ -86,12 +92,38 @@ interface STTChunkResponse {
     confidence: number;
     tokens: string[];
   }>;
-  is_partial: boolean;
+  is_partial: boolean;  // true: text is the current hypothesis; false: segments were committed
+  unstable_text?: string;  // Uncommitted tail of the hypothesis
   vad_active: boolean;
   sequence: number;
+  buffer_seconds?: number;  // Audio still awaiting commit in the stream's buffer
+  tier?: STTTier;
   processing_time: number;
 }
 
+type PartialHandler = (partial: any, sequence: number) => void;
+
+interface STTTranscript {
+  text: string;
+  language: string;
+  confidence: number;
+  duration: number;
+  segments: Array<{ text: string; start: number; end: number; confidence: number }>;
+  tier?: STTTier;
+  error?: string;
+}
+
+interface STTBatchResponse {
+  results: STTTranscript[];  // One per file, in request order
+  files: number;
+  windows: number;  // VAD speech windows decoded
+  batch_size: number;
+  tier: STTTier;
+  audio_seconds: number;
+  wall_seconds: number;
+  audio_hours_per_wall_hour: number;
+}
+
 interface WorkerTask {
   task_id: string;
   data: any;
@@ -99,20 +131,233 @@ interface WorkerTask {
   resolve: (result: any) => void;
   reject: (error: Error) => void;
   submitted_at: number;
+  onPartial?: PartialHandler;  // Set for streaming tasks
+}
+
+interface LatencySummary {
+  count: number;
+  avg: number;
+  p50: number;
+  p95: number;
+  p99: number;
+  max: number;
+}
+
+// Workers that have loaded and warmed up their service, out of those serving
+interface PoolReadiness {
+  state: "starting" | "partial" | "full";
+  ready: boolean;  // At least quorum workers are ready
+  quorum: number;
+  ready_workers: number;
+  num_workers: number;
+  time_to_ready_s: Record<string, number>;  // By worker_id
+}
+
+interface TranscriptionCacheMetrics {
+  memory_entries: number;
+  memory_hits: number;
+  disk_hits: number;
+  misses: number;
+  hit_rate: number;
+  stores: number;
+  memory_evictions: number;
+  disk_evictions: number;
+  disk_bytes: number | null;  // null when the disk tier is off
+}
+
+interface WhisperTierMetrics {
+  model: string;
+  beam_size: number;
+  loaded: boolean;  // Tiers load on their first request unless preloaded (STT_PRELOAD_TIERS)
+  replicas: number;  // CTranslate2 replicas; grows to STT_DECODE_PARALLELISM on the first long-form request
+  load_s: number | null;
+  load_error: string | null;  // Set when the tier failed to load; its requests fall back to accurate
+  requests: number;
+  audio_seconds: number;
+  decode_seconds: number;
+  avg_decode_ms: number;
+  rtf: number;  // Decode seconds per second of audio
 }
 
 interface WorkerPoolMetrics {
   worker_type: string;
+  result_delivery: "push" | "poll";
+  spawn_mode: "per-worker" | "zygote";
+  cpu_affinity: "split" | "none";
+  cpuset: number[] | null;  // Cores split mode divides between this pool's workers
   num_workers: number;
   alive_workers: number;
+  readiness: PoolReadiness;
   tasks_submitted: number;
   tasks_completed: number;
   tasks_failed: number;
+  tasks_cancelled: number;
+  tasks_expired: number;
   queue_depth: number;
+  in_flight: number;
+  lanes: Record<string, {
+    weight: number;
+    depth: number;
+    submitted: number;
+    dispatched: number;
+    aged: number;
+    oldest_wait_ms: number;
+    avg_wait_ms: number;
+    p95_wait_ms: number;
+    max_wait_ms: number;
+  }>;
+  batching: {
+    max_batch_size: number;
+    window_ms: number;
+    batches: number;
+    avg_batch_size: number;
+    histogram: Record<string, number>;
+  };
+  affinity: {
+    key: string | null;
+    pinned_keys: number;
+    parked: number;
+    routed: number;
+    parked_total: number;
+  };
+  streaming: {
+    active_streams: number;
+    partials_forwarded: number;
+  };
+  // Identical deterministic tasks in flight share one run
+  coalescing: {
+    enabled: boolean;
+    hits: number;
+    leaders: number;
+    hit_rate: number;
+    open_groups: number;
+    waiting_followers: number;
+    fanned_out_results: number;
+  };
+  admission: {
+    policy: "reject" | "shed" | "wait";
+    max_queue_size: number;
+    wait_ms: number;
+    waiting: number;
+    rejected: number;
+    shed: number;
+  };
+  watchdog: {
+    max_task_seconds: number;
+    max_task_retries: number;
+    worker_crashes: number;
+    worker_hangs: number;
+    tasks_requeued: number;
+    stale_results: number;
+  };
+  autoscaling: {
+    enabled: boolean;
+    min_workers: number;
+    max_workers: number;
+    draining_workers: number;
+    scale_ups: number;
+    scale_downs: number;
+    recent_events: Array<{
+      at: number;
+      action: "scale_up" | "scale_down";
+      worker_id: number;
+      reason: string;
+      num_workers: number;
+    }>;
+  };
+  recycling: {
+    max_tasks_per_worker: number;
+    max_rss_mb: number;
+    recycles: number;
+    failures: number;
+    in_progress: Array<{ worker_id: number; replacement_id: number; reason: string; since: number }>;
+    recent_events: Array<{
+      at: number;
+      worker_id: number;
+      replacement_id: number;
+      reason: string;
+      tasks_processed: number;
+      rss_mb: number;
+      warmup_s: number;
+    }>;
+  };
+  latency_ms: Record<"queue_wait" | "decode" | "inference" | "encode", LatencySummary>;
+  // STT result cache counters summed over workers (null for other pools)
+  result_cache: Pick<
+    TranscriptionCacheMetrics,
+    "memory_hits" | "disk_hits" | "misses" | "hit_rate" | "stores" | "memory_evictions" | "disk_evictions"
+  > | null;
+  workers: Array<{
+    worker_id: number;
+    slot: number;  // Hash ring position for session affinity
+    pid: number | null;
+    cpus: number[] | null;  // Cores the worker is pinned to (null: unpinned or remote)
+    threads: number | null;  // Intra-op thread budget
+    status: "idle" | "busy" | "draining" | "dead" | "starting";
+    tasks_processed: number;
+    errors: number;
+    in_flight: number;
+    parked: number;
+    avg_processing_ms: number;
+    last_task_at: number;
+    busy_seconds: number;
+    rss_mb: number | null;
+    load_s: number | null;  // null until the worker is ready
+    warmup_s: number | null;
+    time_to_ready_s: number | null;
+    utilization: number;
+    // Service counters from the worker's latest result (STT: result cache, open streams, model tiers)
+    service: {
+      cache?: TranscriptionCacheMetrics;
+      streams?: number;
+      tiers?: Record<STTTier, WhisperTierMetrics>;
+    } | null;
+    latency_ms: Record<string, Pick<LatencySummary, "count" | "p50" | "p95" | "p99">>;
+  }>;
+  // Mean busy fraction of live workers over the last utilization_window_s
   worker_utilization: number;
+  utilization_window_s: number;
 }
 
-type WorkerType = "stt" | "tts" | "hf_tts" | "vllm" | "clone";
+type WorkerType = "stt" | "tts" | "hf_tts" | "vllm" | "clone" | "vad";
+
+// Task priorities understood by worker_pool.py: >0 realtime lane,
+// 0 interactive lane, <0 batch lane
+const TaskPriority = {
+  REALTIME: 1,
+  INTERACTIVE: 0,
+  BATCH: -1
+} as const;
+
+const TASK_TIMEOUT_MS = 30000;
+
+// Offline batch transcription covers many recordings in one task
+const BATCH_TASK_TIMEOUT_MS = 30 * 60 * 1000;
+
+// How long a pool may take to report ready: its first --ready-quorum
+// workers must load their models and finish a warm-up inference
+const POOL_STARTUP_TIMEOUT_MS = 120000;
+
+// Queue depth and back-off hints sent by worker_pool.py when admission
+// control turns a task away
+interface OverloadHints {
+  reason: "queue_full" | "shed" | "wait_timeout";
+  policy: "reject" | "shed" | "wait";
+  queue_depth: number;
+  max_queue_size: number;
+  waiting: number;
+  lane_depths: Record<string, number>;
+  in_flight: number;
+  alive_workers: number;
+  retry_after_ms: number | null;
+}
+
+export class WorkerPoolOverloadedError extends Error {
+  constructor(public workerType: string, public hints: OverloadHints) {
+    super(`Worker pool ${workerType} overloaded (${hints.reason}, ${hints.queue_depth}/${hints.max_queue_size} queued)`);
+    this.name = "WorkerPoolOverloadedError";
+  }
+}
 
 class WorkerPool {
   private process: ChildProcess | null = null;
@@ -123,10 +368,20 @@ class WorkerPool {
   private eventEmitter: EventEmitter = new EventEmitter();
   private outputBuffer: string = "";
   private healthCheckInterval: NodeJS.Timeout | null = null;
+  private extraArgs: string[];
+  private startupTimeoutMs: number;
+  private readyWorkers: number = 0;  // Workers loaded and warmed up, from worker_ready
   
-  constructor(workerType: WorkerType, numWorkers: number = 2) {
+  constructor(
+    workerType: WorkerType,
+    numWorkers: number = 2,
+    extraArgs: string[] = [],
+    startupTimeoutMs: number = POOL_STARTUP_TIMEOUT_MS
+  ) {
     this.workerType = workerType;
     this.numWorkers = numWorkers;
+    this.extraArgs = extraArgs;
+    this.startupTimeoutMs = startupTimeoutMs;
   }
   
   async start(): Promise<void> {
@@ -135,12 +390,18 @@ class WorkerPool {
     }
     
     const scriptPath = resolvePythonScript("worker_pool.py");
+    // Pools plan core blocks independently, so pinning only pays off when
+    // each pool gets its own cores, e.g. STT_POOL_CPUS=0-7 TTS_POOL_CPUS=8-11
+    const cpuset = process.env[`${this.workerType.toUpperCase()}_POOL_CPUS`];
+    const cpuArgs = cpuset ? ["--cpu-affinity", "split", "--cpuset", cpuset] : [];
     
     return new Promise((resolve, reject) => {
       this.process = spawn("python3", [
         scriptPath,
         "--workers", String(this.numWorkers),
-        "--worker-type", this.workerType
+        "--worker-type", this.workerType,
+        ...cpuArgs,
+        ...this.extraArgs
       ]);
       
       if (!this.process.stdout || !this.process.stdin || !this.process.stderr) {
@@ -194,9 +455,10 @@ class WorkerPool {
       });
       
       // Wait for ready signal
-      this.eventEmitter.once("ready", () => {
+      this.eventEmitter.once("ready", (readiness?: PoolReadiness) => {
         this.ready = true;
-        console.log(`[WorkerPool:${this.workerType}] Ready with ${this.numWorkers} workers`);
+        const warm = readiness ? `${readiness.ready_workers}/${readiness.num_workers}` : `${this.numWorkers}`;
+        console.log(`[WorkerPool:${this.workerType}] Ready with ${warm} workers warm`);
         
         // Start health check
         this.startHealthCheck();
@@ -204,12 +466,14 @@ class WorkerPool {
         resolve();
       });
       
-      // Timeout if not ready in 10 seconds
+      // Models load (and warm up) before the pool reports ready
       setTimeout(() => {
         if (!this.ready) {
-          reject(new Error("Worker pool startup timeout"));
+          reject(new Error(
+            `Worker pool startup timeout after ${this.startupTimeoutMs}ms (${this.readyWorkers}/${this.numWorkers} workers ready)`
+          ));
         }
-      }, 10000);
+      }, this.startupTimeoutMs);
     });
   }
   
@@ -217,7 +481,15 @@ class WorkerPool {
     const type = message.type;
     
     if (type === "ready") {
-      this.eventEmitter.emit("ready");
+      this.eventEmitter.emit("ready", message.readiness);
+    } else if (type === "worker_ready") {
+      // One per worker once its models are loaded and warmed up ("partial"
+      // until every worker is); tasks only go to ready workers
+      this.readyWorkers = message.ready_workers;
+      console.log(
+        `[WorkerPool:${this.workerType}] Worker ${message.worker_id} ready in ${message.time_to_ready_s}s ` +
+        `(load ${message.load_s}s, warm-up ${message.warmup_s}s), ${message.ready_workers}/${message.num_workers} ready`
+      );
     } else if (type === "task_submitted") {
       // Task acknowledged, will get result later
       const taskId = message.task_id;
@@ -241,11 +513,29 @@ class WorkerPool {
       
       if (message.status === "success") {
         task.resolve(message.result);
+      } else if (message.status === "overloaded") {
+        // Shed, or its bounded wait for queue space ran out
+        task.reject(new WorkerPoolOverloadedError(this.workerType, message));
       } else {
         task.reject(new Error(message.error || "Task failed"));
       }
+    } else if (type === "task_partial") {
+      // Streaming task: partials arrive in sequence order, before task_result
+      const task = this.pendingTasks.get(message.task_id);
+      if (task && task.onPartial) {
+        task.onPartial(message.partial, message.sequence);
+      }
+    } else if (type === "overloaded") {
+      // Rejected at submission by admission control; the task will not run
+      const task = this.pendingTasks.get(message.task_id);
+      if (task) {
+        this.pendingTasks.delete(message.task_id);
+        task.reject(new WorkerPoolOverloadedError(this.workerType, message));
+      }
+    } else if (type === "cancel_requested") {
+      // Cancellation acknowledged; the final task_result carries the outcome
     } else if (type === "no_result") {
-      // No result available yet, will retry
+      // Only sent in reply to legacy get_result polling
     } else if (type === "metrics") {
       // Metrics update
       this.eventEmitter.emit("metrics", message);
@@ -257,7 +547,6 @@ class WorkerPool {
   private startHealthCheck() {
     this.healthCheckInterval = setInterval(() => {
       this.sendCommand({ type: "health_check" });
-      this.sendCommand({ type: "get_result", timeout: 0.1 });
     }, 5000);
   }
   
@@ -269,7 +558,17 @@ class WorkerPool {
     this.process.stdin.write(JSON.stringify(command) + "\n");
   }
   
-  async submitTask(data: any, priority: number = 0): Promise<any> {
+  /**
+   * Submit a task; with onPartial the task streams, and onPartial receives
+   * each partial result (audio chunk, segment, token) before the promise
+   * resolves with the final result
+   */
+  async submitTask(
+    data: any,
+    priority: number = 0,
+    onPartial?: PartialHandler,
+    timeoutMs: number = TASK_TIMEOUT_MS
+  ): Promise<any> {
     if (!this.ready) {
       throw new Error("Worker pool not ready");
     }
@@ -284,47 +583,35 @@ class WorkerPool {
         priority,
         resolve,
         reject,
-        submitted_at: submittedAt
+        submitted_at: submittedAt,
+        onPartial
       };
       
       this.pendingTasks.set(taskId, task);
       
-      // Submit task to pool
+      // Submit task to pool; the pool drops it once the deadline passes
       this.sendCommand({
         type: "submit_task",
         task_id: taskId,
         data,
-        priority
+        priority,
+        deadline: (submittedAt + timeoutMs) / 1000,
+        stream: onPartial !== undefined
       });
       
-      // Start polling for results
-      this.pollForResult(taskId);
+      // Result is pushed by the pool as a task_result message
       
-      // Timeout after 30 seconds
+      // Time out (30 seconds by default) and stop the pool from working on it
       setTimeout(() => {
         if (this.pendingTasks.has(taskId)) {
           this.pendingTasks.delete(taskId);
+          this.sendCommand({ type: "cancel_task", task_id: taskId });
           reject(new Error("Task timeout"));
         }
-      }, 30000);
+      }, timeoutMs);
     });
   }
   
-  private async pollForResult(taskId: string) {
-    // Poll for result every 100ms
-    const interval = setInterval(() => {
-      if (!this.pendingTasks.has(taskId)) {
-        clearInterval(interval);
-        return;
-      }
-      
-      this.sendCommand({
-        type: "get_result",
-        timeout: 0.1
-      });
-    }, 100);
-  }
-  
   async getMetrics(): Promise<WorkerPoolMetrics> {
     return new Promise((resolve, reject) => {
       this.eventEmitter.once("metrics", (metrics) => {
@@ -393,6 +680,7 @@ export class PythonBridge {
   private hfTtsPool: WorkerPool | null = null;
   private vllmPool: WorkerPool | null = null;
   private clonePool: WorkerPool | null = null;
+  private vadPool: WorkerPool | null = null;
   
   constructor() {
     // Use python3 from PATH
@@ -402,26 +690,52 @@ export class PythonBridge {
   async initialize() {
     console.log("[PythonBridge] Initializing worker pools...");
     
-    // Start STT worker pool (2 workers)
-    this.sttPool = new WorkerPool("stt", 2);
+    // Start STT worker pool (2 workers, micro-batching concurrent chunks,
+    // autoscaling up to 4 under load, a stream's chunks pinned to one worker,
+    // workers recycled before CTranslate2 allocator growth OOMs the container).
+    // Recycling is by memory only: every 20ms call frame is a task, so a task
+    // count would restart workers (and drop live streams' buffers) every
+    // minute or so under call load.
+    // Ready once one worker has Whisper loaded and warm; a cold cache
+    // downloads large-v3 first, hence the long startup timeout
+    this.sttPool = new WorkerPool("stt", 2, [
+      "--max-batch-size", "8", "--batch-window-ms", "20",
+      "--min-workers", "2", "--max-workers", "4",
+      "--affinity-key", "session_id",
+      "--max-rss-mb", "6144",
+      "--ready-quorum", "1"
+    ], 10 * 60 * 1000);
     await this.sttPool.start();
     
-    // Start TTS worker pool (2 workers)
-    this.ttsPool = new WorkerPool("tts", 2);
+    // Start TTS worker pool (2 workers, autoscaling up to 4 under load)
+    this.ttsPool = new WorkerPool("tts", 2, [
+      "--min-workers", "2", "--max-workers", "4",
+      "--max-tasks-per-worker", "20000", "--max-rss-mb", "6144"
+    ]);
     await this.ttsPool.start();
     
-    // Start HF TTS worker pool (2 workers for Hugging Face API calls)
-    this.hfTtsPool = new WorkerPool("hf_tts", 2);
+    // Start HF TTS worker pool (1-4 workers for Hugging Face API calls)
+    this.hfTtsPool = new WorkerPool("hf_tts", 2, ["--min-workers", "1", "--max-workers", "4"]);
     await this.hfTtsPool.start();
     
-    // Start VLLM worker pool (1 worker for now, can scale up)
-    this.vllmPool = new WorkerPool("vllm", 1);
+    // Start VLLM worker pool (conversation memory lives in the worker, so
+    // each session is pinned to one). A local engine claims most of the GPU,
+    // so only one worker fits; with VLLM_BACKEND=nvidia-api workers are thin
+    // API clients and two share the load. Model download and load can take
+    // many minutes
+    const vllmWorkers = process.env.VLLM_BACKEND === "nvidia-api" ? 2 : 1;
+    this.vllmPool = new WorkerPool("vllm", vllmWorkers, ["--affinity-key", "session_id"], 15 * 60 * 1000);
     await this.vllmPool.start();
     
-    // Start voice cloning worker pool (1 worker for now)
+    // Start voice cloning worker pool (1 worker for now; clones in progress
+    // live in the worker). Also serves voice analysis
     this.clonePool = new WorkerPool("clone", 1);
     await this.clonePool.start();
     
+    // Start VAD worker pool (2 workers keeping Silero loaded)
+    this.vadPool = new WorkerPool("vad", 2);
+    await this.vadPool.start();
+    
     console.log("[PythonBridge] Worker pools initialized");
   }
   
@@ -430,10 +744,58 @@ export class PythonBridge {
       throw new Error("STT worker pool not initialized");
     }
     
-    const result = await this.sttPool.submitTask(request, 0);
+    const result = await this.sttPool.submitTask(request, TaskPriority.REALTIME);
     return result as STTChunkResponse;
   }
   
+  /**
+   * Transcribe recorded calls in one batch task (overnight jobs); speech
+   * from all files is decoded together, batchSize windows per inference call
+   */
+  async transcribeBatch(
+    files: Buffer[],
+    language: string = "en",
+    batchSize: number = 16,
+    tier?: STTTier
+  ): Promise<STTBatchResponse> {
+    if (!this.sttPool) {
+      throw new Error("STT worker pool not initialized");
+    }
+    
+    const request = {
+      action: "transcribe_batch",
+      files: files.map((file) => file.toString("base64")),
+      language,
+      batch_size: batchSize,
+      tier
+    };
+    
+    return this.sttPool.submitTask(request, TaskPriority.BATCH, undefined, BATCH_TASK_TIMEOUT_MS);
+  }
+  
+  /**
+   * Transcribe one long recording; the worker cuts it at silences and
+   * decodes the windows in parallel, so latency grows far slower than length
+   */
+  async transcribeLong(
+    audio: Buffer,
+    language: string = "en",
+    tier?: STTTier
+  ): Promise<STTTranscript & { windows: number; parallelism: number; vad_fallback?: boolean }> {
+    if (!this.sttPool) {
+      throw new Error("STT worker pool not initialized");
+    }
+    
+    const request = {
+      action: "transcribe_long",
+      audio: audio.toString("base64"),
+      language,
+      tier
+    };
+    
+    return this.sttPool.submitTask(request, TaskPriority.BATCH, undefined, BATCH_TASK_TIMEOUT_MS);
+  }
+  
   async callTTS(request: TTSRequest): Promise<Buffer> {
     // Route based on model selection
     if (request.model === "indic-parler-tts") {
@@ -591,66 +953,22 @@ export class PythonBridge {
     request: TTSStreamingRequest,
     onChunk: (chunk: TTSChunkResponse) => void
   ): Promise<void> {
-    const scriptPath = resolvePythonScript("tts_streaming.py");
+    if (!this.ttsPool) {
+      throw new Error("TTS worker pool not initialized");
+    }
     
-    return new Promise((resolve, reject) => {
-      const python = spawn(this.pythonPath, [scriptPath]);
-      
-      let outputBuffer = "";
-      
-      if (!python.stdout || !python.stdin || !python.stderr) {
-        reject(new Error("Failed to create streaming TTS process streams"));
-        return;
-      }
-      
-      // Handle stdout - parse JSON chunks
-      python.stdout.on("data", (data) => {
-        outputBuffer += data.toString();
-        
-        // Process complete JSON messages
-        const lines = outputBuffer.split("\n");
-        outputBuffer = lines.pop() || "";
-        
-        for (const line of lines) {
-          if (!line.trim()) continue;
-          
-          try {
-            const chunk: TTSChunkResponse = JSON.parse(line);
-            onChunk(chunk);
-          } catch (error) {
-            console.error("[PythonBridge] Failed to parse TTS chunk:", line, error);
-          }
-        }
-      });
-      
-      // Handle stderr - log messages
-      python.stderr.on("data", (data) => {
-        const message = data.toString().trim();
-        if (message) {
-          console.log(`[TTS Streaming]`, message);
-        }
-      });
-      
-      // Handle process completion
-      python.on("close", (code) => {
-        if (code !== 0) {
-          reject(new Error(`TTS streaming process exited with code ${code}`));
-          return;
-        }
-        resolve();
+    // Chunks stream from a warm pool worker as task_partial messages
+    await this.ttsPool.submitTask(request, TaskPriority.REALTIME, (partial, sequence) => {
+      onChunk({
+        type: "tts_chunk",
+        status: "success",
+        chunk: partial.audio,
+        sequence,
+        done: partial.done,
+        latency_ms: partial.latency_ms,
+        model_info: partial.model_info,
+        duration_ms: partial.duration_ms,
       });
-      
-      python.on("error", (error) => {
-        reject(new Error(`Failed to spawn TTS streaming process: ${error.message}`));
-      });
-      
-      // Send request with streaming enabled
-      const streamingRequest = {
-        ...request,
-        streaming: true,
-      };
-      python.stdin.write(JSON.stringify(streamingRequest) + "\n");
-      python.stdin.end();
     });
   }
   
@@ -736,125 +1054,45 @@ export class PythonBridge {
     }
   }
   
+  /**
+   * Generate a VLLM response token by token on a pooled worker; resolves
+   * with the full response once generation finishes
+   */
+  async callVLLMStreaming(
+    request: VLLMRequest,
+    onToken: (token: { token: string; text: string; index: number }) => void
+  ): Promise<VLLMResponse> {
+    if (!this.vllmPool) {
+      throw new Error("VLLM worker pool not initialized");
+    }
+    
+    const result = await this.vllmPool.submitTask(request, 0, (partial) => onToken(partial));
+    if (!result.response) {
+      throw new Error(result.error || "No response from VLLM agent");
+    }
+    return result as VLLMResponse;
+  }
+  
   async analyzeVoice(audioBuffer: Buffer): Promise<any> {
-    const scriptPath = resolvePythonScript("voice_cloning_service.py");
+    if (!this.clonePool) {
+      throw new Error("Voice cloning worker pool not initialized");
+    }
     
-    return new Promise((resolve, reject) => {
-      const python = spawn(this.pythonPath, [scriptPath]);
-      
-      let outputBuffer = "";
-      let stderrData = "";
-
-      if (!python.stdout || !python.stdin || !python.stderr) {
-        reject(new Error("Failed to create voice cloning process streams"));
-        return;
-      }
-
-      // Handle stdout
-      python.stdout.on("data", (data) => {
-        outputBuffer += data.toString();
-        
-        // Process complete JSON messages
-        const lines = outputBuffer.split("\n");
-        outputBuffer = lines.pop() || "";
-        
-        for (const line of lines) {
-          if (!line.trim()) continue;
-          
-          try {
-            const message = JSON.parse(line);
-            
-            // Handle ready message
-            if (message.status === "ready") {
-              // Send analyze command
-              const request = {
-                command: "analyze",
-                audio: audioBuffer.toString("base64")
-              };
-              python.stdin.write(JSON.stringify(request) + "\n");
-              python.stdin.end();
-            }
-            // Handle response
-            else if (message.success !== undefined) {
-              if (message.success) {
-                resolve(message.result);
-              } else {
-                reject(new Error(message.error || "Voice analysis failed"));
-              }
-              python.kill();
-            }
-          } catch (error) {
-            console.error("[VoiceCloning] Failed to parse message:", line, error);
-          }
-        }
-      });
-
-      python.stderr.on("data", (data) => {
-        stderrData += data.toString();
-      });
-
-      python.on("close", (code) => {
-        if (code !== 0 && code !== null) {
-          reject(new Error(`Voice cloning process exited with code ${code}: ${stderrData}`));
-        }
-      });
-
-      python.on("error", (error) => {
-        reject(new Error(`Failed to spawn voice cloning process: ${error.message}`));
-      });
-    });
+    const request = {
+      action: "analyze",
+      audio: audioBuffer.toString("base64")
+    };
+    
+    return this.clonePool.submitTask(request, TaskPriority.INTERACTIVE);
   }
 
   async processVAD(audioBase64: string): Promise<{ segments: Array<{ start: number; end: number; confidence: number }> }> {
-    const scriptPath = resolvePythonScript("vad_service.py");
+    if (!this.vadPool) {
+      throw new Error("VAD worker pool not initialized");
+    }
     
-    return new Promise((resolve, reject) => {
-      const python = spawn(this.pythonPath, [scriptPath]);
-      
-      let stdoutData = "";
-      let stderrData = "";
-
-      python.stdout.on("data", (data) => {
-        stdoutData += data.toString();
-      });
-
-      python.stderr.on("data", (data) => {
-        stderrData += data.toString();
-      });
-
-      python.on("close", (code) => {
-        if (code !== 0) {
-          reject(new Error(`Python VAD process exited with code ${code}: ${stderrData}`));
-          return;
-        }
-
-        try {
-          const response = JSON.parse(stdoutData);
-          
-          if (response.status === "error") {
-            reject(new Error(response.message || "VAD service error"));
-            return;
-          }
-
-          resolve({ segments: response.segments || [] });
-        } catch (error) {
-          reject(new Error(`Failed to parse Python VAD response: ${error}`));
-        }
-      });
-
-      python.on("error", (error) => {
-        reject(new Error(`Failed to spawn VAD process: ${error.message}`));
-      });
-
-      // Send request
-      const request = {
-        type: "detect",
-        audio: audioBase64
-      };
-      
-      python.stdin.write(JSON.stringify(request) + "\n");
-      python.stdin.end();
-    });
+    const result = await this.vadPool.submitTask({ audio: audioBase64 }, TaskPriority.REALTIME);
+    return { segments: result.segments || [] };
   }
 
   async createInstantClone(cloneId: string, audioData: Buffer, name: string): Promise<any> {
@@ -869,8 +1107,7 @@ export class PythonBridge {
       name: name
     };
     
-    const result = await this.clonePool.submitTask(request, 0);
-    return result.result;
+    return this.clonePool.submitTask(request, 0);
   }
   
   async createProfessionalClone(cloneId: string, audioData: Buffer, name: string): Promise<any> {
@@ -885,8 +1122,7 @@ export class PythonBridge {
       name: name
     };
     
-    const result = await this.clonePool.submitTask(request, 0);
-    return result.result;
+    return this.clonePool.submitTask(request, TaskPriority.BATCH);
   }
   
   async createSyntheticClone(cloneId: string, description: string, characteristics: any): Promise<any> {
@@ -901,8 +1137,7 @@ export class PythonBridge {
       characteristics: characteristics
     };
     
-    const result = await this.clonePool.submitTask(request, 0);
-    return result.result;
+    return this.clonePool.submitTask(request, 0);
   }
   
   async getCloneStatus(cloneId: string): Promise<any> {
@@ -915,8 +1150,7 @@ export class PythonBridge {
       clone_id: cloneId
     };
     
-    const result = await this.clonePool.submitTask(request, 0);
-    return result.result;
+    return this.clonePool.submitTask(request, 0);
   }
 
   async getMetrics() {
@@ -924,7 +1158,8 @@ export class PythonBridge {
       stt: null,
       tts: null,
       vllm: null,
-      clone: null
+      clone: null,
+      vad: null
     };
     
     if (this.sttPool) {
@@ -959,6 +1194,14 @@ export class PythonBridge {
       }
     }
     
+    if (this.vadPool) {
+      try {
+        metrics.vad = await this.vadPool.getMetrics();
+      } catch (error) {
+        console.error("[PythonBridge] Failed to get VAD metrics:", error);
+      }
+    }
+    
     return metrics;
   }
   
@@ -985,6 +1228,10 @@ export class PythonBridge {
       await this.clonePool.shutdown();
     }
     
+    if (this.vadPool) {
+      await this.vadPool.shutdown();
+    }
+    
     console.log("[PythonBridge] Worker pools shut down");
   }
 }
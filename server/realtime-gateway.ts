@@ -257,6 +257,7 @@ export class RealTimeGateway {
         sequence: conn.messageCount,
         language: "en",
         return_partial: true,
+        session_id: conn.sessionId,
       });
       
       sttProcessingTime = Date.now() - sttProcessingStart;
@@ -229,9 +229,12 @@ export class TelephonyService {
         sequence: session.audioBuffer.length - 1,
         language: "en",
         return_partial: false,
+        session_id: sessionId,
       });
 
-      if (!transcriptionResult.text || transcriptionResult.text.trim() === "") {
+      // Partial results carry an unstable hypothesis (or nothing); only
+      // committed words start an agent turn
+      if (transcriptionResult.is_partial || !transcriptionResult.text || transcriptionResult.text.trim() === "") {
         return null; // No speech detected
       }
 